@@ -0,0 +1,154 @@
+"""
+Cold-start check: import time of the API and time until it answers /health.
+
+Each run starts a fresh interpreter, so nothing is warm but the OS file
+cache:
+
+    import   python -c "import main", timed in the child, and the list of
+             heavy modules it pulled in (Playwright, supabase-py, httpx
+             must only be imported when a job needs them);
+    health   uvicorn started on main:app until the first 200 on /health;
+    cli      python -m jobs.worker_node --help.
+
+Medians over --runs are compared with the budgets; the exit code is 1 when
+a budget is exceeded or a heavy module is imported at startup, so the
+script can guard startup time in CI.
+
+    cd backend && python benchmarks/cold_start.py --runs 5
+    cd backend && python benchmarks/cold_start.py --health-budget 1.0 --output cold_start.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+sys.path.insert(0, str(BENCH_DIR))
+
+from scraper_suite import git_commit  # noqa: E402
+
+# Importés seulement à l'ouverture du navigateur, du client Supabase ou au premier téléchargement
+LAZY_MODULES = ("playwright", "supabase", "httpx")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(m for m in %r if m in sys.modules)}))
+""" % (LAZY_MODULES,)
+
+
+def child_env(workdir: Path) -> Dict[str, str]:
+    return {**os.environ, "LOG_FILE": str(workdir / "api.log"), "SCRAPER_WORKER_PROCESSES": "0",
+            "TASK_QUEUE_URL": "", "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(workdir: Path) -> Dict:
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=SRC_DIR, env=child_env(workdir),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_health(workdir: Path, timeout: float = 60.0) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR, env=child_env(workdir), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if api.poll() is not None:
+                raise RuntimeError(f"API exited with code {api.returncode}: {api.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"API not answering /health after {timeout:.0f}s")
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            api.kill()
+
+
+def time_cli(workdir: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "jobs.worker_node", "--help"], cwd=SRC_DIR, env=child_env(workdir),
+                   stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {"median": round(statistics.median(values), 3), "min": round(min(values), 3),
+            "max": round(max(values), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=1.0, help="seconds (median), 0 = no check")
+    parser.add_argument("--health-budget", type=float, default=2.0, help="seconds (median), 0 = no check")
+    parser.add_argument("--cli-budget", type=float, default=1.5, help="seconds (median), 0 = no check")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="cold-start-"))
+    imports, health, cli, loaded = [], [], [], set()
+    for _ in range(args.runs):
+        probe = time_import(workdir)
+        imports.append(probe["seconds"])
+        loaded.update(probe["modules"])
+        health.append(time_health(workdir))
+        cli.append(time_cli(workdir))
+
+    results = {"import": summarize(imports), "health": summarize(health), "cli": summarize(cli)}
+    failures = [f"{module} imported by main" for module in sorted(loaded)]
+    for name, budget in (("import", args.import_budget), ("health", args.health_budget), ("cli", args.cli_budget)):
+        if budget and results[name]["median"] > budget:
+            failures.append(f"{name}: {results[name]['median']}s > budget {budget}s")
+
+    report = {
+        "suite": "cold_start",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "results": results,
+        "eager_modules": sorted(loaded),
+        "failures": failures,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
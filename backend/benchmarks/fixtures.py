@@ -0,0 +1,290 @@
+"""
+Offline BrainyQuote fixtures: topic pages and images served by a local HTTP server.
+
+A fixture directory mirrors the site's paths:
+
+    topics/<topic>-quotes.html, topics/<topic>-quotes_2.html, ...
+    photos_tr/en/<letter>/<author>/<id>/<author>1.jpg
+
+``record`` fetches real topic pages and their images into such a directory
+(run it once with network access, then commit or archive the result).
+``build`` writes a deterministic set that follows the markup parsed by
+``_extract_quotes_enhanced`` (quote grid items, image alt text, author
+links), so that benchmarks run anywhere and compare across versions.
+Images missing from the directory are served as deterministic JPEG-sized
+payloads.
+
+    cd backend && python benchmarks/fixtures.py build --out /tmp/bq-fixtures
+    cd backend && python benchmarks/fixtures.py record --topic love --pages 3 --out /tmp/bq-fixtures
+    cd backend && python benchmarks/fixtures.py serve --dir /tmp/bq-fixtures --port 8765
+    BRAINYQUOTE_BASE_URL=http://127.0.0.1:8765 python src/main.py
+"""
+
+import argparse
+import hashlib
+import html
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+WORDS = (
+    "love life time heart people world never always nothing something friend hope truth light "
+    "dream day work mind soul change fear courage kindness silence happiness beauty wisdom "
+    "freedom patience journey moment memory strength laughter music nature river mountain"
+).split()
+
+AUTHORS = (
+    "Ada Palmer", "Bruno Keller", "Clara Nguyen", "Dmitri Orlov", "Elena Rossi", "Farid Haddad",
+    "Grace Okafor", "Hugo Marchand", "Ines Duarte", "Jonas Berg", "Keiko Sato", "Liam Walsh",
+    "Maya Cohen", "Nils Larsen", "Olivia Grant", "Pablo Ortega", "Quinn Harper", "Rosa Lindqvist",
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div id="quotesList" class="grid-layout">
+{items}
+</div>
+</body></html>
+"""
+
+ITEM_TEMPLATE = """<div class="grid-item qb clearfix bqQt" id="qpos_{page}_{position}">
+{image}<a href="/quotes/{slug}_{quote_id}" class="b-qt qt_{quote_id} oncl_q" title="view quote">
+<div>{text}</div>
+</a>
+<a href="/authors/{author_slug}-quotes" class="bq-aut qa_{quote_id} oncl_a" title="view author">{author}</a>
+</div>"""
+
+IMAGE_TEMPLATE = """<a href="/quotes/{slug}_{quote_id}" class="oncl_q" title="view quote">
+<img class="bqphtgrid" src="{src}" alt="{alt}">
+</a>
+"""
+
+
+def page_path(topic: str, page_num: int) -> str:
+    """Path of a topic page on the site (same pagination as the scraper)"""
+    return f"topics/{topic}-quotes" if page_num == 1 else f"topics/{topic}-quotes_{page_num}"
+
+
+def _quote_id(rng: random.Random) -> int:
+    # Le scraper prend une page contenant "403" pour une page de blocage
+    while True:
+        quote_id = rng.randint(100000, 999999)
+        if "403" not in str(quote_id):
+            return quote_id
+
+
+def build_fixtures(directory: Path, topic: str = "love", pages: int = 3, quotes_per_page: int = 60,
+                   image_ratio: float = 0.25, seed: int = 42) -> Dict[str, int]:
+    """Write a deterministic fixture set; returns its size"""
+    directory = Path(directory)
+    (directory / "topics").mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    images = 0
+    for page_num in range(1, pages + 1):
+        items = []
+        for position in range(quotes_per_page):
+            author = rng.choice(AUTHORS)
+            author_slug = author.lower().replace(" ", "-")
+            slug = author.lower().replace(" ", "_")
+            quote_id = _quote_id(rng)
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "."
+            image = ""
+            if rng.random() < image_ratio:
+                compact = author.lower().replace(" ", "")
+                src = f"/photos_tr/en/{compact[0]}/{compact}/{quote_id}/{compact}1.jpg"
+                image = IMAGE_TEMPLATE.format(slug=slug, quote_id=quote_id, src=src,
+                                              alt=html.escape(f"{text} - {author}"))
+                images += 1
+            items.append(ITEM_TEMPLATE.format(page=page_num, position=position, image=image, slug=slug,
+                                              quote_id=quote_id, text=html.escape(text),
+                                              author_slug=author_slug, author=html.escape(author)))
+        title = f"{topic.title()} Quotes - Page {page_num}"
+        path = directory / f"{page_path(topic, page_num)}.html"
+        path.write_text(PAGE_TEMPLATE.format(title=title, items="\n".join(items)), encoding="utf-8")
+    return {"pages": pages, "quotes": pages * quotes_per_page, "images": images}
+
+
+def record_fixtures(directory: Path, topic: str, pages: int, base_url: str = "https://www.brainyquote.com",
+                    delay: float = 2.0) -> Dict[str, int]:
+    """Fetch real topic pages and their images (needs network access)"""
+    import httpx
+
+    directory = Path(directory)
+    (directory / "topics").mkdir(parents=True, exist_ok=True)
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                             "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+    recorded = {"pages": 0, "images": 0}
+    with httpx.Client(headers=headers, follow_redirects=True, timeout=30) as client:
+        for page_num in range(1, pages + 1):
+            response = client.get(f"{base_url}/{page_path(topic, page_num)}")
+            response.raise_for_status()
+            # Images servies par le serveur de fixtures : URLs absolues du site rendues relatives
+            page = response.text.replace(base_url, "")
+            (directory / f"{page_path(topic, page_num)}.html").write_text(page, encoding="utf-8")
+            recorded["pages"] += 1
+            for src in sorted(set(re.findall(r'src="(/photos_tr/[^"]+)"', page))):
+                target = directory / src.lstrip("/")
+                if target.exists():
+                    continue
+                image = client.get(f"{base_url}{src}")
+                if image.status_code == 200:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(image.content)
+                    recorded["images"] += 1
+                time.sleep(delay)
+            time.sleep(delay)
+    return recorded
+
+
+def synthetic_image(path: str, min_size: int = 20_000, max_size: int = 80_000) -> bytes:
+    """Deterministic JPEG-sized payload for an image path"""
+    digest = hashlib.sha256(path.encode()).digest()
+    size = min_size + int.from_bytes(digest[:4], "big") % (max_size - min_size)
+    body = (digest * (size // len(digest) + 1))[:size]
+    return b"\xff\xd8\xff\xe0" + body + b"\xff\xd9"
+
+
+def fixture_images(directory: Path) -> List[str]:
+    """Image paths referenced by the fixture pages"""
+    paths = set()
+    for page in sorted(Path(directory).glob("topics/*.html")):
+        paths.update(re.findall(r'src="(/photos_tr/[^"]+)"', page.read_text(encoding="utf-8")))
+    return sorted(paths)
+
+
+class FixtureServer:
+    """Threaded HTTP server for a fixture directory, with optional latency and injected errors."""
+
+    def __init__(self, directory: Path, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.error_rate = error_rate  # part des réponses remplacées par un 503
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            disable_nagle_algorithm = True  # en-têtes et corps écrits séparément
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.error_rate and server.inject_error():
+                    self.send_response(503)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                path = self.path.split("?", 1)[0]
+                body, content_type = server.resolve(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def inject_error(self) -> bool:
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return False
+            self.errors += 1
+            return True
+
+    def resolve(self, path: str):
+        relative = path.lstrip("/")
+        if ".." in relative.split("/"):
+            return None, ""
+        if relative.startswith("topics/"):
+            page = self.directory / f"{relative}.html"
+            if page.is_file():
+                return page.read_bytes(), "text/html; charset=utf-8"
+            return None, ""
+        if relative.startswith("photos_tr/"):
+            image = self.directory / relative
+            return (image.read_bytes() if image.is_file() else synthetic_image(path)), "image/jpeg"
+        return None, ""
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="write a deterministic fixture set")
+    build.add_argument("--out", type=Path, required=True)
+    build.add_argument("--topic", default="love")
+    build.add_argument("--pages", type=int, default=3)
+    build.add_argument("--quotes-per-page", type=int, default=60)
+
+    record = commands.add_parser("record", help="record real topic pages and images (network)")
+    record.add_argument("--out", type=Path, required=True)
+    record.add_argument("--topic", default="love")
+    record.add_argument("--pages", type=int, default=3)
+    record.add_argument("--delay", type=float, default=2.0, help="seconds between two requests")
+
+    serve = commands.add_parser("serve", help="serve a fixture directory")
+    serve.add_argument("--dir", type=Path, required=True)
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        print(build_fixtures(args.out, args.topic, args.pages, args.quotes_per_page))
+    elif args.command == "record":
+        print(record_fixtures(args.out, args.topic, args.pages, delay=args.delay))
+    else:
+        server = FixtureServer(args.dir, port=args.port, latency=args.latency, error_rate=args.error_rate)
+        print(f"Serving {args.dir} on {server.url} (BRAINYQUOTE_BASE_URL={server.url})")
+        try:
+            server._httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
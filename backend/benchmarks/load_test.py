@@ -0,0 +1,406 @@
+"""
+Load test of the API against a mock BrainyQuote site and a mock Supabase.
+
+Starts the fixture server (generated topics of --pages pages each, with
+--latency and --error-rate per request), the Supabase stand-in and the real
+API (uvicorn in a subprocess, data directories in a scratch directory),
+then, at the same time:
+
+    --clients WebSocket clients on /ws/scraping measure the delivery
+      latency of every message (server timestamp -> receipt);
+    --jobs jobs are submitted at once to /api/scrape/start (every quote of
+      every page unless --max-quotes) and followed until they finish;
+    /health is probed every --probe-interval (event loop responsiveness);
+    the RSS of the API process and of its children (Chromium, scraper
+      worker processes) is sampled every --sample-interval.
+
+The JSON report has the job throughput and latency percentiles, the
+submission latency, the time to first quote, the WebSocket message rate
+and delivery latency, the /health latency and the memory timeline.
+
+    cd backend && python benchmarks/load_test.py --jobs 20 --clients 200 --pages 10
+    cd backend && python benchmarks/load_test.py --jobs 4 --pages 50 --error-rate 0.05 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from fixtures import FixtureServer, build_fixtures  # noqa: E402
+from scraper_suite import git_commit  # noqa: E402
+from standins import SupabaseStandIn, redirect_data_dirs  # noqa: E402
+
+TERMINAL_STATUSES = ("completed", "stopped", "error")
+
+
+def percentiles(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+    return {"count": len(ordered), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99),
+            "max": round(ordered[-1], 4)}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(root_pid: int) -> Dict[str, float]:
+    """RSS (MB) of a process and of all its descendants, from /proc"""
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            parents[int(entry.name)] = int(stat.rsplit(")", 1)[1].split()[1])
+            for line in (entry / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    rss[int(entry.name)] = int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        children = [child for child, parent in parents.items() if parent == pid and child not in tree]
+        tree.update(children)
+        frontier.extend(children)
+    children_kb = sum(rss.get(pid, 0) for pid in tree if pid != root_pid)
+    return {"api_mb": round(rss.get(root_pid, 0) / 1024, 1), "children_mb": round(children_kb / 1024, 1),
+            "processes": len(tree)}
+
+
+def serve_api(workdir: Path, port: int):
+    """Entry point of the API subprocess: data directories in ``workdir``, then uvicorn"""
+    sys.path.insert(0, str(BACKEND_DIR / "src"))
+    os.chdir(workdir)
+    from core.config import settings
+
+    redirect_data_dirs(settings, workdir)
+    import uvicorn
+
+    uvicorn.run("main:app", host="127.0.0.1", port=port, log_level="warning")
+
+
+class LoadRun:
+    """Drives one load test against a running API and collects its measurements."""
+
+    def __init__(self, base_url: str, api_pid: int, args):
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://") + "/ws/scraping"
+        self.api_pid = api_pid
+        self.args = args
+        self.done = asyncio.Event()
+        self.started = 0.0
+        self.jobs: Dict[str, Dict[str, Any]] = {}  # job_id -> soumission, premier quote, fin, statut
+        self.submit_latencies: List[float] = []
+        self.rejected = 0
+        self.ws_messages = 0
+        self.ws_frames = 0
+        self.ws_latencies: List[float] = []
+        self.ws_errors = 0
+        self.health_latencies: List[float] = []
+        self.health_failures = 0
+        self.memory: List[Dict[str, Any]] = []
+
+    # --- WebSocket ---
+
+    def _on_message(self, message: Dict[str, Any], received: float):
+        self.ws_messages += 1
+        timestamp = message.get("timestamp")
+        if timestamp:
+            self.ws_latencies.append(received - datetime.fromisoformat(timestamp).timestamp())
+        job = self.jobs.get(message.get("job_id"))
+        if job is None:
+            return
+        monotonic = time.perf_counter()
+        if message.get("type") == "quote_extracted" and job.get("first_quote") is None:
+            job["first_quote"] = monotonic - job["submitted"]
+        elif job.get("finished") is None and (message.get("type") in ("completed", "stopped")
+                                              or message.get("status") == "error"):
+            # Les "error" sans statut (stockage, clés manquantes) ne terminent pas le job
+            job["finished"] = monotonic - job["submitted"]
+
+    async def websocket_client(self, ready: asyncio.Event, connected: List[int]):
+        import websockets
+
+        try:
+            async with websockets.connect(self.ws_url, max_size=None, open_timeout=30) as ws:
+                connected.append(1)
+                if len(connected) >= self.args.clients:
+                    ready.set()
+                while not self.done.is_set():
+                    try:
+                        text = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        continue
+                    received = time.time()
+                    if text == "pong":
+                        continue
+                    self.ws_frames += 1
+                    data = json.loads(text)
+                    for message in data["messages"] if data.get("type") == "batch" else [data]:
+                        self._on_message(message, received)
+        except Exception:
+            self.ws_errors += 1
+            connected.append(0)
+            if len(connected) >= self.args.clients:
+                ready.set()
+
+    # --- Jobs ---
+
+    async def submit(self, client, index: int):
+        topic = f"{self.args.topic}{index % self.args.topics}"
+        payload = {"topic": topic, "max_pages": self.args.pages, "max_quotes": self.args.max_quotes,
+                   "include_images": not self.args.no_images, "store_in_database": not self.args.no_storage,
+                   "use_cache": False}
+        start = time.perf_counter()
+        response = await client.post("/api/scrape/start", json=payload)
+        self.submit_latencies.append(time.perf_counter() - start)
+        if response.status_code == 200:
+            job_id = response.json()["data"]["job_id"]
+            self.jobs.setdefault(job_id, {})["submitted"] = start
+        else:
+            self.rejected += 1
+
+    async def follow_jobs(self, client):
+        """Poll the job list until every accepted job has finished (or --timeout)"""
+        deadline = time.perf_counter() + self.args.timeout
+        while time.perf_counter() < deadline:
+            response = await client.get("/api/jobs")
+            now = time.perf_counter()
+            for job in response.json()["jobs"]:
+                tracked = self.jobs.get(job["job_id"])
+                if tracked is None or "submitted" not in tracked:
+                    continue
+                tracked["status"] = job["status"]
+                tracked["extracted"] = job["stats"]["extracted"]
+                tracked["error"] = job.get("error")
+                if job["status"] in TERMINAL_STATUSES and tracked.get("finished") is None:
+                    tracked["finished"] = now - tracked["submitted"]
+            if all(job.get("status") in TERMINAL_STATUSES for job in self.jobs.values()):
+                return
+            await asyncio.sleep(0.2)
+
+    # --- Sondes ---
+
+    async def probe_health(self, client):
+        while not self.done.is_set():
+            start = time.perf_counter()
+            try:
+                response = await client.get("/health")
+                if response.status_code == 200:
+                    self.health_latencies.append(time.perf_counter() - start)
+                else:
+                    self.health_failures += 1
+            except Exception:
+                self.health_failures += 1
+            await asyncio.sleep(self.args.probe_interval)
+
+    async def sample_memory(self):
+        while not self.done.is_set():
+            sample = await asyncio.to_thread(process_tree_rss, self.api_pid)
+            self.memory.append({"t": round(time.perf_counter() - self.started, 2), **sample})
+            await asyncio.sleep(self.args.sample_interval)
+
+    async def run(self) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.args.jobs + 10)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=60, limits=limits) as client:
+            self.started = time.perf_counter()
+            background = [asyncio.create_task(self.sample_memory())]
+
+            ready, connected = asyncio.Event(), []
+            clients = [asyncio.create_task(self.websocket_client(ready, connected)) for _ in range(self.args.clients)]
+            if clients:
+                await asyncio.wait_for(ready.wait(), timeout=60)
+            background.append(asyncio.create_task(self.probe_health(client)))
+
+            load_start = time.perf_counter()
+            await asyncio.gather(*(self.submit(client, i) for i in range(self.args.jobs)))
+            await self.follow_jobs(client)
+            duration = time.perf_counter() - load_start
+            await asyncio.sleep(0.5)  # derniers messages WebSocket
+
+            self.done.set()
+            await asyncio.gather(*clients, *background, return_exceptions=True)
+        return self.report(duration)
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        jobs = [job for job in self.jobs.values() if "submitted" in job]
+        finished = [job for job in jobs if job.get("status") in TERMINAL_STATUSES]
+        completed = [job for job in finished if job["status"] == "completed"]
+        quotes = sum(job.get("extracted", 0) for job in jobs)
+        errors = sorted({job["error"].splitlines()[0] for job in jobs if job.get("error")})
+        peak = max(self.memory, key=lambda s: s["api_mb"] + s["children_mb"]) if self.memory else None
+        return {
+            "duration_seconds": round(duration, 2),
+            "jobs": {
+                "submitted": self.args.jobs,
+                "accepted": len(jobs),
+                "rejected": self.rejected,
+                "completed": len(completed),
+                "failed": len([job for job in finished if job["status"] == "error"]),
+                "unfinished": len(jobs) - len(finished),
+                "errors": errors[:5],
+                "per_second": round(len(completed) / duration, 3) if duration else None,
+                "latency_seconds": percentiles([job["finished"] for job in completed]),
+                "first_quote_seconds": percentiles([job["first_quote"] for job in jobs if job.get("first_quote")]),
+                "submit_latency_seconds": percentiles(self.submit_latencies),
+            },
+            "quotes": {"extracted": quotes, "per_second": round(quotes / duration, 2) if duration else None},
+            "websocket": {
+                "clients": self.args.clients,
+                "connection_errors": self.ws_errors,
+                "frames": self.ws_frames,
+                "messages": self.ws_messages,
+                "messages_per_second": round(self.ws_messages / duration, 1) if duration else None,
+                "delivery_latency_seconds": percentiles(self.ws_latencies),
+            },
+            "health": {"latency_seconds": percentiles(self.health_latencies), "failures": self.health_failures},
+            "memory": {
+                "peak_total_mb": round(peak["api_mb"] + peak["children_mb"], 1) if peak else None,
+                "peak_api_mb": max((s["api_mb"] for s in self.memory), default=None),
+                "timeline": self.memory,
+            },
+        }
+
+
+def wait_for_api(base_url: str, process: subprocess.Popen, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API not answering /health after {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10, help="jobs submitted at once")
+    parser.add_argument("--clients", type=int, default=50, help="WebSocket clients")
+    parser.add_argument("--topics", type=int, default=5, help="distinct topics served by the mock site")
+    parser.add_argument("--topic", default="loadtest", help="prefix of the topic names")
+    parser.add_argument("--pages", type=int, default=5, help="pages per topic (every page is scraped)")
+    parser.add_argument("--quotes-per-page", type=int, default=60)
+    parser.add_argument("--max-quotes", type=int, default=None, help="per job (default: all quotes)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every mock site response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock site requests answered 503")
+    parser.add_argument("--db-latency", type=float, default=0.01, help="seconds added to every mock Supabase request")
+    parser.add_argument("--no-images", action="store_true")
+    parser.add_argument("--no-storage", action="store_true")
+    parser.add_argument("--request-delay-ms", type=int, default=0, help="REQUEST_DELAY of the API")
+    parser.add_argument("--max-concurrent-jobs", type=int, default=None, help="MAX_CONCURRENT_JOBS of the API")
+    parser.add_argument("--worker-processes", type=int, default=None, help="SCRAPER_WORKER_PROCESSES of the API")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for the jobs")
+    parser.add_argument("--probe-interval", type=float, default=0.1)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument("--serve-api", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_api is not None:
+        serve_api(args.workdir, args.serve_api)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="load-test-"))
+    fixtures_dir = workdir / "fixtures"
+    for index in range(args.topics):
+        build_fixtures(fixtures_dir, topic=f"{args.topic}{index}", pages=args.pages,
+                       quotes_per_page=args.quotes_per_page, seed=index)
+
+    with FixtureServer(fixtures_dir, latency=args.latency, error_rate=args.error_rate) as site, \
+            SupabaseStandIn(latency=args.db_latency) as supabase:
+        env = {
+            **os.environ,
+            "BRAINYQUOTE_BASE_URL": site.url,
+            "REQUEST_DELAY": str(args.request_delay_ms),
+            "SUPABASE_URL": supabase.url,
+            "SUPABASE_SERVICE_KEY": "load-test-key",
+            "SUPABASE_ANON_KEY": "load-test-key",
+            "MAX_QUEUED_JOBS": str(max(100, args.jobs)),
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+            "LOG_FILE": str(workdir / "api.log"),
+        }
+        if args.max_concurrent_jobs is not None:
+            env["MAX_CONCURRENT_JOBS"] = str(args.max_concurrent_jobs)
+        if args.worker_processes is not None:
+            env["SCRAPER_WORKER_PROCESSES"] = str(args.worker_processes)
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        with open(workdir / "api.stderr", "w") as stderr:
+            api = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), "--serve-api", str(port), "--workdir", str(workdir)],
+                env=env, stdout=stderr, stderr=subprocess.STDOUT
+            )
+        try:
+            boot_start = time.perf_counter()
+            wait_for_api(base_url, api)
+            boot_seconds = time.perf_counter() - boot_start
+            results = asyncio.run(LoadRun(base_url, api.pid, args).run())
+        except Exception:
+            print((workdir / "api.stderr").read_text()[-3000:], file=sys.stderr)
+            raise
+        finally:
+            api.terminate()
+            try:
+                api.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                api.kill()
+
+        results["mock_site"] = {"requests": site.requests, "errors_injected": site.errors,
+                                "megabytes_sent": round(site.bytes_sent / 1_000_000, 2)}
+        results["mock_supabase"] = {"requests": dict(supabase.requests), "objects": len(supabase.objects)}
+
+    report = {
+        "suite": "load",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {key: value for key, value in vars(args).items()
+                   if key not in ("output", "serve_api", "workdir")},
+        "api_boot_seconds": round(boot_seconds, 2),
+        "results": results,
+        "workdir": str(workdir),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark: time the event loop spends in logging calls during one scraping job.
+
+Replays the log calls of a job (per page: URL, selectors, extraction; per
+quote: extraction debug lines, storage lines, broadcast debug line) with
+the old setup (basicConfig with a FileHandler and a StreamHandler, eager
+f-strings) and with core.log (queue handler, background writer thread,
+%-style arguments, repeat filter), and reports the blocking time per job.
+
+    cd backend && python benchmarks/logging_pipeline.py --pages 10 --jobs 5
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.log import LOG_FORMAT, setup_logging, stop_logging  # noqa: E402
+
+SELECTORS = ['.bqQt', '.grid-item', '.clearfix', '[class*="quote"]']
+
+
+class SlowStream:
+    """Console whose writes take ``latency`` seconds (terminal or pipe back-pressure)"""
+
+    def __init__(self, path: Path, latency: float):
+        self.file = open(path, "a", encoding="utf-8")
+        self.latency = latency
+
+    def write(self, text: str):
+        if self.latency:
+            time.sleep(self.latency)
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+def legacy_job(pages: int, quotes_per_page: int):
+    """Log calls of one job as written before core.log (f-strings)"""
+    scraper = logging.getLogger("scraper.brainyquote_hybrid")
+    storage = logging.getLogger("database.supabase_storage")
+    broadcaster = logging.getLogger("core.broadcaster")
+    httpx_logger = logging.getLogger("httpx")
+    for page_num in range(1, pages + 1):
+        topic_url = f"https://www.brainyquote.com/topics/love-quotes_{page_num}"
+        scraper.info(f"🎯 Scraping page {page_num}/{pages} for topic: love")
+        scraper.info(f"📍 URL: {topic_url}")
+        for selector in SELECTORS[:2]:
+            scraper.info(f"🔍 Trying selector: {selector}")
+            scraper.info(f"📊 Found {quotes_per_page} elements with selector '{selector}'")
+        scraper.info(f"✅ Using selector: {SELECTORS[0]}")
+        for idx in range(quotes_per_page):
+            quote_text = f"Quote number {idx} of page {page_num}, long enough to be a real quote text."
+            scraper.debug(f"Found text in title attribute: {quote_text[:50]}...")
+            scraper.debug(f"✅ Quote {idx + 1}: {quote_text[:50]}...")
+            httpx_logger.info(f'HTTP Request: GET {topic_url}/img{idx}.jpg "HTTP/1.1 200 OK"')
+            broadcaster.debug(f"📡 Queued for 3 connections: {json.dumps({'type': 'quote_extracted', 'text': quote_text})[:100]}")
+            storage.info(f"📝 Processing quote {idx + 1}/{quotes_per_page}: Someone")
+            storage.info(f"✅ Stored quote: {page_num * 1000 + idx} - Someone")
+        scraper.info(f"📊 Page {page_num}: Found {quotes_per_page} quotes (Total: {page_num * quotes_per_page})")
+
+
+def current_job(pages: int, quotes_per_page: int):
+    """Same log calls with lazy %-style arguments"""
+    scraper = logging.getLogger("scraper.brainyquote_hybrid")
+    storage = logging.getLogger("database.supabase_storage")
+    broadcaster = logging.getLogger("core.broadcaster")
+    httpx_logger = logging.getLogger("httpx")
+    for page_num in range(1, pages + 1):
+        topic_url = f"https://www.brainyquote.com/topics/love-quotes_{page_num}"
+        scraper.info("🎯 Scraping page %d/%d for topic: %s (%d page(s) in flight)", page_num, pages, "love", 1)
+        scraper.info("📍 URL: %s", topic_url)
+        for selector in SELECTORS[:2]:
+            scraper.info("🔍 Trying selector: %s", selector)
+            scraper.info("📊 Found %d elements with selector '%s'", quotes_per_page, selector)
+        scraper.info("✅ Using selector: %s", SELECTORS[0])
+        for idx in range(quotes_per_page):
+            quote_text = f"Quote number {idx} of page {page_num}, long enough to be a real quote text."
+            scraper.debug("Found text in title attribute: %.50s...", quote_text)
+            scraper.debug("✅ Quote %d: %.50s...", idx + 1, quote_text)
+            httpx_logger.info('HTTP Request: %s %s "%s %d %s"', "GET", f"{topic_url}/img{idx}.jpg", "HTTP/1.1", 200, "OK")
+            broadcaster.debug("📡 Queued for %d connections: %.100s", 3, quote_text)
+            storage.info("📝 Processing quote %d/%d: %s", idx + 1, quotes_per_page, "Someone")
+            storage.info("✅ Stored quote: %s - %s", page_num * 1000 + idx, "Someone")
+        scraper.info("📊 Page %d: Found %d quotes (Total: %d)", page_num, quotes_per_page, page_num * quotes_per_page)
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for name in ("httpx", "scraper.brainyquote_hybrid"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+def measure(job, jobs: int, pages: int, quotes_per_page: int):
+    timings = []
+    for _ in range(jobs):
+        start = time.perf_counter()
+        job(pages, quotes_per_page)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--quotes-per-page", type=int, default=60)
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--write-latency", type=float, default=0.0002,
+                        help="seconds per console write (terminal/pipe back-pressure)")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON results here")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="log-bench-"))
+    results = []
+
+    # Avant : basicConfig, écriture synchrone du fichier et de la console
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(workdir / "legacy.log", encoding="utf-8"),
+            logging.StreamHandler(SlowStream(workdir / "legacy.console", args.write_latency))
+        ]
+    )
+    timings = measure(legacy_job, args.jobs, args.pages, args.quotes_per_page)
+    results.append(("legacy", timings, 0.0))
+    reset_root()
+
+    # Après : file + thread d'écriture, d'abord seuls (mêmes lignes écrites), puis avec
+    # le filtre de répétition et httpx=WARNING
+    for mode, options in (("queue", {"repeat_burst": 0}),
+                          ("queue+filters", {"levels": "httpx=WARNING"})):
+        listener = setup_logging(log_file=str(workdir / f"{mode}.log"), **options)
+        listener.handlers[0].setStream(SlowStream(workdir / f"{mode}.console", args.write_latency))
+        timings = measure(current_job, args.jobs, args.pages, args.quotes_per_page)
+        drain_start = time.perf_counter()
+        stop_logging()
+        results.append((mode, timings, time.perf_counter() - drain_start))
+        reset_root()
+
+    rows = []
+    for mode, timings, drain in results:
+        lines = sum(1 for _ in open(workdir / f"{mode}.log", encoding="utf-8"))
+        rows.append({
+            "mode": mode,
+            "jobs": args.jobs,
+            "log_lines_written": lines,
+            "blocking_ms_per_job": round(1000 * sum(timings) / len(timings), 2),
+            "blocking_ms_max_job": round(1000 * max(timings), 2),
+            "background_drain_ms": round(1000 * drain, 2),
+        })
+    for row in rows[1:]:
+        row["blocking_saved_ms_per_job"] = round(rows[0]["blocking_ms_per_job"] - row["blocking_ms_per_job"], 2)
+    for row in rows:
+        print(json.dumps(row))
+    if args.output:
+        args.output.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: memory per quote held by a crawl, dicts versus QuoteRecord.
+
+Builds --quotes quotes shaped like the scraper output (fixture vocabulary and
+authors, --image-ratio of them with a downloaded image, fresh strings for
+every field as Playwright returns them) and measures with tracemalloc what
+stays allocated per quote:
+
+    dict      the former layout: dict with text, author, author_slug, link,
+              image_url, index and a nested image_data dict
+    record    core.records.QuoteRecord (slots, interned author, slug and
+              URLs, QuoteImage)
+
+Both are measured in process (scraper in the API process) and after a
+pickle round trip (quotes received from a scraper worker process, as the
+"quotes" and "images" events deliver them).
+
+    cd backend && python benchmarks/quote_memory.py --quotes 100000
+"""
+
+import argparse
+import json
+import pickle
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from fixtures import AUTHORS, WORDS  # noqa: E402
+from core.records import QuoteBatch, QuoteImage, QuoteRecord  # noqa: E402
+
+BASE_URL = "https://www.brainyquote.com"
+
+# (text, author, slug, link, image_url, index, image) avec des chaînes neuves à chaque appel
+RawQuote = Tuple[str, str, str, str, str, int, Any]
+
+
+def fresh(value: str) -> str:
+    """New string object with the same value (as returned by get_attribute/inner_text)"""
+    return value.encode().decode()
+
+
+def raw_quotes(count: int, image_ratio: float, seed: int) -> List[Callable[[], RawQuote]]:
+    """Factories of the scraped fields of ``count`` quotes"""
+    rng = random.Random(seed)
+    factories = []
+    for index in range(count):
+        author = rng.choice(AUTHORS)
+        slug = author.lower().replace(" ", "-")
+        quote_id = rng.randint(100000, 999999)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "."
+        compact = author.lower().replace(" ", "")
+        has_image = rng.random() < image_ratio
+
+        def make(author=author, slug=slug, quote_id=quote_id, text=text, compact=compact, has_image=has_image,
+                 index=index) -> RawQuote:
+            link = f"{BASE_URL}/quotes/{slug.replace('-', '_')}_{quote_id}"
+            image_url, image = "", None
+            if has_image:
+                image_url = f"{BASE_URL}/photos_tr/en/{compact[0]}/{compact}/{quote_id}/{compact}1.jpg"
+                filename = f"quote_{fresh(author).replace(' ', '_')}_{index % 60}_{quote_id:x}.jpg"
+                image = (filename, f"cached_images/{filename}", fresh("image/jpeg"), 20_000 + quote_id % 60_000)
+            return fresh(text), fresh(author), fresh(slug), link, image_url, index % 60, image
+
+        factories.append(make)
+    return factories
+
+
+def as_dict(raw: RawQuote) -> Dict[str, Any]:
+    text, author, slug, link, image_url, index, image = raw
+    image_data = None
+    if image:
+        filename, local_path, content_type, size = image
+        image_data = {"filename": filename, "local_path": local_path, "content_type": content_type,
+                      "size": size, "original_url": fresh(image_url)}
+    return {"text": text, "author": author, "author_slug": slug, "link": link, "image_url": image_url,
+            "image_data": image_data, "index": index}
+
+
+def as_record(raw: RawQuote) -> QuoteRecord:
+    text, author, slug, link, image_url, index, image = raw
+    return QuoteRecord(text, author, slug, link, image_url, index, QuoteImage(*image) if image else None)
+
+
+def measure(build: Callable[[], Any]) -> Tuple[int, Any]:
+    """Bytes still allocated once ``build`` returns (its result is kept alive)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotes", type=int, default=50_000)
+    parser.add_argument("--image-ratio", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    factories = raw_quotes(args.quotes, args.image_ratio, args.seed)
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, convert, container in (("dict", as_dict, list), ("record", as_record, QuoteBatch)):
+        in_process, kept = measure(lambda: container(convert(make()) for make in factories))
+        payload = pickle.dumps(kept, protocol=pickle.HIGHEST_PROTOCOL)
+        del kept
+        received, kept = measure(lambda: pickle.loads(payload))
+        results[name] = {
+            "bytes_per_quote": round(in_process / args.quotes, 1),
+            "bytes_per_quote_from_worker": round(received / args.quotes, 1),
+            "pickled_bytes_per_quote": round(len(payload) / args.quotes, 1),
+        }
+        del kept, payload
+
+    results["saving"] = {
+        key: f"{100 * (1 - results['record'][key] / results['dict'][key]):.0f}%"
+        for key in results["dict"]
+    }
+    report = {"benchmark": "quote_memory", "quotes": args.quotes, "image_ratio": args.image_ratio,
+              "results": results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+
+if __name__ == "__main__":
+    main()
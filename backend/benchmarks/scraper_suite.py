@@ -0,0 +1,320 @@
+"""
+Benchmark suite of the scraper and the storage, offline.
+
+Topic pages and images come from a local fixture server (benchmarks/fixtures.py,
+recorded pages with --fixtures or a generated set), the scraper points at it
+through BRAINYQUOTE_BASE_URL and the storage writes to the in-memory Supabase
+stand-in (benchmarks/standins.py). Measured:
+
+    extraction    _extract_quotes_enhanced on a loaded page   quotes/s
+    scrape_topic  scrape_topic over every fixture page         pages/s
+    images        download_images of every fixture image       MB/s
+    storage       store_quotes_batch of every fixture quote    rows/s
+    job           POST /api/scrape/start until completed       seconds
+
+Benchmarks that need Chromium are reported as skipped when it cannot start.
+Results are JSON (with the git commit) and a previous run can be compared,
+regressions beyond --tolerance make the command fail:
+
+    cd backend && python benchmarks/scraper_suite.py --output bench.json
+    cd backend && python benchmarks/scraper_suite.py --compare bench.json
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "src"))
+
+from fixtures import FixtureServer, build_fixtures, fixture_images, page_path  # noqa: E402
+from standins import SupabaseStandIn, redirect_data_dirs  # noqa: E402
+from core.records import QuoteRecord  # noqa: E402
+
+# Citation d'une page générée par fixtures.build_fixtures
+QUOTE_PATTERN = re.compile(r'<a href="(/quotes/[^"]+)" class="b-qt[^"]*"[^>]*>\s*<div>(.*?)</div>.*?'
+                           r'title="view author">(.*?)</a>', re.S)
+
+# Métrique principale de chaque benchmark et son sens
+PRIMARY = {
+    "extraction": ("quotes_per_second", True),
+    "scrape_topic": ("pages_per_second", True),
+    "images": ("megabytes_per_second", True),
+    "storage": ("rows_per_second", True),
+    "job": ("median_seconds", False),
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(runs: List[float], amount: float, unit: str) -> Dict[str, Any]:
+    """Throughput over the median run, plus the raw timings"""
+    median = statistics.median(runs)
+    return {
+        unit: round(amount / median, 2) if median else None,
+        "median_seconds": round(median, 4),
+        "best_seconds": round(min(runs), 4),
+        "runs_seconds": [round(run, 4) for run in runs],
+    }
+
+
+async def timed_runs(repeats: int, run: Callable) -> List[float]:
+    """One warm-up, then ``repeats`` timed calls of ``run``"""
+    await run()
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await run()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def fixture_quotes(directory: Path, topic: str, base_url: str) -> List[QuoteRecord]:
+    """Quotes of generated fixture pages as the scraper returns them (input of the storage benchmark)"""
+    quotes = []
+    for page in sorted(Path(directory).glob(f"topics/{topic}-quotes*.html")):
+        for index, (link, text, author) in enumerate(QUOTE_PATTERN.findall(page.read_text(encoding="utf-8"))):
+            quotes.append(QuoteRecord(html.unescape(text), html.unescape(author), link=f"{base_url}{link}",
+                                      index=index))
+    return quotes
+
+
+async def bench_extraction(scraper, server: FixtureServer, topic: str, repeats: int) -> Dict[str, Any]:
+    context, page = await scraper._new_page()
+    try:
+        await page.goto(f"{server.url}/{page_path(topic, 1)}", wait_until="networkidle")
+        counts = []
+
+        async def run():
+            counts.append(len(await scraper._extract_quotes_enhanced(page, ".bqQt")))
+
+        runs = await timed_runs(repeats, run)
+    finally:
+        await context.close()
+    # L'extraction télécharge aussi l'image de chaque citation qui en a une
+    return {**summarize(runs, counts[-1], "quotes_per_second"), "quotes": counts[-1]}
+
+
+async def bench_scrape_topic(scraper, topic: str, pages: int, repeats: int) -> Dict[str, Any]:
+    counts = []
+
+    async def run():
+        counts.append(len(await scraper.scrape_topic(topic, max_pages=pages)))
+
+    runs = await timed_runs(repeats, run)
+    return {**summarize(runs, pages, "pages_per_second"), "pages": pages, "quotes": counts[-1]}
+
+
+async def bench_images(server: FixtureServer, repeats: int) -> Dict[str, Any]:
+    from scraper.brainyquote_hybrid import HybridBrainyQuoteScraper
+
+    scraper = HybridBrainyQuoteScraper()
+    paths = fixture_images(server.directory)
+    sizes = []
+
+    async def run():
+        quotes = [QuoteRecord("", "bench", image_url=f"{server.url}{path}", index=i) for i, path in enumerate(paths)]
+        images = await scraper.download_images(quotes)
+        sizes.append(sum(image.size for image in images if image is not None))
+
+    runs = await timed_runs(repeats, run)
+    megabytes = sizes[-1] / 1_000_000
+    return {**summarize(runs, megabytes, "megabytes_per_second"), "images": len(paths),
+            "megabytes": round(megabytes, 3)}
+
+
+async def bench_storage(standin: SupabaseStandIn, quotes: List[QuoteRecord], repeats: int) -> Dict[str, Any]:
+    from database.supabase_storage import SupabaseQuoteStorage
+    from search.near_duplicates import NearDuplicateDetector
+
+    stored = []
+
+    async def run():
+        # Table vide et index de doublons froid à chaque passage
+        standin.reset()
+        storage = SupabaseQuoteStorage(standin.url, "bench-key", near_duplicates=NearDuplicateDetector())
+        results = await storage.store_quotes_batch(quotes, topic="bench")
+        stored.append(results["stored_quotes"] + results["merged_duplicates"])
+
+    runs = await timed_runs(repeats, run)
+    return {**summarize(runs, stored[-1], "rows_per_second"), "rows": stored[-1],
+            "requests": dict(standin.requests)}
+
+
+def bench_job(topic: str, pages: int, repeats: int) -> Dict[str, Any]:
+    """Whole job through the API: scrape, images, WebSocket events, indexing and storage"""
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+
+    latencies, first_quotes, extracted = [], [], []
+    with TestClient(app_main.app) as client:
+        for _ in range(repeats + 1):
+            start = time.perf_counter()
+            response = client.post("/api/scrape/start", json={
+                "topic": topic, "max_pages": pages, "use_cache": False, "store_in_database": True
+            })
+            job_id = response.json()["data"]["job_id"]
+            first_quote = None
+            while True:
+                job = client.get(f"/api/jobs/{job_id}").json()
+                if first_quote is None and job["stats"]["extracted"]:
+                    first_quote = time.perf_counter() - start
+                if job["status"] not in ("queued", "starting", "running"):
+                    break
+                time.sleep(0.01)
+            if job["status"] != "completed":
+                raise RuntimeError(f"job ended with status {job['status']}: {job['error']}")
+            latencies.append(time.perf_counter() - start)
+            first_quotes.append(first_quote or latencies[-1])
+            extracted.append(job["stats"]["extracted"])
+    latencies, first_quotes = latencies[1:], first_quotes[1:]  # le premier job sert d'échauffement
+    return {
+        "median_seconds": round(statistics.median(latencies), 4),
+        "best_seconds": round(min(latencies), 4),
+        "runs_seconds": [round(latency, 4) for latency in latencies],
+        "median_first_quote_seconds": round(statistics.median(first_quotes), 4),
+        "quotes": extracted[-1],
+    }
+
+
+async def run_async_benchmarks(args, server: FixtureServer, standin: SupabaseStandIn, selected: List[str],
+                               pages: int, quotes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    if "images" in selected:
+        results["images"] = await bench_images(server, args.repeats)
+    if "storage" in selected:
+        results["storage"] = await bench_storage(standin, quotes, args.repeats)
+
+    browser_benchmarks = [name for name in ("extraction", "scrape_topic", "job") if name in selected]
+    if browser_benchmarks:
+        from scraper.brainyquote_hybrid import HybridBrainyQuoteScraper
+
+        try:
+            scraper = await HybridBrainyQuoteScraper().__aenter__()
+        except Exception as e:
+            for name in browser_benchmarks:
+                results[name] = {"skipped": f"browser unavailable: {str(e).strip().splitlines()[0]}"}
+            return results
+        try:
+            if "extraction" in selected:
+                results["extraction"] = await bench_extraction(scraper, server, args.topic, args.repeats)
+            if "scrape_topic" in selected:
+                results["scrape_topic"] = await bench_scrape_topic(scraper, args.topic, pages, args.repeats)
+        finally:
+            await scraper.__aexit__(None, None, None)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline_path: Path, tolerance: float) -> List[str]:
+    """Print the change of each primary metric; returns the regressions"""
+    baseline = json.loads(baseline_path.read_text())
+    regressions = []
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')}):")
+    for name, (metric, higher_is_better) in PRIMARY.items():
+        before = baseline.get("results", {}).get(name, {}).get(metric)
+        after = results.get(name, {}).get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > tolerance else "ok"
+        print(f"  {name:<13} {metric:<22} {before:>10} -> {after:<10} {change:+.1%}  {flag}")
+        if worse > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--benchmarks", default=",".join(PRIMARY), help="comma-separated subset")
+    parser.add_argument("--fixtures", type=Path, default=None,
+                        help="recorded fixture directory (default: a generated set)")
+    parser.add_argument("--topic", default="love")
+    parser.add_argument("--pages", type=int, default=3, help="pages of the generated set")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fixture response")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="seconds added to every stand-in request")
+    parser.add_argument("--request-delay-ms", type=int, default=0,
+                        help="REQUEST_DELAY of the scraper (the politeness delay is not what is measured)")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON results here")
+    parser.add_argument("--compare", type=Path, default=None, help="previous results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+    selected = [name.strip() for name in args.benchmarks.split(",") if name.strip() in PRIMARY]
+
+    workdir = Path(tempfile.mkdtemp(prefix="scraper-bench-"))
+    generated_dir = workdir / "fixtures"
+    build_fixtures(generated_dir, topic=args.topic, pages=args.pages)
+    fixtures_dir = args.fixtures or generated_dir
+    pages = len(list(Path(fixtures_dir).glob(f"topics/{args.topic}-quotes*.html")))
+
+    with FixtureServer(fixtures_dir, latency=args.latency) as server, \
+            SupabaseStandIn(latency=args.db_latency) as standin:
+        # Configuration lue à l'import des modules de src/ : à fixer avant
+        os.environ.update({
+            "BRAINYQUOTE_BASE_URL": server.url,
+            "REQUEST_DELAY": str(args.request_delay_ms),
+            "RATE_LIMIT_STATE_DIR": "",
+            "SUPABASE_URL": standin.url,
+            "SUPABASE_SERVICE_KEY": "bench-key",
+            "SUPABASE_ANON_KEY": "bench-key",
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+            "LOG_FILE": str(workdir / "scraper.log"),
+        })
+        os.chdir(workdir)  # images en cache, captures d'écran
+        from core.config import settings
+
+        redirect_data_dirs(settings, workdir)
+
+        # Mêmes lignes à stocker quelles que soient les pages servies
+        quotes = fixture_quotes(generated_dir, args.topic, server.url)
+        results = asyncio.run(run_async_benchmarks(args, server, standin, selected, pages, quotes))
+        if "job" in selected and "job" not in results:
+            standin.reset()
+            results["job"] = bench_job(args.topic, pages, args.repeats)
+
+    report = {
+        "suite": "scraper",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {"topic": args.topic, "pages": pages, "repeats": args.repeats, "latency": args.latency,
+                   "db_latency": args.db_latency, "request_delay_ms": args.request_delay_ms,
+                   "fixtures": str(args.fixtures) if args.fixtures else "generated"},
+        "results": {name: results[name] for name in selected if name in results},
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.tolerance)
+        if regressions:
+            sys.exit(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+In-memory stand-in for the Supabase endpoints used by SupabaseQuoteStorage.
+
+Speaks enough PostgREST (select with order/offset/limit, insert, upsert on
+a conflict column, update filtered by ``eq``, delete filtered by ``in``)
+and Storage (bucket list, object upload and removal) for the real supabase-py client to run against it, with an
+optional per-request latency to stand for the network round trip.
+
+    storage = SupabaseQuoteStorage(standin.url, "bench-key")
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+class SupabaseStandIn:
+    """Tables and buckets kept in memory behind a threaded HTTP server."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.objects: Dict[str, int] = {}  # chemin -> taille
+        self.requests: Counter = Counter()  # "METHOD /rest/v1/table" -> nombre
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+            self.objects.clear()
+            self.requests.clear()
+
+    # --- PostgREST ---
+
+    def _select(self, table: str, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        rows = [row for row in self.tables[table] if self._matches(row, query)]
+        order = query.get("order")
+        if order:
+            # "a.asc,b.desc" : tri stable en partant de la dernière clé
+            for key in reversed(order.split(",")):
+                column, _, direction = key.partition(".")
+                rows.sort(key=lambda row: str(row.get(column, "")), reverse=direction.startswith("desc"))
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        rows = rows[offset:offset + limit if limit is not None else None]
+        columns = query.get("select", "*")
+        if columns != "*":
+            wanted = columns.split(",")
+            rows = [{key: row.get(key) for key in wanted} for row in rows]
+        return rows
+
+    @staticmethod
+    def _matches(row: Dict[str, Any], query: Dict[str, str]) -> bool:
+        for column, condition in query.items():
+            if condition.startswith("eq.") and str(row.get(column)) != condition[3:]:
+                return False
+            if condition.startswith("in.(") and str(row.get(column)) not in condition[4:-1].split(","):
+                return False
+        return True
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str]) -> List[Dict[str, Any]]:
+        stored = []
+        existing = {row.get(on_conflict): row for row in self.tables[table]} if on_conflict else {}
+        for row in rows:
+            current = existing.get(row.get(on_conflict)) if on_conflict else None
+            if current is not None:
+                current.update(row)
+                stored.append(current)
+                continue
+            row = {"id": str(uuid.uuid4()), **row}
+            self.tables[table].append(row)
+            if on_conflict:
+                existing[row.get(on_conflict)] = row
+            stored.append(row)
+        return stored
+
+    def _update(self, table: str, query: Dict[str, str], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = [row for row in self.tables[table] if self._matches(row, query)]
+        for row in rows:
+            row.update(values)
+        return rows
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        parts = path.strip("/").split("/")
+        with self._lock:
+            if parts[:2] == ["rest", "v1"] and len(parts) == 3:
+                table = parts[2]
+                self.requests[f"{method} /rest/v1/{table}"] += 1
+                if method == "GET":
+                    return 200, self._select(table, query)
+                if method == "POST":
+                    rows = body if isinstance(body, list) else [body]
+                    return 201, self._insert(table, rows, query.get("on_conflict"))
+                if method == "PATCH":
+                    return 200, self._update(table, query, body)
+                if method == "DELETE":
+                    deleted = [row for row in self.tables[table] if self._matches(row, query)]
+                    self.tables[table] = [row for row in self.tables[table] if not self._matches(row, query)]
+                    return 200, deleted
+            if parts[:3] == ["rest", "v1", "rpc"]:
+                # Pas de fonctions SQL : même réponse que PostgREST pour une fonction inconnue
+                self.requests[f"{method} /rest/v1/rpc/{parts[3] if len(parts) > 3 else ''}"] += 1
+                return 404, {"code": "PGRST202", "message": f"Could not find the function {'/'.join(parts[3:])}",
+                             "details": None, "hint": None}
+            if parts[:2] == ["storage", "v1"]:
+                self.requests[f"{method} /storage/v1/{parts[2] if len(parts) > 2 else ''}"] += 1
+                if parts[2:] == ["bucket"] and method == "GET":
+                    return 200, [{"id": "quote-images", "name": "quote-images", "public": True,
+                                  "owner": "", "created_at": "", "updated_at": ""}]
+                if parts[2:3] == ["object"] and method == "POST":
+                    key = "/".join(parts[3:])
+                    self.objects[key] = len(body) if isinstance(body, (bytes, bytearray)) else 0
+                    return 200, {"Key": key, "Id": str(uuid.uuid4())}
+                if parts[2:3] == ["object"] and method == "DELETE":
+                    bucket = "/".join(parts[3:])
+                    removed = [prefix for prefix in body.get("prefixes", [])
+                               if self.objects.pop(f"{bucket}/{prefix}", None) is not None]
+                    return 200, [{"name": name} for name in removed]
+        return 404, {"message": f"{method} {path} not supported by the stand-in"}
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # en-têtes et corps écrits séparément
+
+            def _respond(self):
+                if standin.latency:
+                    time.sleep(standin.latency)
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body: Any = raw
+                if raw and "json" in (self.headers.get("Content-Type") or ""):
+                    body = json.loads(raw)
+                # HEAD (select count="exact", head=True) : le total seulement, dans Content-Range
+                head = self.command == "HEAD"
+                status, payload = standin.handle("GET" if head else self.command, url.path,
+                                                 dict(parse_qsl(url.query)), body)
+                data = b"" if head else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if head and isinstance(payload, list):
+                    self.send_header("Content-Range", f"*/{len(payload)}")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_HEAD = do_POST = do_PATCH = do_PUT = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "SupabaseStandIn":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="supabase-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "SupabaseStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def redirect_data_dirs(settings, workdir: Path):
+    """Point the data directories of the app settings (indexes, checkpoints, caches) to ``workdir``"""
+    workdir = Path(workdir)
+    for name in ("SCREENSHOTS_DIR", "CHECKPOINT_DIR", "TOPIC_CACHE_DIR", "PAGE_FINGERPRINT_DIR",
+                 "PROFILE_DIR", "VECTOR_INDEX_DIR"):
+        setattr(settings, name, workdir / name.lower())
+    settings.SEARCH_INDEX_FILE = workdir / "search_index" / "quotes.idx"
@@ -0,0 +1,170 @@
+"""
+Benchmark: WebSocket fan-out of a scraping job to many simulated clients.
+
+Compares the old sequential broadcast (await send_text on every socket,
+two messages per quote) with WebSocketBroadcaster (per-client queues,
+batched frames, progress coalescing, slow clients dropped).
+
+    cd backend && python benchmarks/websocket_fanout.py --clients 500 --quotes 500
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.broadcaster import WebSocketBroadcaster  # noqa: E402
+
+
+class SimulatedClient:
+    """Socket whose send_text takes ``latency`` seconds (None = never returns)"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.messages = 0
+        self.frames = 0
+        self.latencies = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        self.closed = True
+
+    async def send_text(self, text: str):
+        if self.latency is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.latency)
+        now = time.perf_counter()
+        data = json.loads(text)
+        messages = data["messages"] if data.get("type") == "batch" else [data]
+        self.frames += 1
+        self.messages += len(messages)
+        self.latencies.extend(now - m["t"] for m in messages if "t" in m)
+
+
+def make_clients(n: int, latency: float, slow: int, slow_latency: float, stalled: int):
+    clients = [SimulatedClient(latency) for _ in range(n - slow - stalled)]
+    clients += [SimulatedClient(slow_latency) for _ in range(slow)]
+    clients += [SimulatedClient(None) for _ in range(stalled)]
+    return clients
+
+
+def job_messages(quotes: int, batch: int, per_quote_progress: bool):
+    """Messages of a job in publishing order, grouped by scraper batch"""
+    for start in range(0, quotes, batch):
+        group = []
+        for i in range(start, min(start + batch, quotes)):
+            group.append({"type": "quote_extracted", "job_id": "bench",
+                          "quote": {"id": i, "text": "x" * 120, "author": "Someone"}})
+            if per_quote_progress:
+                group.append({"type": "progress", "job_id": "bench", "current": i + 1, "total": quotes})
+        if not per_quote_progress:
+            group.append({"type": "progress", "job_id": "bench", "current": group[-1]["quote"]["id"] + 1,
+                          "total": quotes})
+        yield group
+
+
+async def run_legacy(clients, quotes: int, batch: int):
+    """ConnectionManager.broadcast: one awaited send per client and per message"""
+    start = time.perf_counter()
+    for group in job_messages(quotes, batch, per_quote_progress=True):
+        for message in group:
+            message["t"] = time.perf_counter()
+            text = json.dumps(message)
+            for client in clients:
+                await client.send_text(text)
+    return time.perf_counter() - start, 0
+
+
+async def run_broadcaster(clients, quotes: int, batch: int, scrape_delay: float):
+    broadcaster = WebSocketBroadcaster(send_timeout=2.0)
+    for client in clients:
+        await broadcaster.connect(client)
+
+    start = time.perf_counter()
+    publish_time = 0.0
+    for group in job_messages(quotes, batch, per_quote_progress=False):
+        t0 = time.perf_counter()
+        for message in group:
+            message["t"] = time.perf_counter()
+            broadcaster.publish(message)
+        publish_time += time.perf_counter() - t0
+        await asyncio.sleep(scrape_delay)  # la page suivante est en cours d'extraction
+
+    # Attendre que les clients encore connectés aient tout reçu
+    deadline = time.perf_counter() + 30
+    while broadcaster.stats()["queued"] and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - start
+    dropped = broadcaster.dropped_clients
+    for client in list(broadcaster.active_connections):
+        broadcaster.disconnect(client)
+    return elapsed, dropped, publish_time
+
+
+def summarize(name, clients, elapsed, dropped, publish_time=None):
+    fast = [c for c in clients if c.latency is not None and not c.closed]
+    latencies = sorted(l for c in fast for l in c.latencies)
+    result = {
+        "mode": name,
+        "clients": len(clients),
+        "elapsed_s": round(elapsed, 3),
+        "dropped_clients": dropped,
+        "messages_per_client": round(statistics.mean(c.messages for c in fast), 1) if fast else 0,
+        "frames_per_client": round(statistics.mean(c.frames for c in fast), 1) if fast else 0,
+        "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+    }
+    if publish_time is not None:
+        result["job_blocked_ms"] = round(publish_time * 1000, 2)
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--quotes", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=50, help="quotes per scraper batch")
+    parser.add_argument("--latency", type=float, default=0.0005, help="send latency of a normal client (s)")
+    parser.add_argument("--slow", type=int, default=10, help="clients with a slow link")
+    parser.add_argument("--slow-latency", type=float, default=0.05)
+    parser.add_argument("--stalled", type=int, default=5, help="clients that never read (broadcaster only)")
+    parser.add_argument("--scrape-delay", type=float, default=0.05, help="pause between scraper batches (s)")
+    parser.add_argument("--legacy-quotes", type=int, default=20, help="quotes for the legacy run (it is slow)")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON results here")
+    args = parser.parse_args()
+
+    results = []
+
+    clients = make_clients(args.clients, args.latency, args.slow, args.slow_latency, 0)
+    elapsed, dropped = await run_legacy(clients, args.legacy_quotes, args.batch)
+    legacy = summarize("legacy", clients, elapsed, dropped)
+    legacy["quotes"] = args.legacy_quotes
+    legacy["job_blocked_ms"] = round(elapsed * 1000, 2)
+    results.append(legacy)
+
+    clients = make_clients(args.clients, args.latency, args.slow, args.slow_latency, args.stalled)
+    elapsed, dropped, publish_time = await run_broadcaster(clients, args.quotes, args.batch, args.scrape_delay)
+    current = summarize("broadcaster", clients, elapsed, dropped, publish_time)
+    current["quotes"] = args.quotes
+    results.append(current)
+
+    for result in results:
+        blocked_per_quote = result["job_blocked_ms"] / result["quotes"]
+        result["job_blocked_ms_per_quote"] = round(blocked_per_quote, 3)
+        print(json.dumps(result))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,10 +9,13 @@ CREATE TABLE IF NOT EXISTS quotes (
     id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
     text TEXT NOT NULL,
     author VARCHAR(255) NOT NULL,
+    author_slug VARCHAR(255),
+    author_id UUID,
     source_url TEXT,
     image_url TEXT,
     supabase_image_url TEXT,
     category VARCHAR(100) DEFAULT 'general',
+    topics TEXT[] DEFAULT '{}',
     extracted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -25,7 +28,10 @@ CREATE TABLE IF NOT EXISTS quotes (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_quotes_author ON quotes(author);
+CREATE INDEX IF NOT EXISTS idx_quotes_author_slug ON quotes(author_slug);
+CREATE INDEX IF NOT EXISTS idx_quotes_author_id ON quotes(author_id);
 CREATE INDEX IF NOT EXISTS idx_quotes_category ON quotes(category);
+CREATE INDEX IF NOT EXISTS idx_quotes_topics ON quotes USING gin(topics);
 CREATE INDEX IF NOT EXISTS idx_quotes_extracted_at ON quotes(extracted_at DESC);
 CREATE INDEX IF NOT EXISTS idx_quotes_text_search ON quotes USING gin(to_tsvector('english', text));
 CREATE INDEX IF NOT EXISTS idx_quotes_author_search ON quotes USING gin(to_tsvector('english', author));
@@ -49,7 +55,8 @@ CREATE TRIGGER update_quotes_updated_at
 -- Create authors table for normalization (optional)
 CREATE TABLE IF NOT EXISTS authors (
     id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    name VARCHAR(255) UNIQUE NOT NULL,
+    slug VARCHAR(255) UNIQUE NOT NULL,
+    name VARCHAR(255) NOT NULL,
     bio TEXT,
     birth_date DATE,
     death_date DATE,
@@ -59,6 +66,19 @@ CREATE TABLE IF NOT EXISTS authors (
     metadata JSONB DEFAULT '{}'
 );
 
+-- Migration for databases created before author normalization
+ALTER TABLE authors ADD COLUMN IF NOT EXISTS slug VARCHAR(255);
+ALTER TABLE authors DROP CONSTRAINT IF EXISTS authors_name_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_authors_slug ON authors(slug);
+ALTER TABLE quotes ADD COLUMN IF NOT EXISTS author_slug VARCHAR(255);
+ALTER TABLE quotes ADD COLUMN IF NOT EXISTS author_id UUID;
+ALTER TABLE quotes ADD COLUMN IF NOT EXISTS topics TEXT[] DEFAULT '{}';
+
+-- Quote -> author foreign key (authors is created after quotes)
+ALTER TABLE quotes DROP CONSTRAINT IF EXISTS quotes_author_id_fkey;
+ALTER TABLE quotes ADD CONSTRAINT quotes_author_id_fkey
+    FOREIGN KEY (author_id) REFERENCES authors(id) ON DELETE SET NULL;
+
 -- Create categories table
 CREATE TABLE IF NOT EXISTS categories (
     id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
@@ -43,6 +43,16 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_scraping_jobs_updated_at BEFORE UPDATE
     ON scraping_jobs FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Compteur de citations d'un job incrémenté côté base (plusieurs processus peuvent écrire le même job)
+CREATE OR REPLACE FUNCTION increment_job_quotes(p_job_id UUID, p_count INTEGER)
+RETURNS INTEGER AS $$
+    UPDATE scraping_jobs
+    SET total_quotes = COALESCE(total_quotes, 0) + p_count,
+        processed_quotes = COALESCE(processed_quotes, 0) + p_count
+    WHERE id = p_job_id
+    RETURNING total_quotes;
+$$ LANGUAGE sql;
+
 -- 5. RLS (Row Level Security) - Optionnel pour multi-utilisateurs
 -- ALTER TABLE scraping_jobs ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE quotes ENABLE ROW LEVEL SECURITY;
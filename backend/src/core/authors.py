@@ -0,0 +1,80 @@
+"""
+Normalisation des auteurs : une clé (slug) unique par auteur, identique à
+celle des URLs BrainyQuote (``/quotes/charles_r_swindoll_121806``).
+"""
+import re
+import unicodedata
+from typing import Dict, Optional
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+# Chemin complet d'une page citation (hôte optionnel) : le slug va jusqu'au dernier "_<id>"
+_QUOTE_LINK_RE = re.compile(r"(?:https?://[^/?#]+)?/quotes/([a-z0-9_]+)_\d+/?(?:[?#].*)?")
+
+UNKNOWN_AUTHOR_SLUG = "unknown"
+
+
+def author_slug(name: str) -> str:
+    """'Charles R. Swindoll' -> 'charles_r_swindoll'"""
+    folded = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    slug = _NON_ALNUM_RE.sub("_", folded.lower()).strip("_")
+    return slug or UNKNOWN_AUTHOR_SLUG
+
+
+def author_slug_from_link(link: str) -> Optional[str]:
+    """Slug auteur contenu dans un lien de citation, None si absent"""
+    match = _QUOTE_LINK_RE.fullmatch((link or "").strip().lower())
+    return match.group(1) if match else None
+
+
+def author_name_from_slug(slug: str) -> str:
+    """'sam_levenson' -> 'Sam Levenson'"""
+    return slug.replace("_", " ").title()
+
+
+class AuthorDirectory:
+    """Dictionnaire local des auteurs : variantes de noms -> slug -> id en base, en O(1)."""
+
+    def __init__(self):
+        self._slug_by_variant: Dict[str, str] = {}
+        self._name_by_slug: Dict[str, str] = {}
+        self._id_by_slug: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._name_by_slug)
+
+    def resolve(self, name: str, link: str = "") -> str:
+        """Slug canonique d'un auteur ; le slug du lien fait foi et rattache la variante du nom"""
+        variant = author_slug(name)
+        slug = author_slug_from_link(link) or self._slug_by_variant.get(variant, variant)
+        if variant != UNKNOWN_AUTHOR_SLUG:
+            self._slug_by_variant.setdefault(variant, slug)
+        if slug != UNKNOWN_AUTHOR_SLUG:
+            self._name_by_slug.setdefault(slug, name if variant != UNKNOWN_AUTHOR_SLUG else author_name_from_slug(slug))
+        return slug
+
+    def remember(self, slug: str, name: str) -> str:
+        """Rattache un slug déjà calculé (à l'extraction) au premier nom scrapé pour lui"""
+        variant = author_slug(name)
+        if variant != UNKNOWN_AUTHOR_SLUG:
+            self._slug_by_variant.setdefault(variant, slug)
+            if slug != UNKNOWN_AUTHOR_SLUG:
+                self._name_by_slug.setdefault(slug, name)
+        return slug
+
+    def lookup(self, name: str) -> str:
+        """Slug d'un nom sans l'enregistrer (recherches avec une saisie utilisateur)"""
+        variant = author_slug(name)
+        return self._slug_by_variant.get(variant, variant)
+
+    def name(self, slug: str) -> str:
+        return self._name_by_slug.get(slug) or author_name_from_slug(slug)
+
+    def author_id(self, slug: str) -> Optional[str]:
+        return self._id_by_slug.get(slug)
+
+    def set_author_id(self, slug: str, author_id: str):
+        self._id_by_slug[slug] = author_id
+
+    def missing_ids(self, slugs) -> list:
+        """Slugs connus localement mais pas encore rattachés à une ligne ``authors``"""
+        return [slug for slug in dict.fromkeys(slugs) if slug not in self._id_by_slug and slug != UNKNOWN_AUTHOR_SLUG]
@@ -0,0 +1,210 @@
+"""
+WebSocket fan-out without head-of-line blocking.
+
+Each client gets a bounded outbound queue drained by its own writer task,
+so publishing never awaits a socket. Messages are serialized once for
+every client; progress updates are coalesced (latest wins per job), all
+pending messages are sent as a single ``batch`` frame, and a client whose
+queue overflows or whose socket stalls is disconnected.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Types de messages dont seule la dernière valeur compte
+COALESCED_TYPES = frozenset({"progress"})
+
+# Close code "Try Again Later" pour les clients trop lents
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+class _Entry:
+    __slots__ = ("text", "key", "raw", "live")
+
+    def __init__(self, text: str, key: Optional[Tuple[str, Any]], raw: bool = False):
+        self.text = text
+        self.key = key
+        self.raw = raw  # texte non JSON (ex. "pong"), toujours envoyé seul
+        self.live = True
+
+
+class ClientChannel:
+    """Outbound queue and writer task of one connected client."""
+
+    def __init__(self, websocket, broadcaster: "WebSocketBroadcaster"):
+        self.websocket = websocket
+        self.broadcaster = broadcaster
+        self._entries: Deque[_Entry] = deque()
+        self._coalesced: Dict[Tuple[str, Any], _Entry] = {}
+        self._live = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.sent_frames = 0
+        self.sent_messages = 0
+        self.coalesced = 0
+        self.writer: Optional[asyncio.Task] = None
+
+    def push(self, text: str, key: Optional[Tuple[str, Any]] = None, raw: bool = False) -> bool:
+        """Queue a serialized message, False if the client is too far behind"""
+        if key is not None:
+            previous = self._coalesced.get(key)
+            if previous is not None:
+                previous.live = False
+                self._live -= 1
+                self.coalesced += 1
+
+        entry = _Entry(text, key, raw)
+        self._entries.append(entry)
+        self._live += 1
+        if key is not None:
+            self._coalesced[key] = entry
+
+        self._ready.set()
+        return self._live <= self.broadcaster.max_queue
+
+    def _drain(self) -> Tuple[List[str], bool]:
+        """Pending texts for the next frame, and whether it is a single raw text"""
+        texts, raw = [], False
+        while self._entries and len(texts) < self.broadcaster.max_batch:
+            entry = self._entries[0]
+            if entry.live and entry.raw and texts:
+                break
+            self._entries.popleft()
+            if not entry.live:
+                continue
+            self._live -= 1
+            if entry.key is not None and self._coalesced.get(entry.key) is entry:
+                del self._coalesced[entry.key]
+            texts.append(entry.text)
+            if entry.raw:
+                raw = True
+                break
+        if not self._live:
+            self._entries.clear()
+            self._ready.clear()
+        return texts, raw
+
+    async def run(self):
+        """Writer loop: one frame per wake-up with everything pending"""
+        try:
+            while True:
+                await self._ready.wait()
+                if self.broadcaster.flush_interval:
+                    # Laisse le temps aux messages suivants d'être regroupés dans la même trame
+                    await asyncio.sleep(self.broadcaster.flush_interval)
+                texts, raw = self._drain()
+                if not texts:
+                    continue
+                if raw or len(texts) == 1:
+                    frame = texts[0]
+                else:
+                    frame = '{"type": "batch", "messages": [' + ", ".join(texts) + ']}'
+                start = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send_text(frame), self.broadcaster.send_timeout)
+                metrics.WEBSOCKET_SEND_SECONDS.observe(time.perf_counter() - start)
+                metrics.WEBSOCKET_MESSAGES_TOTAL.inc(len(texts))
+                self.sent_frames += 1
+                self.sent_messages += len(texts)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"📡 WebSocket client stalled for {self.broadcaster.send_timeout}s, disconnecting it")
+            await self.broadcaster.drop(self.websocket)
+        except Exception as e:
+            logger.info(f"📡 WebSocket send failed ({e}), disconnecting client")
+            await self.broadcaster.drop(self.websocket)
+
+
+class WebSocketBroadcaster:
+    """Connection registry publishing JSON messages to every client without blocking the caller."""
+
+    def __init__(self, max_queue: int = 1000, max_batch: int = 200, flush_interval: float = 0.05,
+                 send_timeout: float = 5.0):
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.send_timeout = send_timeout
+        self.channels: Dict[Any, ClientChannel] = {}
+        self.dropped_clients = 0
+        self.published = 0
+
+    @property
+    def active_connections(self) -> List[Any]:
+        return list(self.channels)
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.register(websocket)
+
+    def register(self, websocket) -> ClientChannel:
+        """Start the writer of an already accepted connection"""
+        channel = ClientChannel(websocket, self)
+        channel.writer = asyncio.create_task(channel.run(), name="ws-writer")
+        self.channels[websocket] = channel
+        logger.info(f"📡 WebSocket connected. Total connections: {len(self.channels)}")
+        return channel
+
+    def disconnect(self, websocket):
+        channel = self.channels.pop(websocket, None)
+        if channel is None:
+            return
+        channel.closed = True
+        if channel.writer is not None and channel.writer is not asyncio.current_task():
+            channel.writer.cancel()
+        logger.info(f"📡 WebSocket disconnected. Total connections: {len(self.channels)}")
+
+    async def drop(self, websocket):
+        """Disconnect a slow or broken client and close its socket"""
+        if websocket not in self.channels:
+            return
+        self.dropped_clients += 1
+        self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CLIENT_CLOSE_CODE), 1.0)
+        except Exception:
+            pass
+
+    def send_personal_message(self, message: str, websocket):
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.push(message, raw=not message.startswith("{"))
+
+    def publish(self, message: Dict[str, Any]):
+        """Queue a message for every client (serialized once, never awaits a socket)"""
+        self.published += 1
+        if not self.channels:
+            return
+
+        text = json.dumps(message)
+        key = None
+        if message.get("type") in COALESCED_TYPES:
+            key = (message["type"], message.get("job_id"))
+
+        for websocket, channel in self.channels.items():
+            if channel.closed or channel.push(text, key):
+                continue
+            channel.closed = True
+            logger.warning(f"📡 WebSocket client is more than {self.max_queue} messages behind, disconnecting it")
+            asyncio.create_task(self.drop(websocket))
+
+        logger.debug("📡 Queued for %d connections: %.100s", len(self.channels), text)
+
+    async def broadcast(self, message: str):
+        """Publish an already serialized message (kept for callers of the old manager)"""
+        self.publish(json.loads(message))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self.channels),
+            "published": self.published,
+            "dropped_clients": self.dropped_clients,
+            "queued": sum(channel._live for channel in self.channels.values()),
+        }
@@ -0,0 +1,21 @@
+"""
+Compatibilité Python 3.10 (minimum documenté) pour les API asyncio de 3.11.
+"""
+import asyncio
+
+
+def current_task_cancelling(fallback: bool) -> bool:
+    """Whether the running task itself is being cancelled (not just a task it awaited)
+
+    Uses ``Task.cancelling()`` on Python 3.11+. On 3.10 the caller passes
+    ``fallback``, computed from its own stop flags.
+    """
+    cancelling = getattr(asyncio.current_task(), "cancelling", None)
+    return cancelling() > 0 if cancelling is not None else fallback
+
+
+def uncancel_current_task():
+    """Forget a handled cancellation request (no-op on Python 3.10, which does not count them)"""
+    uncancel = getattr(asyncio.current_task(), "uncancel", None)
+    if uncancel is not None:
+        uncancel()
@@ -0,0 +1,159 @@
+"""
+Adaptive concurrency limits (AIMD).
+
+A fixed number of parallel pages or image downloads is either too timid
+when the site answers fast or too aggressive once it starts throttling.
+``AdaptiveLimit`` is a semaphore whose size follows the outcomes of the
+work it admits: +1 per window of ``limit`` successes at stable latency
+(additive increase), times ``decrease`` on an error, a block detection, a
+429 or a latency rising well above its baseline (multiplicative
+decrease). Recent changes and their reasons are kept for ``stats()``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Raisons d'une diminution
+DECREASE_REASONS = ("error", "blocked", "throttled", "latency")
+
+
+class Lease:
+    """One admitted unit of work; ``latency`` may be set to exclude local waits from the sample"""
+    __slots__ = ("latency", "seq")
+
+    def __init__(self, seq: int):
+        self.latency: Optional[float] = None
+        self.seq = seq  # ordre d'admission
+
+
+class AdaptiveLimit:
+    """Semaphore with an AIMD-controlled size."""
+
+    def __init__(self, name: str, initial: int = 1, min_limit: int = 1, max_limit: int = 8,
+                 decrease: float = 0.5, latency_tolerance: float = 2.0, history: int = 50,
+                 is_failure: Callable[[BaseException], bool] = lambda e: True):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.is_failure = is_failure  # exceptions qui signalent un site en difficulté
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
+        self.changes: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._last_decrease = 0.0
+        self._admitted = 0
+        self._decrease_mark = 0  # admissions antérieures à la dernière diminution
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    # --- Admission ---
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Lease]:
+        """Run one unit of work under the limit; its latency or failure feeds the controller"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Une limite partagée par le processus peut survivre à sa boucle (tests, worker nodes)
+            self._loop, self._condition, self.in_flight = loop, asyncio.Condition(), 0
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current)
+            self.in_flight += 1
+            self._admitted += 1
+        lease = Lease(self._admitted)
+        start = time.perf_counter()
+        try:
+            yield lease
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.is_failure(e) and lease.seq > self._decrease_mark:
+                self.record_failure("error")
+            raise
+        else:
+            if lease.seq > self._decrease_mark:  # admise avant la dernière diminution : déjà prise en compte
+                self.record_success(lease.latency if lease.latency is not None else time.perf_counter() - start)
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    # --- Contrôle ---
+
+    def record_success(self, latency: float):
+        self.latency_ewma = latency if self.latency_ewma is None else 0.7 * self.latency_ewma + 0.3 * latency
+        if self.latency_baseline is None or latency < self.latency_baseline:
+            self.latency_baseline = latency
+        else:
+            # La référence remonte lentement pour suivre un site durablement plus lent
+            self.latency_baseline += 0.02 * (latency - self.latency_baseline)
+
+        if self.latency_ewma > self.latency_baseline * self.latency_tolerance:
+            self.record_failure("latency")
+        elif self.limit < self.max_limit:
+            self._set(min(self.max_limit, self.limit + 1 / self.current), "success")
+
+    def record_failure(self, reason: str):
+        """Multiplicative decrease, at most once per observed latency"""
+        now = time.monotonic()
+        cooldown = max(self.latency_ewma or 0.0, 0.5)
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self._decrease_mark = self._admitted
+        if reason == "latency":
+            self.latency_ewma = self.latency_baseline  # on repart de la référence après avoir réduit
+        self._set(max(self.min_limit, self.limit * self.decrease), reason)
+
+    def _set(self, limit: float, reason: str):
+        previous = self.current
+        self.limit = limit
+        if self.current == previous:
+            return
+        self.changes.append({"at": time.time(), "from": previous, "to": self.current, "reason": reason})
+        log = logger.info if reason == "success" else logger.warning
+        log(f"🎚️  {self.name} concurrency {previous} -> {self.current} ({reason})")
+        if self.current > previous and self._condition is not None:
+            asyncio.ensure_future(self._wake())
+
+    async def _wake(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "latency_baseline": round(self.latency_baseline, 3) if self.latency_baseline is not None else None,
+            "recent_changes": list(self.changes)[-10:],
+        }
+
+
+_limits: Dict[str, AdaptiveLimit] = {}
+
+
+def shared_limit(name: str, **options: Any) -> AdaptiveLimit:
+    """Adaptive limit ``name`` of this process (created with ``options`` on first use)"""
+    limit = _limits.get(name)
+    if limit is None:
+        limit = _limits[name] = AdaptiveLimit(name, **options)
+    return limit
+
+
+def concurrency_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limit.stats() for name, limit in _limits.items()}
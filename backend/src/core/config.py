@@ -32,6 +32,11 @@ settings = Settings()
 import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+# Chargé avant la lecture des réglages : config est importé avant main (et par les workers / worker_node)
+load_dotenv()
+
 class Settings:
     """Configuration de l'application"""
 
@@ -40,19 +45,45 @@ class Settings:
     PLAYWRIGHT_TIMEOUT = 30000
 
     # Scraping settings
+    BRAINYQUOTE_BASE_URL = os.getenv("BRAINYQUOTE_BASE_URL", "https://www.brainyquote.com").rstrip("/")  # serveur de fixtures en benchmark
     MAX_QUOTES_PER_TOPIC = 50
-    REQUEST_DELAY = 1  # secondes entre les requêtes
+    MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 2))  # jobs exécutés en parallèle
+    MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 100))
+    SCRAPER_WORKER_PROCESSES = int(os.getenv("SCRAPER_WORKER_PROCESSES", 0))  # 0 = scraping dans le processus API
+    MAX_CONCURRENT_PAGES = int(os.getenv("MAX_CONCURRENT_PAGES", 3))  # plafond du contrôle AIMD des pages
+    MAX_CONCURRENT_IMAGES = int(os.getenv("MAX_CONCURRENT_IMAGES", 8))  # plafond du contrôle AIMD des images
+    REQUEST_DELAY = int(os.getenv("REQUEST_DELAY", 1000)) / 1000  # secondes entre deux requêtes vers un même hôte
+    RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 1))
+    RATE_LIMIT_STATE_DIR = os.getenv("RATE_LIMIT_STATE_DIR", "")  # partage des limites entre processus, vide = par processus
+    RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", 3))
 
-    # Logging
-    LOG_LEVEL = "INFO"
-    LOG_FILE = "scraping.log"
+    # Topic result cache (TTL puis stale-while-revalidate, en secondes)
+    TOPIC_CACHE_TTL = int(os.getenv("TOPIC_CACHE_TTL", 6 * 3600))
+    TOPIC_CACHE_STALE_TTL = int(os.getenv("TOPIC_CACHE_STALE_TTL", 24 * 3600))
+    TOPIC_CACHE_MAX_ENTRIES = int(os.getenv("TOPIC_CACHE_MAX_ENTRIES", 64))
+
+    # Distributed workers (file de tâches topic/page partagée)
+    TASK_QUEUE_URL = os.getenv("TASK_QUEUE_URL", "")  # redis://host:6379/0 ou sqlite:///tasks.db, vide = désactivé
+    TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", 120))
+
+    # Logging (écrit par un thread dédié, voir core/log.py)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "httpx=WARNING")  # niveaux par module : "scraper.brainyquote_hybrid=WARNING,..."
+    LOG_FILE = os.getenv("LOG_FILE", "scraper.log")
+    LOG_REPEAT_BURST = int(os.getenv("LOG_REPEAT_BURST", 20))  # messages identiques tolérés par intervalle (0 = pas de limite)
+    LOG_REPEAT_INTERVAL = float(os.getenv("LOG_REPEAT_INTERVAL", 10))
+
+    # Profiler des jobs lancés avec profile=true
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
 
     # Paths
     BASE_DIR = Path(__file__).parent.parent.parent
     SCREENSHOTS_DIR = BASE_DIR / "screenshots"
-
-    def __init__(self):
-        # Créer les dossiers nécessaires
-        self.SCREENSHOTS_DIR.mkdir(exist_ok=True)
+    SEARCH_INDEX_FILE = BASE_DIR / "search_index" / "quotes.idx"
+    VECTOR_INDEX_DIR = BASE_DIR / "search_index"
+    CHECKPOINT_DIR = BASE_DIR / "checkpoints"
+    TOPIC_CACHE_DIR = BASE_DIR / "topic_cache"
+    PAGE_FINGERPRINT_DIR = BASE_DIR / "page_fingerprints"
+    PROFILE_DIR = BASE_DIR / "profiles"  # dossiers créés à la première écriture, pas à l'import
 
 settings = Settings()
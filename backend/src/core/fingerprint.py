@@ -0,0 +1,23 @@
+"""
+Empreintes stables des citations, partagées par l'index de recherche,
+la déduplication et les checkpoints.
+"""
+import hashlib
+import re
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_quote_text(text: str) -> str:
+    """Texte en minuscules, espaces compactés, sans guillemets ni points de suspension"""
+    text = _WHITESPACE_RE.sub(" ", (text or "").strip().lower())
+    text = text.strip('"“” ')
+    if text.endswith("..."):
+        text = text[:-3].rstrip()
+    return text
+
+
+def quote_fingerprint(text: str, author: str = "") -> str:
+    """Identifiant court et stable d'une citation (texte + auteur normalisés)"""
+    key = f"{normalize_quote_text(text)}\x1f{(author or '').strip().lower()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
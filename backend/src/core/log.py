@@ -0,0 +1,133 @@
+"""
+Non-blocking logging setup.
+
+The event loop only enqueues log records: a ``QueueHandler`` on the root
+logger hands them, unformatted, to a ``QueueListener`` thread that
+formats them and writes the console and the log file. Repetitive messages
+(same logger, level and format string) are rate limited before they are
+queued, and levels can be set per module from the configuration
+(``LOG_LEVELS=scraper.brainyquote_hybrid=WARNING,httpx=WARNING``).
+
+Hot paths log with %-style arguments so that nothing is formatted for
+records that are filtered out.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RepeatFilter(logging.Filter):
+    """Lets through ``burst`` records per format string and ``interval``, then counts the rest."""
+
+    def __init__(self, burst: int = 20, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[Tuple[str, int, str], list] = {}  # clé -> [début, émis, supprimés]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if len(self._windows) > 10000:
+                self._windows.clear()  # borne la mémoire si les messages ne sont pas des gabarits
+            if suppressed:
+                record.msg = f"{record.msg} (+{suppressed} similar messages suppressed)"
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread (records never leave the process)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """``"a.b=WARNING,c=DEBUG"`` -> {"a.b": 30, "c": 10}"""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return {name: level for name, level in levels.items() if isinstance(level, int)}
+
+
+def setup_logging(log_file: Optional[str] = None, level: str = "INFO", levels: str = "",
+                  fmt: str = LOG_FORMAT, repeat_burst: int = 20, repeat_interval: float = 10.0
+                  ) -> logging.handlers.QueueListener:
+    """Route every record through a queue to a background writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(fmt)
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(records)
+    queue_handler.addFilter(RepeatFilter(repeat_burst, repeat_interval))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(parse_levels(f"root={level}").get("root", logging.INFO))
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush the queue, stop the writer thread and write the late records synchronously"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+def setup_logging_from_settings(log_file: Optional[str] = None, fmt: str = LOG_FORMAT):
+    from core.config import settings
+
+    return setup_logging(
+        log_file=log_file,
+        level=settings.LOG_LEVEL,
+        levels=settings.LOG_LEVELS,
+        fmt=fmt,
+        repeat_burst=settings.LOG_REPEAT_BURST,
+        repeat_interval=settings.LOG_REPEAT_INTERVAL,
+    )
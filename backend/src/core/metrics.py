@@ -0,0 +1,238 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Counters, gauges and fixed-bucket histograms cheap enough to stay on in
+production: an observation is a dict lookup, a ``bisect`` and two
+additions, nothing is formatted until ``/metrics`` is scraped. Gauges can
+be computed at scrape time (queue depths). Worker processes send a
+snapshot of their counters and histograms after every job, and the API
+process adds them to its own values when rendering.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Latences (secondes) : de la milliseconde à la minute
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 30, 50, 100)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Labels, float]:
+        return dict(self.values)
+
+    def render(self, remote: Sequence[Dict[Labels, float]] = ()) -> List[str]:
+        totals = dict(self.values)
+        for values in remote:
+            for key, value in values.items():
+                key = tuple(key)
+                totals[key] = totals.get(key, 0) + value
+        lines = self.header()
+        for key, value in sorted(totals.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value set by the code, or computed by ``collect`` when /metrics is scraped"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Labels, float]]] = None):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Labels, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels: str):
+        self.values[self._key(labels)] = value
+
+    def render(self, remote=()) -> List[str]:
+        values = dict(self.values)
+        if self.collect is not None:
+            try:
+                values.update(self.collect())
+            except Exception:
+                pass  # une collecte en échec ne doit pas casser /metrics
+        lines = self.header()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Labels, List[float]] = {}  # [compte par bucket..., +Inf, somme]
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[Labels, List[float]]:
+        return {key: list(series) for key, series in self.series.items()}
+
+    def render(self, remote: Sequence[Dict[Labels, List[float]]] = ()) -> List[str]:
+        merged = {key: list(series) for key, series in self.series.items()}
+        for snapshot in remote:
+            for key, series in snapshot.items():
+                key = tuple(key)
+                if key in merged:
+                    merged[key] = [a + b for a, b in zip(merged[key], series)]
+                else:
+                    merged[key] = list(series)
+
+        lines = self.header()
+        for key, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Every metric of the process, plus the latest snapshots sent by worker processes."""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.remote: Dict[str, Dict[str, dict]] = {}  # source -> nom -> snapshot
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self.metrics.setdefault(metric.name, metric)
+        return self.metrics[metric.name]
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = (),
+              collect: Optional[Callable[[], Dict[Labels, float]]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, collect))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Counters and histograms of this process (picklable, for the API process)"""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()
+                if isinstance(metric, (Counter, Histogram))}
+
+    def merge_remote(self, source: str, snapshot: Dict[str, dict]):
+        """Latest cumulative snapshot of a worker process (replaces its previous one)"""
+        self.remote[source] = snapshot
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            remote = [snapshot[name] for snapshot in self.remote.values() if name in snapshot]
+            lines.extend(metric.render(remote))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Scraper ---
+PAGE_NAVIGATION_SECONDS = REGISTRY.histogram(
+    "scraper_page_navigation_seconds", "Time to load a topic page (page.goto until network idle)")
+PAGE_EXTRACTION_SECONDS = REGISTRY.histogram(
+    "scraper_page_extraction_seconds", "Time to extract the quotes of a loaded page")
+QUOTES_PER_PAGE = REGISTRY.histogram(
+    "scraper_quotes_per_page", "Quotes extracted per topic page", buckets=COUNT_BUCKETS)
+PAGES_TOTAL = REGISTRY.counter(
+    "scraper_pages_total", "Topic pages scraped by outcome", ["outcome"])
+IMAGE_DOWNLOAD_SECONDS = REGISTRY.histogram(
+    "scraper_image_download_seconds", "Latency of an image download")
+IMAGE_DOWNLOAD_BYTES = REGISTRY.histogram(
+    "scraper_image_download_bytes", "Size of the downloaded images", buckets=SIZE_BUCKETS)
+IMAGE_DOWNLOADS_TOTAL = REGISTRY.counter(
+    "scraper_image_downloads_total", "Image downloads by outcome", ["outcome"])
+
+# --- Stockage ---
+DB_BATCH_SECONDS = REGISTRY.histogram(
+    "storage_batch_seconds", "Time to store a batch of quotes in Supabase")
+DB_QUOTES_TOTAL = REGISTRY.counter(
+    "storage_quotes_total", "Quotes handled by the storage by outcome", ["outcome"])
+
+# --- WebSocket ---
+WEBSOCKET_SEND_SECONDS = REGISTRY.histogram(
+    "websocket_send_seconds", "Latency of a WebSocket frame send")
+WEBSOCKET_MESSAGES_TOTAL = REGISTRY.counter(
+    "websocket_messages_sent_total", "Messages sent to WebSocket clients (batched frames count each message)")
+
+# --- Jobs ---
+JOBS_TOTAL = REGISTRY.counter("scrape_jobs_total", "Finished scraping jobs by status", ["status"])
+JOB_DURATION_SECONDS = REGISTRY.histogram(
+    "scrape_job_duration_seconds", "Duration of scraping jobs",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
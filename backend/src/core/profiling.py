@@ -0,0 +1,250 @@
+"""
+Per-job phase profiles and an opt-in sampling profiler.
+
+Every job records a timeline of spans (queue wait, navigation, selector
+waits, extraction, images, storage, checkpoints...) tagged with the page
+they belong to. The scraper and the storage open spans with ``span()``,
+which finds the profile of the running job in a context variable: tasks
+created by the job inherit it, and outside of a job a span is a no-op.
+Pages are scraped concurrently, so phase totals can exceed the wall time.
+
+With ``profile=True`` a job also runs under ``StackSampler``, a thread
+that samples the stack of the event loop thread every few milliseconds.
+The folded stacks (``frame;frame;frame count``, the input format of
+flamegraph.pl and speedscope) are stored next to the job's summary in
+``PROFILE_DIR``. A sampler sees the whole loop thread, so jobs running
+at the same time in the same process show up in each other's profiles.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Spans gardés par job (au-delà, ils sont seulement comptés)
+MAX_SPANS = 5000
+
+# Spans renvoyés tels quels par /api/jobs/{id}/profile
+MAX_LISTED_SPANS = 500
+
+Span = Tuple[str, float, float, Optional[int], str]  # phase, début (s depuis le job), durée, page, source
+
+_current: ContextVar[Optional["JobProfile"]] = ContextVar("job_profile", default=None)
+
+
+class JobProfile:
+    """Timeline of the phases of one job."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.finished: Optional[float] = None
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.stacks: Counter = Counter()  # piles repliées du profiler, si activé
+        self.sampling: Optional[Dict[str, Any]] = None
+
+    def add(self, name: str, start: float, duration: float, page: Optional[int] = None, source: str = ""):
+        """Record a span starting ``start`` seconds after the job was created"""
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append((name, round(start, 4), round(duration, 4), page, source))
+
+    def record(self, name: str, start: float, page: Optional[int] = None):
+        """Record a span from ``start`` (a ``time.perf_counter()`` value) until now"""
+        self.add(name, start - self.origin, time.perf_counter() - start, page)
+
+    @contextmanager
+    def span(self, name: str, page: Optional[int] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, page)
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    # --- Profils venant d'un processus worker ---
+
+    def export(self) -> Dict[str, Any]:
+        """Picklable copy, merged by the API process with ``merge``"""
+        return {"started_at": self.started_at, "spans": self.spans, "dropped": self.dropped,
+                "stacks": dict(self.stacks)}
+
+    def merge(self, exported: Dict[str, Any], source: str):
+        """Add the spans and stacks of the same job recorded in another process"""
+        offset = exported["started_at"] - self.started_at  # horloges murales des deux processus
+        for name, start, duration, page, _ in exported["spans"]:
+            self.add(name, start + offset, duration, page, source)
+        self.dropped += exported.get("dropped", 0)
+        for stack, count in exported.get("stacks", {}).items():
+            self.stacks[f"{source};{stack}"] += count
+
+    # --- Rapport ---
+
+    def summary(self) -> Dict[str, Any]:
+        phases: Dict[str, Dict[str, float]] = {}
+        pages: Dict[int, Dict[str, float]] = defaultdict(dict)
+        for name, _, duration, page, _ in self.spans:
+            phase = phases.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            phase["count"] += 1
+            phase["total_seconds"] += duration
+            phase["max_seconds"] = max(phase["max_seconds"], duration)
+            if page is not None:
+                pages[page][name] = round(pages[page].get(name, 0.0) + duration, 4)
+
+        for phase in phases.values():
+            phase["mean_seconds"] = round(phase["total_seconds"] / phase["count"], 4)
+            phase["total_seconds"] = round(phase["total_seconds"], 4)
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "wall_seconds": round(end - self.origin, 3),
+            "phases": dict(sorted(phases.items(), key=lambda item: -item[1]["total_seconds"])),
+            "pages": {page: pages[page] for page in sorted(pages)},
+            "spans": [
+                {"phase": name, "start": start, "duration": duration, "page": page, "source": source or "api"}
+                for name, start, duration, page, source in sorted(self.spans, key=lambda s: s[1])[:MAX_LISTED_SPANS]
+            ],
+            "span_count": len(self.spans),
+            "dropped_spans": self.dropped,
+            "sampling": self.sampling,
+        }
+
+
+def current() -> Optional[JobProfile]:
+    return _current.get()
+
+
+def activate(profile: Optional[JobProfile]):
+    """Make ``profile`` the profile of the current task (and of the tasks it creates)"""
+    return _current.set(profile)
+
+
+def span(name: str, page: Optional[int] = None) -> ContextManager[None]:
+    """Time a phase of the current job (no-op outside of a job)"""
+    profile = _current.get()
+    if profile is None:
+        return nullcontext()
+    return profile.span(name, page)
+
+
+def record(name: str, start: float, page: Optional[int] = None):
+    """Record a phase of the current job that started at ``start`` (``time.perf_counter()``)"""
+    profile = _current.get()
+    if profile is not None:
+        profile.record(name, start, page)
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval and counts the folded stacks."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005, max_depth: int = 64):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = Path(code.co_filename)
+            label = self._labels[code] = f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if frames:
+            self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return self.stacks
+
+
+def top_frames(stacks: Dict[str, int], limit: int = 20) -> List[Dict[str, Any]]:
+    """Functions with the most samples on top of the stack (self) and anywhere in it (total)"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    samples = sum(stacks.values()) or 1
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [{"frame": frame, "self": round(count / samples, 4), "total": round(total[frame] / samples, 4)}
+            for frame, count in own.most_common(limit)]
+
+
+class ProfileStore:
+    """Summary (JSON) and folded stacks of the profiled jobs, one pair of files per job."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def folded_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.folded"
+
+    def _summary_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def _write(self, path: Path, text: str):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def save(self, job_id: str, summary: Dict[str, Any], stacks: Dict[str, int]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        folded = "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        self._write(self.folded_path(job_id), folded)
+        self._write(self._summary_path(job_id), json.dumps(summary, ensure_ascii=False, default=str))
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._summary_path(job_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not read profile of job {job_id}: {e}")
+            return None
+
+    def load_folded(self, job_id: str) -> Optional[str]:
+        try:
+            return self.folded_path(job_id).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
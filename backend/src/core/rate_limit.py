@@ -0,0 +1,189 @@
+"""
+Per-host rate limiting of outgoing requests.
+
+Every page navigation and image download reserves a slot on its host's
+token bucket (GCRA: one request per ``interval`` with bursts of
+``burst``). Reservations never hold a lock while waiting, so concurrent
+jobs simply queue up behind each other. With a state directory the
+buckets live in small lock-protected files and are shared by every
+process on the machine (scraper worker pool, worker nodes).
+
+A ``429``/``503`` answer pauses the host for its ``Retry-After`` and
+doubles its interval; each successful request then brings the interval
+back towards ``REQUEST_DELAY``, the politest rate we allow ourselves.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de partage entre processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Statuts signifiant "ralentissez"
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower() or url
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class BucketState:
+    """GCRA state of one host"""
+    interval: float  # secondes entre deux requêtes (adapté aux 429)
+    tat: float = 0.0  # theoretical arrival time de la prochaine requête
+    blocked_until: float = 0.0  # pause imposée par un Retry-After
+
+
+class HostRateLimiter:
+    """Token bucket per host, shared by the whole process (and optionally across processes)."""
+
+    def __init__(self, delay: float = 1.0, burst: int = 1, max_delay: float = 60.0,
+                 state_dir: Optional[Path] = None):
+        self.delay = max(0.0, delay)
+        self.burst = max(1, burst)
+        self.max_delay = max(max_delay, self.delay)
+        self.state_dir = Path(state_dir) if state_dir and fcntl is not None else None
+        self._states: Dict[str, BucketState] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+
+    # --- État (mémoire ou fichier verrouillé) ---
+
+    def _update(self, host: str, change):
+        """Apply ``change(state, now)`` atomically and return its result"""
+        if self.state_dir is None:
+            state = self._states.setdefault(host, BucketState(self.delay))
+            return change(state, time.time())
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self.state_dir / f"{re.sub(r'[^a-z0-9._-]+', '_', host)}.json"
+        with open(path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = BucketState(**json.loads(raw)) if raw else BucketState(self.delay)
+                except (ValueError, TypeError):
+                    state = BucketState(self.delay)
+                result = change(state, time.time())
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(asdict(state)))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return result
+
+    async def _apply(self, host: str, change):
+        if self.state_dir is None:
+            return self._update(host, change)
+        return await asyncio.to_thread(self._update, host, change)
+
+    def _count(self, host: str, key: str, value: float = 1):
+        counters = self.counters.setdefault(host, {"requests": 0, "throttled": 0, "waited_seconds": 0.0})
+        counters[key] += value
+
+    # --- API ---
+
+    async def acquire(self, url: str):
+        """Wait for the next request slot of the URL's host"""
+        host = host_of(url)
+
+        def reserve(state: BucketState, now: float) -> float:
+            tolerance = (self.burst - 1) * state.interval
+            slot = max(now, state.tat - tolerance, state.blocked_until)
+            state.tat = max(state.tat, slot) + state.interval
+            return slot - now
+
+        wait = await self._apply(host, reserve)
+        self._count(host, "requests")
+        if wait > 0:
+            self._count(host, "waited_seconds", wait)
+            await asyncio.sleep(wait)
+
+    async def throttled(self, url: str, retry_after: Optional[str] = None):
+        """The host answered 429/503: pause it and slow down"""
+        host = host_of(url)
+        pause = parse_retry_after(retry_after)
+
+        def slow_down(state: BucketState, now: float) -> float:
+            state.interval = min(self.max_delay, max(state.interval * 2, self.delay, 0.5))
+            state.blocked_until = max(state.blocked_until, now + (pause if pause is not None else state.interval))
+            state.tat = max(state.tat, state.blocked_until)
+            return state.interval
+
+        interval = await self._apply(host, slow_down)
+        self._count(host, "throttled")
+        logger.warning(f"🐢 {host} asked us to slow down (Retry-After={retry_after}), "
+                       f"pausing and spacing requests by {interval:.1f}s")
+
+    async def succeeded(self, url: str):
+        """Successful request: speed back up towards REQUEST_DELAY"""
+        host = host_of(url)
+        state = self._states.get(host)
+        if self.state_dir is None and (state is None or state.interval <= self.delay):
+            return
+
+        def speed_up(state: BucketState, now: float):
+            if state.interval > self.delay:
+                state.interval = max(self.delay, state.interval * 0.9)
+
+        await self._apply(host, speed_up)
+
+    async def observe(self, url: str, status: Optional[int], retry_after: Optional[str] = None) -> bool:
+        """Feed a response status to the limiter, True if the request has to be retried"""
+        if status in THROTTLE_STATUSES:
+            await self.throttled(url, retry_after)
+            return True
+        await self.succeeded(url)
+        return False
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {host: {**counters, "waited_seconds": round(counters["waited_seconds"], 2)}
+                for host, counters in self.counters.items()}
+
+
+_limiter: Optional[HostRateLimiter] = None
+
+
+def shared_rate_limiter() -> HostRateLimiter:
+    """Rate limiter of this process, configured from the settings"""
+    global _limiter
+    if _limiter is None:
+        from core.config import settings
+
+        state_dir = settings.RATE_LIMIT_STATE_DIR
+        _limiter = HostRateLimiter(
+            delay=settings.REQUEST_DELAY,
+            burst=settings.RATE_LIMIT_BURST,
+            state_dir=Path(state_dir) if state_dir else None,
+        )
+        if state_dir and _limiter.state_dir is None:
+            logger.warning("⚠️  fcntl unavailable, rate limits are not shared between processes")
+    return _limiter
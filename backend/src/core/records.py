@@ -0,0 +1,121 @@
+"""
+Représentation compacte des citations extraites.
+
+Une ``QuoteRecord`` garde une citation dans des slots (pas de ``__dict__`` par
+instance). Le nom et le slug de l'auteur, le lien et l'URL d'image sont
+internés : dans un crawl multi-topics les mêmes auteurs reviennent à chaque
+page, les mêmes citations dans plusieurs topics, et les copies reçues des
+processus de scraping partagent les chaînes des copies déjà en mémoire.
+L'empreinte (core.fingerprint) est calculée une seule fois. Les métadonnées
+de l'image téléchargée sont une ``QuoteImage`` et les citations d'une page
+ou d'un événement une ``QuoteBatch``.
+
+Les citations ne deviennent des dicts qu'aux frontières : réponses JSON et
+messages WebSocket, lignes Supabase, fichiers de checkpoint, de cache et de
+la file de tâches (``to_dict`` / ``from_dict``).
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+from core.fingerprint import quote_fingerprint
+
+
+def _intern(value: Optional[str]) -> str:
+    return sys.intern(value) if value else ""
+
+
+@dataclass(slots=True)
+class QuoteImage:
+    """Image of a quote downloaded to the local cache"""
+    filename: str
+    local_path: str
+    content_type: str = "image/jpeg"
+    size: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"filename": self.filename, "local_path": self.local_path,
+                "content_type": self.content_type, "size": self.size}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> Optional["QuoteImage"]:
+        if not data or not data.get("local_path"):
+            return None
+        return cls(data.get("filename") or "", data["local_path"],
+                   data.get("content_type") or "image/jpeg", data.get("size") or 0)
+
+
+@dataclass(slots=True, eq=False)
+class QuoteRecord:
+    """One scraped quote"""
+    text: str
+    author: str = "Unknown"
+    author_slug: str = ""
+    link: str = ""
+    image_url: str = ""
+    index: int = 0
+    image: Optional[QuoteImage] = None
+    fingerprint: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.author = _intern(self.author)
+        self.author_slug = _intern(self.author_slug)
+        self.link = _intern(self.link)
+        self.image_url = _intern(self.image_url)
+        self.fingerprint = quote_fingerprint(self.text, self.author)
+
+    def __reduce__(self):
+        # Reconstruit par le constructeur : chaînes internées dans le processus qui reçoit
+        return QuoteRecord, (self.text, self.author, self.author_slug, self.link, self.image_url,
+                             self.index, self.image)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "author": self.author,
+            "author_slug": self.author_slug,
+            "link": self.link,
+            "image_url": self.image_url,
+            "index": self.index,
+            "image_data": self.image.to_dict() if self.image else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "QuoteRecord":
+        return cls(
+            data.get("text") or "",
+            data.get("author") or "Unknown",
+            data.get("author_slug") or "",
+            data.get("link") or data.get("source_url") or "",
+            data.get("image_url") or "",
+            data.get("index") or 0,
+            QuoteImage.from_dict(data.get("image_data")),
+        )
+
+
+QuoteLike = Union[QuoteRecord, Mapping[str, Any]]
+
+
+class QuoteBatch(list):
+    """Quotes of one page or one event (a list of QuoteRecord, slices included)"""
+
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, quotes: Iterable[QuoteLike]) -> "QuoteBatch":
+        """Batch of records; dicts (files, task results, callers of the storage) are converted"""
+        return cls(quote if isinstance(quote, QuoteRecord) else QuoteRecord.from_dict(quote) for quote in quotes)
+
+    def __getitem__(self, item):
+        result = list.__getitem__(self, item)
+        return QuoteBatch(result) if isinstance(item, slice) else result
+
+    def fingerprints(self) -> List[str]:
+        return [quote.fingerprint for quote in self]
+
+    def images_downloaded(self) -> int:
+        return sum(1 for quote in self if quote.image is not None)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [quote.to_dict() for quote in self]
@@ -0,0 +1,271 @@
+"""
+Retries with jittered exponential backoff, retry budgets and circuit breakers.
+
+Each operation class (page navigation, image GET, database write, storage
+upload) has its own ``RetryPolicy``. Transient failures are retried after
+a "full jitter" backoff while the policy's retry budget allows it. A
+circuit breaker per operation and host opens after repeated failures, so
+calls fail fast (``CircuitOpenError``) while the host is down instead of
+burning minutes on doomed retries. Every call is accounted in
+``Retrier.stats()``, including the time spent on calls that failed anyway.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Statuts HTTP qui valent la peine d'être retentés
+TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class PermanentError(Exception):
+    """Failure that no retry will fix (blocked, not found, bad request...)"""
+
+
+class ThrottledError(Exception):
+    """The host answered 429/503; the rate limiter already paused it"""
+
+
+class CircuitOpenError(Exception):
+    """The breaker of this operation/host is open: failing fast"""
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether retrying the operation that raised ``exc`` can succeed"""
+    if isinstance(exc, (PermanentError, CircuitOpenError)):
+        return False
+    if isinstance(exc, (ThrottledError, asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = _status_of(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUSES
+    module = type(exc).__module__
+    if module.startswith("httpx") or module.startswith("httpcore"):
+        return True  # erreurs de transport (connexion, lecture, timeout)
+    if module.startswith("playwright"):
+        return True  # timeouts et erreurs réseau de navigation
+    if module.startswith("postgrest") or module.startswith("storage3"):
+        return False  # erreurs renvoyées par l'API (contrainte, requête invalide...)
+    return not isinstance(exc, (ValueError, TypeError, KeyError, AttributeError))
+
+
+def is_connect_failure(exc: BaseException) -> bool:
+    """The request surely never reached the server (safe to retry non-idempotent writes)"""
+    if _status_of(exc) in (429, 503):
+        return True
+    return type(exc).__name__ in ("ConnectError", "ConnectTimeout", "PoolTimeout") or isinstance(exc, ConnectionRefusedError)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How one class of operations is retried"""
+    name: str
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    retry_if: Callable[[BaseException], bool] = is_transient
+    budget_ratio: float = 0.2  # retries gagnés par appel
+    budget_burst: int = 10  # retries disponibles d'un coup
+    breaker_threshold: int = 5  # échecs consécutifs avant ouverture
+    breaker_reset: float = 30.0  # secondes avant un essai en half-open
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform between 0 and the exponential ceiling"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** retry))
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the calls, so an outage cannot multiply the load."""
+
+    def __init__(self, ratio: float, burst: int):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """closed -> open after ``threshold`` consecutive failures -> half-open after ``reset`` seconds."""
+
+    def __init__(self, threshold: int, reset: float):
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True  # un seul appel d'essai à la fois
+            return True
+        return False
+
+    def release(self):
+        """End a half-open trial that neither proved nor disproved the host"""
+        self._trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> bool:
+        """True if this failure (re)opened the breaker"""
+        self.failures += 1
+        if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+            self._trial = False
+            return True
+        return False
+
+
+Operation = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class Retrier:
+    """Runs operations under their policy, with one breaker per (operation, key)."""
+
+    def __init__(self, policies: Dict[str, RetryPolicy]):
+        self.policies = policies
+        self._budgets = {name: RetryBudget(p.budget_ratio, p.budget_burst) for name, p in policies.items()}
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.counters: Dict[str, Dict[str, float]] = {name: self._empty_counters() for name in policies}
+
+    @staticmethod
+    def _empty_counters() -> Dict[str, float]:
+        return {"calls": 0, "attempts": 0, "retries": 0, "successes": 0, "failures": 0,
+                "short_circuited": 0, "budget_exhausted": 0, "backoff_seconds": 0.0,
+                "failed_attempt_seconds": 0.0, "wasted_seconds": 0.0}
+
+    def breaker(self, operation: str, key: str = "") -> CircuitBreaker:
+        breaker = self._breakers.get((operation, key))
+        if breaker is None:
+            policy = self.policies[operation]
+            breaker = self._breakers[(operation, key)] = CircuitBreaker(policy.breaker_threshold, policy.breaker_reset)
+        return breaker
+
+    async def call(self, operation: str, fn: Operation, key: str = "") -> Any:
+        """Run ``fn`` (sync or async) until it succeeds or the policy gives up"""
+        policy = self.policies[operation]
+        budget = self._budgets[operation]
+        breaker = self.breaker(operation, key)
+        counters = self.counters[operation]
+        counters["calls"] += 1
+        budget.deposit()
+        start = time.perf_counter()
+
+        retry = 0
+        while True:
+            if not breaker.allow():
+                counters["short_circuited"] += 1
+                raise CircuitOpenError(f"{operation} circuit open for {key or 'all hosts'}")
+
+            counters["attempts"] += 1
+            attempt_start = time.perf_counter()
+            try:
+                result = fn()
+                if inspect.isawaitable(result):
+                    result = await result
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                counters["failed_attempt_seconds"] += time.perf_counter() - attempt_start
+                transient = policy.retry_if(e)
+                if not transient:
+                    breaker.release()
+                elif breaker.record_failure():
+                    logger.warning(f"🔌 Circuit '{operation}' opened for {key or 'all hosts'} "
+                                   f"for {policy.breaker_reset:.0f}s after {breaker.failures} failures")
+
+                give_up = not transient or retry + 1 >= policy.attempts or breaker.state == "open"
+                if not give_up and not budget.withdraw():
+                    counters["budget_exhausted"] += 1
+                    give_up = True
+                if give_up:
+                    counters["failures"] += 1
+                    if retry:
+                        counters["wasted_seconds"] += time.perf_counter() - start
+                    raise
+
+                delay = policy.backoff(retry)
+                retry += 1
+                counters["retries"] += 1
+                counters["backoff_seconds"] += delay
+                logger.warning(f"🔁 {operation} failed ({type(e).__name__}: {e}), "
+                               f"retry {retry}/{policy.attempts - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            counters["successes"] += 1
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        operations = {}
+        for name, counters in self.counters.items():
+            operations[name] = {k: round(v, 2) if isinstance(v, float) else v for k, v in counters.items()}
+            operations[name]["retry_budget"] = round(self._budgets[name].tokens, 1)
+        breakers = {f"{operation}:{key or '*'}": breaker.state
+                    for (operation, key), breaker in self._breakers.items() if breaker.state != "closed"}
+        return {"operations": operations, "open_breakers": breakers}
+
+
+def default_policies(attempts: int = 3) -> Dict[str, RetryPolicy]:
+    """Policies of the scraper and the storage"""
+    return {
+        "navigation": RetryPolicy("navigation", attempts=attempts, base_delay=2.0, max_delay=30.0,
+                                  breaker_threshold=5, breaker_reset=60.0),
+        "image_get": RetryPolicy("image_get", attempts=attempts, base_delay=0.5, max_delay=8.0,
+                                 breaker_threshold=10, breaker_reset=30.0),
+        # Un insert peut avoir abouti si la réponse s'est perdue : on ne retente que les échecs de connexion
+        "db_write": RetryPolicy("db_write", attempts=attempts + 1, base_delay=0.5, max_delay=10.0,
+                                retry_if=is_connect_failure, breaker_threshold=5, breaker_reset=30.0),
+        "db_upsert": RetryPolicy("db_upsert", attempts=attempts + 1, base_delay=0.5, max_delay=10.0,
+                                 breaker_threshold=5, breaker_reset=30.0),
+        "storage_upload": RetryPolicy("storage_upload", attempts=attempts, base_delay=1.0, max_delay=15.0,
+                                      breaker_threshold=5, breaker_reset=30.0),
+    }
+
+
+_retrier: Optional[Retrier] = None
+
+
+def shared_retrier() -> Retrier:
+    """Retrier of this process, configured from the settings"""
+    global _retrier
+    if _retrier is None:
+        from core.config import settings
+
+        _retrier = Retrier(default_policies(max(1, settings.RETRY_ATTEMPTS)))
+    return _retrier
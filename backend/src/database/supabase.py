@@ -1,18 +1,31 @@
-from supabase import create_client, Client
 from src.core.config import settings
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any
 import logging
 from datetime import datetime
 import uuid
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
+# Statuts pour lesquels un job ne bouge plus : son résumé peut être mémorisé
+# (ceux que l'API écrit, voir jobs.scheduler.FINISHED_STATUSES)
+FINISHED_JOB_STATUSES = {"completed", "error", "stopped"}
+
+# Fonction SQL absente : PostgREST (schéma en cache) ou Postgres (undefined_function)
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
 class SupabaseClient:
     def __init__(self):
-        self.client: Client = create_client(
+        from supabase import create_client
+
+        self.client: "Client" = create_client(
             settings.SUPABASE_URL,
             settings.SUPABASE_KEY
         )
+        # Memoized statistics of finished jobs (job_id -> summary)
+        self._job_summary_cache: Dict[str, Dict[str, Any]] = {}
 
     async def create_scraping_job(self, topic: str, user_id: Optional[str] = None) -> str:
         """Create a new scraping job and return its ID"""
@@ -41,6 +54,7 @@ class SupabaseClient:
         try:
             updates["updated_at"] = datetime.utcnow().isoformat()
             response = self.client.table("scraping_jobs").update(updates).eq("id", job_id).execute()
+            self._job_summary_cache.pop(job_id, None)
             return True
         except Exception as e:
             logger.error(f"Error updating scraping job {job_id}: {str(e)}")
@@ -81,6 +95,11 @@ class SupabaseClient:
                 response = self.client.table("quotes").insert(batch).execute()
                 logger.info(f"Saved batch of {len(batch)} quotes")
 
+            # Keep the job counters up to date so statistics never need to count rows
+            if quotes_data:
+                await self._increment_job_quotes(job_id, len(quotes_data))
+                self._job_summary_cache.pop(job_id, None)
+
             logger.info(f"Successfully saved {len(quotes)} quotes for job {job_id}")
             return True
 
@@ -126,6 +145,7 @@ class SupabaseClient:
 
             # Delete job
             self.client.table("scraping_jobs").delete().eq("id", job_id).execute()
+            self._job_summary_cache.pop(job_id, None)
 
             logger.info(f"Deleted job {job_id} and its quotes")
             return True
@@ -152,25 +172,60 @@ class SupabaseClient:
             logger.error(f"Error exporting quotes for job {job_id}: {str(e)}")
             return None
 
+    async def count_quotes_by_job(self, job_id: str) -> int:
+        """Count quotes of a job with a head request (no rows transferred)"""
+        response = (
+            self.client.table("quotes")
+            .select("id", count="exact", head=True)
+            .eq("job_id", job_id)
+            .execute()
+        )
+        return response.count or 0
+
+    async def _increment_job_quotes(self, job_id: str, count: int):
+        """Add ``count`` to the job counters in SQL (safe with several writers of the same job)
+
+        Never raises: the quotes are already inserted, a failed counter update
+        must not make the caller retry (and insert them twice).
+        """
+        try:
+            self.client.rpc("increment_job_quotes", {"p_job_id": job_id, "p_count": count}).execute()
+            return
+        except Exception as e:
+            if getattr(e, "code", None) not in MISSING_FUNCTION_CODES:
+                logger.error(f"Could not update the quote counters of job {job_id}: {str(e)}")
+                return
+            # Fonction increment_job_quotes absente (base créée avant) : recompter après l'insertion
+            logger.warning(f"increment_job_quotes unavailable ({e}), recounting job {job_id}")
+
+        try:
+            saved = await self.count_quotes_by_job(job_id)
+            self.client.table("scraping_jobs").update({
+                "total_quotes": saved,
+                "processed_quotes": saved,
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", job_id).execute()
+        except Exception as e:
+            logger.error(f"Could not recount the quotes of job {job_id}: {str(e)}")
+
     async def get_job_statistics(self, job_id: str) -> Dict[str, Any]:
         """Get statistics for a job"""
+        cached = self._job_summary_cache.get(job_id)
+        if cached is not None:
+            return dict(cached)
+
         try:
-            # Get job info
+            # Get job info (total_quotes is maintained by save_quotes)
             job = await self.get_scraping_job(job_id)
             if not job:
                 return {}
 
-            # Get quote count
-            response = (
-                self.client.table("quotes")
-                .select("id", count="exact")
-                .eq("job_id", job_id)
-                .execute()
-            )
-
-            quote_count = len(response.data) if response.data else 0
+            # Rows written by older versions never had their counter updated
+            quote_count = job.get("total_quotes") or 0
+            if not quote_count:
+                quote_count = await self.count_quotes_by_job(job_id)
 
-            return {
+            summary = {
                 "job_id": job_id,
                 "topic": job.get("topic", ""),
                 "status": job.get("status", ""),
@@ -180,6 +235,12 @@ class SupabaseClient:
                 "duration": self._calculate_duration(job.get("created_at"), job.get("updated_at"))
             }
 
+            # A finished job no longer changes: answer later polls from memory
+            if summary["status"] in FINISHED_JOB_STATUSES:
+                self._job_summary_cache[job_id] = summary
+
+            return dict(summary)
+
         except Exception as e:
             logger.error(f"Error getting statistics for job {job_id}: {str(e)}")
             return {}
@@ -209,5 +270,19 @@ class SupabaseClient:
         except Exception:
             return None
 
-# Global instance
-supabase_client = SupabaseClient()
\ No newline at end of file
+_supabase_client: Optional[SupabaseClient] = None
+
+
+def shared_supabase_client() -> SupabaseClient:
+    """Client of this process, built on first use rather than at import time"""
+    global _supabase_client
+    if _supabase_client is None:
+        _supabase_client = SupabaseClient()
+    return _supabase_client
+
+
+def __getattr__(name: str):
+    # Ancien accès "from database.supabase import supabase_client", désormais paresseux
+    if name == "supabase_client":
+        return shared_supabase_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
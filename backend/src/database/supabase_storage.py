@@ -4,25 +4,53 @@ Database operations for storing quotes and images in Supabase.
 
 import asyncio
 import logging
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Any
 from pathlib import Path
 import json
 from datetime import datetime
 import hashlib
 import os
+import time
+import weakref
 
-try:
-    from supabase import create_client, Client
-    import httpx
-except ImportError:
-    raise ImportError("Please install supabase and httpx: pip install supabase httpx")
+from core import metrics, profiling
+from core.authors import AuthorDirectory
+from core.records import QuoteBatch, QuoteImage, QuoteLike, QuoteRecord
+from core.rate_limit import host_of
+from core.retry import shared_retrier
+from search.near_duplicates import NearDuplicateDetector
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Taille des lots d'upsert dans la table authors
+AUTHOR_UPSERT_BATCH_SIZE = 500
+
+# Taille des pages lues pour la déduplication
+DEDUP_PAGE_SIZE = 1000
+
+# Ids par requête de suppression : in.(...) part dans l'URL (~37 octets par UUID)
+DEDUP_DELETE_BATCH_SIZE = 100
+
+# Chargement en cours / terminé des signatures existantes, par détecteur (partagé entre les jobs de l'API)
+_near_duplicate_warmups: "weakref.WeakKeyDictionary[NearDuplicateDetector, asyncio.Task]" = weakref.WeakKeyDictionary()
+
+
+def create_supabase_client(url: str, key: str) -> "Client":
+    """supabase-py client; the package (and httpx) is imported on first use, not with this module"""
+    try:
+        from supabase import create_client
+    except ImportError:
+        raise ImportError("Please install supabase and httpx: pip install supabase httpx")
+    return create_client(url, key)
+
 class SupabaseQuoteStorage:
     """Handles storing quotes and images in Supabase."""
 
-    def __init__(self, supabase_url: str = None, supabase_key: str = None):
+    def __init__(self, supabase_url: str = None, supabase_key: str = None,
+                 near_duplicates: Optional[NearDuplicateDetector] = None):
         """Initialize Supabase client."""
         self.supabase_url = supabase_url or os.getenv('SUPABASE_URL')
         # Use service key for write operations, fallback to anon key
@@ -31,9 +59,17 @@ class SupabaseQuoteStorage:
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("Supabase URL and key must be provided via parameters or environment variables")
 
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.supabase: "Client" = create_supabase_client(self.supabase_url, self.supabase_key)
         self.quotes_table = "quotes"
+        self.authors_table = "authors"
         self.storage_bucket = "quote-images"
+        self.authors = AuthorDirectory()
+        # Shared between jobs by the API so it is only warmed once per process
+        self.near_duplicates = near_duplicates if near_duplicates is not None else NearDuplicateDetector()
+        self._near_duplicates_warm = len(self.near_duplicates) > 0
+        # Backoff et circuit breaker des écritures, par hôte Supabase
+        self.retrier = shared_retrier()
+        self._host = host_of(self.supabase_url)
 
     async def setup_database(self):
         """Create the quotes table if it doesn't exist."""
@@ -94,16 +130,16 @@ class SupabaseQuoteStorage:
 
         return f"quote_{clean_author}_{index}_{url_hash}.jpg"
 
-    async def upload_image_to_supabase(self, image_data: Dict, quote_id: str) -> Optional[str]:
+    async def upload_image_to_supabase(self, image: QuoteImage, quote_id: str) -> Optional[str]:
         """Upload image to Supabase storage."""
         try:
-            local_path = image_data.get('local_path')
+            local_path = image.local_path
             if not local_path or not Path(local_path).exists():
                 logger.warning(f"⚠️  Image file not found: {local_path}")
                 return None
 
             # Generate storage filename
-            filename = image_data.get('filename')
+            filename = image.filename
             if not filename:
                 filename = f"quote_{quote_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
 
@@ -112,66 +148,100 @@ class SupabaseQuoteStorage:
                 image_bytes = f.read()
 
             # Upload to Supabase storage
-            result = self.supabase.storage.from_(self.storage_bucket).upload(
+            result = await self.retrier.call("storage_upload", lambda: self.supabase.storage.from_(self.storage_bucket).upload(
                 filename,
                 image_bytes,
-                file_options={"content-type": image_data.get('content_type', 'image/jpeg')}
-            )
+                file_options={"content-type": image.content_type}
+            ), key=self._host)
 
             if result:
                 # Get public URL
                 public_url = self.supabase.storage.from_(self.storage_bucket).get_public_url(filename)
-                logger.info(f"✅ Uploaded image: {filename}")
+                logger.info("✅ Uploaded image: %s", filename)
                 return public_url
             else:
                 logger.error(f"❌ Failed to upload image: {filename}")
                 return None
 
         except Exception as e:
-            logger.error(f"❌ Error uploading image: {e}")
+            logger.error("❌ Error uploading image: %s", e)
             return None
 
-    async def store_quote(self, quote_data: Dict) -> Optional[str]:
+    def _author_slug(self, quote: QuoteRecord) -> str:
+        """Normalized author key of a quote (computed at extraction time when available)."""
+        if quote.author_slug:
+            # Le nom scrapé est gardé pour la ligne authors (pas de reconstruction depuis le slug)
+            return self.authors.remember(quote.author_slug, quote.author)
+        return self.authors.resolve(quote.author, quote.link)
+
+    async def upsert_authors(self, quotes: List[QuoteRecord]) -> int:
+        """Upsert the authors of a batch of quotes and remember their ids."""
+        slugs = [self._author_slug(quote) for quote in quotes]
+
+        missing = self.authors.missing_ids(slugs)
+        for i in range(0, len(missing), AUTHOR_UPSERT_BATCH_SIZE):
+            rows = [
+                {"slug": slug, "name": self.authors.name(slug)}
+                for slug in missing[i:i + AUTHOR_UPSERT_BATCH_SIZE]
+            ]
+            result = await self.retrier.call(
+                "db_upsert",
+                lambda: self.supabase.table(self.authors_table).upsert(rows, on_conflict="slug").execute(),
+                key=self._host
+            )
+            for row in result.data or []:
+                self.authors.set_author_id(row['slug'], row['id'])
+
+        if missing:
+            logger.info(f"👤 Upserted {len(missing)} authors")
+        return len(missing)
+
+    async def store_quote(self, quote: QuoteRecord, topic: Optional[str] = None) -> Optional[str]:
         """Store a single quote in Supabase."""
         try:
-            # Prepare quote data for database
+            category = topic or 'general'
+            author_slug = self._author_slug(quote)
+
+            # Row of the quotes table, built from the record
             db_quote = {
-                "text": quote_data.get('text'),
-                "author": quote_data.get('author'),
-                "source_url": quote_data.get('link'),
-                "image_url": quote_data.get('image_url'),
-                "category": quote_data.get('category', 'general'),
+                "text": quote.text,
+                "author": quote.author,
+                "author_slug": author_slug,
+                "author_id": self.authors.author_id(author_slug),
+                "source_url": quote.link,
+                "image_url": quote.image_url,
+                "category": category,
+                "topics": [category],
                 "extracted_at": datetime.now().isoformat(),
                 "metadata": {
-                    "index": quote_data.get('index'),
-                    "original_image_url": quote_data.get('image_url'),
-                    "image_size": quote_data.get('image_data', {}).get('size'),
+                    "index": quote.index,
+                    "original_image_url": quote.image_url,
+                    "image_size": quote.image.size if quote.image else None,
                     "extraction_method": "hybrid_scraper"
                 }
             }
 
             # Insert quote into database
-            result = self.supabase.table(self.quotes_table).insert(db_quote).execute()
+            result = await self.retrier.call(
+                "db_write", lambda: self.supabase.table(self.quotes_table).insert(db_quote).execute(), key=self._host
+            )
 
             if result.data:
                 quote_id = result.data[0]['id']
-                logger.info(f"✅ Stored quote: {quote_id} - {quote_data.get('author')}")
+                logger.info("✅ Stored quote: %s - %s", quote_id, quote.author)
 
                 # Upload image if available
-                if quote_data.get('image_data'):
-                    image_url = await self.upload_image_to_supabase(
-                        quote_data['image_data'],
-                        str(quote_id)
-                    )
+                if quote.image:
+                    image_url = await self.upload_image_to_supabase(quote.image, str(quote_id))
 
                     if image_url:
                         # Update quote with Supabase image URL
-                        update_result = self.supabase.table(self.quotes_table).update({
+                        update_result = await self.retrier.call("db_upsert", lambda: self.supabase.table(self.quotes_table).update({
                             "supabase_image_url": image_url
-                        }).eq('id', quote_id).execute()
+                        }).eq('id', quote_id).execute(), key=self._host)
 
                         if update_result.data:
-                            logger.info(f"✅ Updated quote {quote_id} with Supabase image URL")
+                            logger.info("✅ Updated quote %s with Supabase image URL", quote_id)
 
                 return str(quote_id)
             else:
@@ -179,54 +249,226 @@ class SupabaseQuoteStorage:
                 return None
 
         except Exception as e:
-            logger.error(f"❌ Error storing quote: {e}")
+            logger.error("❌ Error storing quote: %s", e)
             return None
 
-    async def store_quotes_batch(self, quotes: List[Dict]) -> Dict[str, Any]:
-        """Store multiple quotes in Supabase."""
+    def _iter_quote_rows(self, columns: str, page_size: int = DEDUP_PAGE_SIZE):
+        """Page through the whole quotes table, oldest first (blocking, run it in a thread)."""
+        offset = 0
+        while True:
+            # id départage les extracted_at égaux : ordre total, aucune ligne sautée ou lue deux fois
+            result = (
+                self.supabase.table(self.quotes_table)
+                .select(columns)
+                .order('extracted_at')
+                .order('id')
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            rows = result.data or []
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
+    async def warm_near_duplicates(self):
+        """Load signatures of the quotes already stored so ingest can detect their variants."""
+        if self._near_duplicates_warm:
+            return
+        # Un seul chargement par détecteur partagé : les lots concurrents l'attendent
+        warmup = _near_duplicate_warmups.get(self.near_duplicates)
+        if warmup is None or (warmup.done() and (warmup.cancelled() or warmup.exception() is not None)):
+            warmup = asyncio.create_task(self._load_near_duplicates())
+            _near_duplicate_warmups[self.near_duplicates] = warmup
+        # shield : un job arrêté pendant le chargement ne l'annule pas pour les autres
+        await asyncio.shield(warmup)
+        self._near_duplicates_warm = True
+
+    async def _load_near_duplicates(self):
+        start = time.perf_counter()
+        # Pagination (appels supabase-py bloquants) et signatures hors de la boucle, fusion en O(1) ensuite
+        loaded = await asyncio.to_thread(self._scan_near_duplicates, self.near_duplicates.empty_copy())
+        self.near_duplicates.merge(loaded)
+        logger.info(f"🧬 Near-duplicate index warmed with {len(self.near_duplicates)} quotes in {time.perf_counter() - start:.2f}s")
+
+    def _scan_near_duplicates(self, detector: NearDuplicateDetector) -> NearDuplicateDetector:
+        for row in self._iter_quote_rows("id,text,category,topics"):
+            detector.insert(row['id'], detector.signature(row['text']))
+            detector.topics[row['id']].update(row.get('topics') or [row.get('category') or 'general'])
+        return detector
+
+    async def _update_topics(self, quote_ids) -> int:
+        """Write the merged topic tags of canonical quotes."""
+        updated = 0
+        for quote_id in quote_ids:
+            topics = sorted(self.near_duplicates.topics.get(quote_id, ()))
+            await self.retrier.call(
+                "db_upsert",
+                lambda: self.supabase.table(self.quotes_table).update({"topics": topics}).eq('id', quote_id).execute(),
+                key=self._host
+            )
+            updated += 1
+        return updated
+
+    async def store_quotes_batch(self, quotes: Iterable[QuoteLike], topic: Optional[str] = None) -> Dict[str, Any]:
+        """Store multiple quotes in Supabase, merging near-duplicates into their canonical quote."""
+        quotes = QuoteBatch.of(quotes)
         results = {
             "stored_quotes": 0,
             "uploaded_images": 0,
+            "merged_duplicates": 0,
             "errors": 0,
-            "quote_ids": []
+            "quote_ids": [],
+            "persisted_fingerprints": []  # citations stockées ou fusionnées dans une citation existante
         }
 
         logger.info(f"🚀 Starting batch storage of {len(quotes)} quotes to Supabase...")
+        batch_start = time.perf_counter()
 
+        # Authors first, so every quote row gets its author_id
+        try:
+            with profiling.span("db_authors"):
+                await self.upsert_authors(quotes)
+        except Exception as e:
+            logger.error(f"❌ Error upserting authors: {e}")
+
+        try:
+            with profiling.span("db_dedup_warmup"):
+                await self.warm_near_duplicates()
+        except Exception as e:
+            logger.error(f"❌ Error loading near-duplicate index: {e}")
+
+        merged_into = set()
+        quotes_start = time.perf_counter()
         for i, quote in enumerate(quotes, 1):
             try:
-                logger.info(f"📝 Processing quote {i}/{len(quotes)}: {quote.get('author', 'Unknown')}")
+                logger.info("📝 Processing quote %d/%d: %s", i, len(quotes), quote.author)
+
+                quote_topic = topic
+                canonical, signature = self.near_duplicates.check(quote.text, quote_topic)
+                if canonical is not None:
+                    results["merged_duplicates"] += 1
+                    results["persisted_fingerprints"].append(quote.fingerprint)
+                    merged_into.add(canonical)
+                    continue
 
-                quote_id = await self.store_quote(quote)
+                quote_id = await self.store_quote(quote, topic=quote_topic)
                 if quote_id:
+                    self.near_duplicates.insert(quote_id, signature, quote_topic or 'general')
                     results["stored_quotes"] += 1
                     results["quote_ids"].append(quote_id)
+                    results["persisted_fingerprints"].append(quote.fingerprint)
 
-                    if quote.get('image_data'):
+                    if quote.image:
                         results["uploaded_images"] += 1
                 else:
                     results["errors"] += 1
 
             except Exception as e:
-                logger.error(f"❌ Error processing quote {i}: {e}")
+                logger.error("❌ Error processing quote %d: %s", i, e)
                 results["errors"] += 1
 
+        profiling.record("db_quotes", quotes_start)
+
+        # New topic tags on canonical quotes already in the table
+        try:
+            with profiling.span("db_topics"):
+                await self._update_topics(merged_into - set(results["quote_ids"]))
+        except Exception as e:
+            logger.error(f"❌ Error merging topics: {e}")
+            results["errors"] += 1
+
+        metrics.DB_BATCH_SECONDS.observe(time.perf_counter() - batch_start)
+        metrics.DB_QUOTES_TOTAL.inc(results["stored_quotes"], outcome="stored")
+        metrics.DB_QUOTES_TOTAL.inc(results["merged_duplicates"], outcome="merged")
+        metrics.DB_QUOTES_TOTAL.inc(results["errors"], outcome="error")
+
         # Summary
         logger.info(f"\n{'='*60}")
         logger.info(f"📊 SUPABASE STORAGE SUMMARY")
         logger.info(f"{'='*60}")
         logger.info(f"✅ Quotes stored: {results['stored_quotes']}/{len(quotes)}")
         logger.info(f"🖼️  Images uploaded: {results['uploaded_images']}")
+        logger.info(f"🧬 Near-duplicates merged: {results['merged_duplicates']}")
         logger.info(f"❌ Errors: {results['errors']}")
-        logger.info(f"📈 Success rate: {results['stored_quotes']/len(quotes)*100:.1f}%")
+        logger.info(f"📈 Success rate: {(results['stored_quotes'] + results['merged_duplicates'])/max(len(quotes), 1)*100:.1f}%")
         logger.info(f"{'='*60}")
 
         return results
 
+    async def deduplicate_table(self, apply: bool = False) -> Dict[str, Any]:
+        """Batch job: find near-duplicates over the whole table, optionally merge and delete them."""
+        detector = NearDuplicateDetector(
+            num_perm=self.near_duplicates.num_perm,
+            bands=self.near_duplicates.bands,
+            threshold=self.near_duplicates.threshold
+        )
+        duplicates: List[str] = []
+        canonicals = set()
+        duplicate_images, kept_images = set(), set()
+
+        for row in self._iter_quote_rows("id,text,category,topics,supabase_image_url"):
+            row_topics = row.get('topics') or [row.get('category') or 'general']
+            canonical = detector.add(row['id'], row['text'], row_topics[0])
+            target = canonical if canonical is not None else row['id']
+            detector.topics[target].update(row_topics)
+            image_path = self._storage_path(row.get('supabase_image_url'))
+            if canonical is not None:
+                duplicates.append(row['id'])
+                canonicals.add(canonical)
+                if image_path:
+                    duplicate_images.add(image_path)
+            elif image_path:
+                kept_images.add(image_path)
+
+        # Une image encore référencée par une citation conservée n'est pas supprimée
+        duplicate_images -= kept_images
+        report = {**detector.throughput(), "groups": len(canonicals), "applied": apply,
+                  "duplicate_images": len(duplicate_images), "deleted_images": 0}
+        logger.info(
+            f"🧬 Near-duplicate scan: {report['processed']} quotes, {report['duplicates']} duplicates "
+            f"in {report['groups']} groups ({report['quotes_per_second']} quotes/s)"
+        )
+
+        if apply and duplicates:
+            self.near_duplicates = detector
+            self._near_duplicates_warm = True
+            await self._update_topics(canonicals)
+            for i in range(0, len(duplicates), DEDUP_DELETE_BATCH_SIZE):
+                batch = duplicates[i:i + DEDUP_DELETE_BATCH_SIZE]
+                self.supabase.table(self.quotes_table).delete().in_('id', batch).execute()
+            logger.info(f"🗑️  Deleted {len(duplicates)} duplicate quotes")
+            report["deleted_images"] = await self._remove_images(sorted(duplicate_images))
+
+        return report
+
+    def _storage_path(self, public_url: Optional[str]) -> Optional[str]:
+        """Path of an object of the image bucket from its public URL (None if not in the bucket)"""
+        marker = f"/storage/v1/object/public/{self.storage_bucket}/"
+        if not public_url or marker not in public_url:
+            return None
+        return public_url.split(marker, 1)[1].split("?", 1)[0] or None
+
+    async def _remove_images(self, paths: List[str]) -> int:
+        """Delete objects of the image bucket, returns the number removed"""
+        removed = 0
+        for i in range(0, len(paths), DEDUP_DELETE_BATCH_SIZE):
+            batch = paths[i:i + DEDUP_DELETE_BATCH_SIZE]
+            try:
+                self.supabase.storage.from_(self.storage_bucket).remove(batch)
+                removed += len(batch)
+            except Exception as e:
+                logger.error(f"❌ Error deleting {len(batch)} duplicate images: {e}")
+        if paths:
+            logger.info(f"🗑️  Deleted {removed}/{len(paths)} images of duplicate quotes")
+        return removed
+
     async def get_quotes_by_author(self, author: str) -> List[Dict]:
-        """Retrieve quotes by author."""
+        """Retrieve quotes by author (name variant or slug), using the author_slug index."""
         try:
-            result = self.supabase.table(self.quotes_table).select("*").ilike('author', f'%{author}%').execute()
+            author_slug = self.authors.lookup(author)
+            result = self.supabase.table(self.quotes_table).select("*").eq('author_slug', author_slug).execute()
             return result.data if result.data else []
         except Exception as e:
             logger.error(f"❌ Error retrieving quotes by author: {e}")
@@ -245,11 +487,11 @@ class SupabaseQuoteStorage:
         """Get database statistics."""
         try:
             # Total quotes
-            total_result = self.supabase.table(self.quotes_table).select("id", count="exact").execute()
+            total_result = self.supabase.table(self.quotes_table).select("id", count="exact", head=True).execute()
             total_quotes = total_result.count if total_result.count else 0
 
             # Quotes with images
-            images_result = self.supabase.table(self.quotes_table).select("id", count="exact").not_.is_("supabase_image_url", "null").execute()
+            images_result = self.supabase.table(self.quotes_table).select("id", count="exact", head=True).not_.is_("supabase_image_url", "null").execute()
             quotes_with_images = images_result.count if images_result.count else 0
 
             # Unique authors
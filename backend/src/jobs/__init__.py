@@ -0,0 +1 @@
+# Jobs module
\ No newline at end of file
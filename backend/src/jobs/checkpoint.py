@@ -0,0 +1,93 @@
+"""
+Per-job checkpoints of topic crawls.
+
+After every completed page (and every stored batch) the job writes a small
+JSON file: last completed page, fingerprints of the quotes extracted so
+far and the quotes still waiting for their images or for the database.
+A crashed, stopped or blocked crawl can then resume from the next page
+without re-fetching completed ones.
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+@dataclass
+class JobCheckpoint:
+    """Progress of one crawl, enough to resume it"""
+    job_id: str
+    topic: str
+    params: Dict[str, Any]
+    last_page: int = 0
+    extracted: int = 0
+    fingerprints: List[str] = field(default_factory=list)
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "running"
+    resumed_from: Optional[str] = None
+    updated_at: float = 0.0
+
+    @property
+    def next_page(self) -> int:
+        return self.last_page + 1
+
+    @property
+    def resumable(self) -> bool:
+        return self.status != "completed"
+
+
+class CheckpointStore:
+    """One JSON file per job, replaced atomically on every write."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def save(self, checkpoint: JobCheckpoint):
+        checkpoint.updated_at = time.time()
+        data = {"version": CHECKPOINT_FORMAT_VERSION, **asdict(checkpoint)}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(checkpoint.job_id)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, job_id: str) -> Optional[JobCheckpoint]:
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not read checkpoint {path}: {e}")
+            return None
+        if data.pop("version", None) != CHECKPOINT_FORMAT_VERSION:
+            logger.warning(f"⚠️  Ignoring checkpoint with unknown format: {path}")
+            return None
+        return JobCheckpoint(**data)
+
+    def delete(self, job_id: str):
+        try:
+            self._path(job_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> List[JobCheckpoint]:
+        """Every readable checkpoint, most recent first"""
+        if not self.directory.exists():
+            return []
+        checkpoints = [self.load(path.stem) for path in self.directory.glob("*.json")]
+        return sorted((cp for cp in checkpoints if cp), key=lambda cp: cp.updated_at, reverse=True)
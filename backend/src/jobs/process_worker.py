@@ -0,0 +1,375 @@
+"""
+Scrape jobs executed in separate OS processes.
+
+Each worker process owns its own Playwright/Chromium instance and runs one
+job at a time from a shared task queue. Events (extracted quotes, image
+counts, completion) are streamed back to the API process through a result
+queue, so the API event loop only handles broadcasting, indexing and
+storage.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from core import metrics, profiling
+from core.compat import current_task_cancelling
+from core.records import QuoteBatch, QuoteImage
+
+logger = logging.getLogger(__name__)
+
+# Mémoire réservée par processus worker (Chromium + Python)
+WORKER_MEMORY_MB = 500
+
+# Taille des lots de citations renvoyés au processus API
+QUOTE_EVENT_BATCH = 50
+
+JobEvent = Tuple[str, Any]
+
+
+async def scrape_job_events(scraper, topic: str, params: Dict[str, Any]) -> AsyncIterator[JobEvent]:
+    """
+    Exécute un job sur un scraper déjà ouvert et produit ses événements au fil des pages :
+    ("quotes", QuoteBatch) dès qu'une page est extraite, ("page_done", n°) ensuite,
+    ("images_started", None) une fois, puis ("images", {"quotes": QuoteBatch avec quote.image,
+    "downloaded": n}) par page. Les images d'une page se téléchargent pendant l'extraction
+    de la page suivante. En reprise, params["resume_quotes"] (citations d'un checkpoint en
+    attente de leurs images) passent en premier. En mode incrémental, ("incremental", rapport)
+    puis ("page_fingerprints", pages vues) terminent le job : l'appelant n'enregistre que les
+    pages dont les citations ont été stockées (PageFingerprintStore.commit).
+    """
+    include_images = params.get("include_images", True)
+    start_page = params.get("start_page", 1)
+    max_quotes = params.get("max_quotes")
+    if max_quotes:
+        max_quotes = max(0, max_quotes - params.get("extracted_before", 0))
+        if max_quotes == 0:
+            return
+    downloads: Deque[Tuple[QuoteBatch, asyncio.Task]] = deque()
+    images_started = False
+
+    # Mode incrémental : empreintes des pages par topic, partagées via le disque
+    tracker = None
+    if params.get("incremental"):
+        from core.config import settings
+        from scraper.incremental import IncrementalTracker, PageFingerprintStore
+
+        history = PageFingerprintStore(settings.PAGE_FINGERPRINT_DIR).load(topic)
+        tracker = IncrementalTracker(history, params["incremental"], params.get("max_pages", 1))
+
+    async def timed_download(batch: QuoteBatch, page_num: Optional[int] = None) -> List[Optional[QuoteImage]]:
+        start = time.perf_counter()
+        with profiling.span("images", page_num):
+            results = await scraper.download_images(batch)
+        if tracker is not None and page_num is not None:
+            tracker.record_images(time.perf_counter() - start)
+        return results
+
+    def stopped() -> bool:
+        return bool(scraper.stop_check_callback and scraper.stop_check_callback())
+
+    def images_event(batch: QuoteBatch, results: List[Optional[QuoteImage]]) -> JobEvent:
+        return "images", {"quotes": batch, "downloaded": sum(1 for image in results if image is not None)}
+
+    try:
+        resume_quotes = QuoteBatch.of(params.get("resume_quotes") or [])
+        if include_images and resume_quotes:
+            images_started = True
+            yield "images_started", None
+            downloads.append((resume_quotes, asyncio.create_task(timed_download(resume_quotes))))
+
+        page_num = start_page - 1
+        page_start = time.perf_counter()
+        stream = scraper.scrape_topic_stream(
+            topic, max_pages=params.get("max_pages", 1), max_quotes=max_quotes, start_page=start_page
+        )
+        async for page_quotes in stream:
+            page_num += 1
+            if tracker is not None:
+                verdict = tracker.observe(page_num, page_quotes, time.perf_counter() - page_start)
+                if tracker.should_stop(verdict):
+                    logger.info(f"⏭️  Page {page_num} of '{topic}' is already known, stopping pagination")
+                    await stream.aclose()
+                    break
+                if tracker.should_skip(verdict):
+                    logger.info(f"⏭️  Page {page_num} of '{topic}' is unchanged, skipped")
+                    yield "page_done", page_num
+                    page_start = time.perf_counter()
+                    continue
+
+            for i in range(0, len(page_quotes), QUOTE_EVENT_BATCH):
+                yield "quotes", page_quotes[i:i + QUOTE_EVENT_BATCH]
+            yield "page_done", page_num
+
+            if include_images and not stopped():
+                if not images_started:
+                    images_started = True
+                    yield "images_started", None
+                downloads.append((page_quotes, asyncio.create_task(timed_download(page_quotes, page_num))))
+            page_start = time.perf_counter()
+
+            while downloads and downloads[0][1].done():
+                batch, task = downloads.popleft()
+                yield images_event(batch, task.result())
+
+        while downloads:
+            batch, task = downloads[0]
+            results = await task
+            downloads.popleft()
+            yield images_event(batch, results)
+
+        if tracker is not None:
+            yield "incremental", tracker.finish()
+            yield "page_fingerprints", tracker.observed_pages()
+    finally:
+        for _, task in downloads:
+            task.cancel()
+
+
+def worker_budget(requested: int) -> int:
+    """Number of worker processes allowed by the CPU count and the available RAM"""
+    budget = min(requested, os.cpu_count() or 1)
+    try:
+        with open("/proc/meminfo") as f:
+            meminfo = dict(line.split(":", 1) for line in f)
+        available_mb = int(meminfo["MemAvailable"].split()[0]) // 1024
+        budget = min(budget, max(1, available_mb // WORKER_MEMORY_MB))
+    except (OSError, KeyError, ValueError):
+        pass
+    return max(1, budget)
+
+
+def _read_control(control_queue, stopped: Set[str], on_stop: Callable[[str], None]):
+    """Thread of a worker process: collects stop requests, forgets them once the job is over"""
+    while True:
+        message = control_queue.get()
+        if message is None:
+            return
+        action, job_id = message
+        if action == "forget":
+            stopped.discard(job_id)
+            continue
+        stopped.add(job_id)
+        on_stop(job_id)
+
+
+async def _worker_loop(index: int, task_queue, event_queue, control_queue):
+    from scraper.brainyquote_hybrid import HybridBrainyQuoteScraper
+
+    stopped: Set[str] = set()
+    loop = asyncio.get_running_loop()
+    running: Dict[str, asyncio.Task] = {}
+
+    def cancel_job(job_id: str):
+        task = running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    threading.Thread(
+        target=_read_control,
+        args=(control_queue, stopped, lambda job_id: loop.call_soon_threadsafe(cancel_job, job_id)),
+        daemon=True
+    ).start()
+
+    try:
+        scraper = await HybridBrainyQuoteScraper().__aenter__()
+    except Exception as e:
+        # Sans navigateur, le worker répond en erreur plutôt que de laisser les jobs en attente
+        logger.error(f"Worker process {index} could not start the browser: {e}")
+        while True:
+            task = await loop.run_in_executor(None, task_queue.get)
+            if task is None:
+                return
+            event_queue.put((task[0], "error", f"Worker process could not start the browser: {e}"))
+
+    async def run(job_id: str, topic: str, params: Dict[str, Any]):
+        # Phases (et piles échantillonnées si profile=true) renvoyées à l'API avant "done"
+        profile = profiling.JobProfile()
+        profiling.activate(profile)
+        sampler = None
+        if params.get("profile"):
+            from core.config import settings
+
+            sampler = profiling.StackSampler(interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000).start()
+        try:
+            async for kind, payload in scrape_job_events(scraper, topic, params):
+                event_queue.put((job_id, kind, payload))
+        finally:
+            if sampler is not None:
+                profile.stacks = sampler.stop()
+            event_queue.put((job_id, "profile", profile.export()))
+
+    async with scraper:
+        logger.info(f"🧰 Worker process {index} ready (pid {os.getpid()})")
+        while True:
+            task = await loop.run_in_executor(None, task_queue.get)
+            if task is None:
+                break
+
+            job_id, topic, params = task
+            if job_id in stopped:
+                event_queue.put((job_id, "done", None))
+                stopped.discard(job_id)
+                continue
+
+            scraper.stop_check_callback = lambda: job_id in stopped
+            event_queue.put((job_id, "started", index))
+            running[job_id] = asyncio.create_task(run(job_id, topic, params))
+            try:
+                await running[job_id]
+                event_queue.put((job_id, "done", None))
+            except asyncio.CancelledError:
+                if current_task_cancelling(fallback=job_id not in stopped):
+                    raise
+                # Stop demandé : navigation et téléchargements interrompus
+                event_queue.put((job_id, "done", None))
+            except Exception as e:
+                logger.error(f"Worker process {index}: job {job_id} failed: {e}")
+                event_queue.put((job_id, "error", str(e)))
+            finally:
+                running.pop(job_id, None)
+                stopped.discard(job_id)
+                # Métriques cumulées du processus, agrégées par l'API dans /metrics
+                event_queue.put((None, "metrics", (index, metrics.REGISTRY.snapshot())))
+
+
+def _worker_main(index: int, task_queue, event_queue, control_queue):
+    """Entry point of a worker process"""
+    from core.log import setup_logging_from_settings
+
+    setup_logging_from_settings(fmt=f'%(asctime)s - worker{index} - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_worker_loop(index, task_queue, event_queue, control_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+class ProcessWorkerPool:
+    """Pool of scraper processes fed from a local job queue."""
+
+    def __init__(self, num_workers: int):
+        self.num_workers = worker_budget(num_workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queue = self._context.Queue()
+        self._event_queue = self._context.Queue()
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.num_workers
+        self._control_queues = [self._context.Queue() for _ in range(self.num_workers)]
+        self._job_queues: Dict[str, asyncio.Queue] = {}
+        self._assignments: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pump: Optional[threading.Thread] = None
+
+    def start(self):
+        """Spawn the worker processes and the thread reading their events"""
+        self._loop = asyncio.get_running_loop()
+        self._ensure_workers()
+        self._pump = threading.Thread(target=self._pump_events, name="worker-events", daemon=True)
+        self._pump.start()
+        logger.info(f"🧰 Started {self.num_workers} scraper worker processes")
+
+    def _ensure_workers(self):
+        """(Re)spawn dead worker processes"""
+        for index, process in enumerate(self._processes):
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                logger.warning(f"⚠️  Worker process {index} exited ({process.exitcode}), respawning")
+            process = self._context.Process(
+                target=_worker_main,
+                args=(index, self._task_queue, self._event_queue, self._control_queues[index]),
+                name=f"scraper-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self._processes[index] = process
+
+    def shutdown(self, timeout: float = 10.0):
+        """Ask every worker to exit, then terminate stragglers"""
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for control_queue in self._control_queues:
+            control_queue.put(None)
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._event_queue.put(None)
+
+    def _pump_events(self):
+        while True:
+            event = self._event_queue.get()
+            if event is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Tuple[str, str, Any]):
+        job_id, kind, payload = event
+        if kind == "metrics":
+            index, snapshot = payload
+            metrics.REGISTRY.merge_remote(f"worker{index}", snapshot)
+            return
+        if kind == "started":
+            self._assignments[job_id] = payload
+            return
+        job_queue = self._job_queues.get(job_id)
+        if job_queue is not None:
+            job_queue.put_nowait((kind, payload))
+
+    def stop(self, job_id: str):
+        """Forward a stop request to the worker running the job, or to all while it is still queued"""
+        index = self._assignments.get(job_id)
+        control_queues = self._control_queues if index is None else [self._control_queues[index]]
+        for control_queue in control_queues:
+            control_queue.put(("stop", job_id))
+
+    def _forget(self, job_id: str):
+        """The job is over: workers drop its stop request (sent to all, or received after the end)"""
+        for control_queue in self._control_queues:
+            control_queue.put(("forget", job_id))
+
+    async def run_job(self, job_id: str, topic: str, params: Dict[str, Any],
+                      should_stop: Callable[[], bool] = lambda: False) -> AsyncIterator[JobEvent]:
+        """Queue a job for the worker processes and yield its events as they arrive"""
+        job_queue: asyncio.Queue = asyncio.Queue()
+        self._job_queues[job_id] = job_queue
+        self._task_queue.put((job_id, topic, params))
+        stop_sent = False
+        try:
+            while True:
+                if should_stop() and not stop_sent:
+                    self.stop(job_id)
+                    stop_sent = True
+                try:
+                    kind, payload = await asyncio.wait_for(job_queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    index = self._assignments.get(job_id)
+                    if index is not None and not self._processes[index].is_alive():
+                        self._ensure_workers()
+                        raise RuntimeError(f"Worker process {index} died while running the job")
+                    if index is None:
+                        self._ensure_workers()
+                    continue
+
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise RuntimeError(payload)
+                yield kind, payload
+        except asyncio.CancelledError:
+            # Job annulé côté API : le worker annule aussi sa tâche en cours
+            if not stop_sent:
+                self.stop(job_id)
+                stop_sent = True
+            raise
+        finally:
+            self._job_queues.pop(job_id, None)
+            self._assignments.pop(job_id, None)
+            if stop_sent:
+                self._forget(job_id)
@@ -0,0 +1,286 @@
+"""
+Scheduler of scraping jobs: per-job state, a priority queue and a bounded
+pool of worker tasks, so one API instance can run several scrapes at once.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from core import metrics
+from core.compat import current_task_cancelling
+from core.profiling import JobProfile
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "starting", "running")
+FINISHED_STATUSES = ("completed", "stopped", "error")
+
+# Événements gardés par job pour les flux /stream (reprise via Last-Event-ID)
+EVENT_LOG_SIZE = 10000
+
+# Total des événements gardés par les jobs terminés : au-delà, les journaux des plus anciens sont vidés
+FINISHED_EVENTS_BUDGET = 20000
+
+JobEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its capacity"""
+
+
+class ScrapeJob:
+    """State of one scraping job (what scraping_state used to hold globally)."""
+
+    def __init__(self, topic: str, params: Dict[str, Any], priority: int = 0):
+        self.id = str(uuid.uuid4())
+        self.topic = topic
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.progress = {"current": 0, "total": params.get("max_quotes") or 0}
+        self.stats = {"extracted": 0, "images": 0, "errors": 0, "elapsed": 0}
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.start_time: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stop_requested = False
+        self.stop_requested_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.profile = JobProfile()  # phases du job, /api/jobs/{id}/profile
+        self._events: Deque[JobEvent] = deque(maxlen=EVENT_LOG_SIZE)
+        self._event_seq = 0
+        self._events_changed: Optional[asyncio.Event] = None
+
+    def stop_latency_ms(self) -> Optional[float]:
+        """Time since the stop request, in milliseconds"""
+        if self.stop_requested_at is None:
+            return None
+        return round((time.perf_counter() - self.stop_requested_at) * 1000, 1)
+
+    @property
+    def last_event_id(self) -> int:
+        return self._event_seq
+
+    def record_event(self, kind: str, data: Dict[str, Any]) -> int:
+        """Append an event to the job log and wake its stream subscribers"""
+        self._event_seq += 1
+        self._events.append((self._event_seq, kind, data))
+        self.notify_subscribers()
+        return self._event_seq
+
+    @property
+    def logged_events(self) -> int:
+        return len(self._events)
+
+    def drop_events(self):
+        """Free the event log (a later stream only gets the status and the end)"""
+        self._events.clear()
+
+    def notify_subscribers(self):
+        """Wake every waiting subscriber (new events or status change)"""
+        if self._events_changed is not None:
+            self._events_changed.set()
+            self._events_changed = None
+
+    def events_after(self, last_id: int) -> List[JobEvent]:
+        """Logged events with an id greater than ``last_id`` (older ones may have been dropped)"""
+        if not self._events or last_id >= self._event_seq:
+            return []
+        start = max(0, last_id + 1 - self._events[0][0])
+        return list(itertools.islice(self._events, start, None))
+
+    async def wait_for_events(self, last_id: int, timeout: float) -> bool:
+        """Wait until an event after ``last_id`` exists or the job finishes; False on timeout"""
+        if self._event_seq > last_id or not self.is_active:
+            return True
+        # Un seul Event partagé par tous les abonnés : un abonné inactif ne coûte qu'une attente
+        if self._events_changed is None:
+            self._events_changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._events_changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    @property
+    def elapsed(self) -> int:
+        if not self.start_time:
+            return 0
+        return int((self.finished_at or time.time()) - self.start_time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "priority": self.priority,
+            "params": self.params,
+            "progress": self.progress,
+            "stats": self.stats,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "elapsed": self.elapsed,
+        }
+
+
+JobRunner = Callable[[ScrapeJob], Awaitable[None]]
+
+
+class JobScheduler:
+    """Priority queue of jobs consumed by ``max_workers`` concurrent worker tasks."""
+
+    def __init__(self, runner: JobRunner, max_workers: int = 2, max_queued: int = 100, history_size: int = 200,
+                 finished_events_budget: int = FINISHED_EVENTS_BUDGET):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history_size = history_size
+        self.finished_events_budget = finished_events_budget
+        self.jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+
+    async def start(self):
+        """Start the worker tasks (called from the app startup event)"""
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"scrape-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        logger.info(f"🧵 Job scheduler started with {self.max_workers} workers")
+
+    async def shutdown(self):
+        """Stop every job and cancel the worker tasks"""
+        for job in self.jobs.values():
+            if job.is_active:
+                self.stop(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, topic: str, params: Dict[str, Any], priority: int = 0) -> ScrapeJob:
+        """Queue a job; higher priority runs first, FIFO within a priority"""
+        if self._queue is None:
+            raise RuntimeError("Scheduler not started")
+        if self.queued_count() >= self.max_queued:
+            raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        job = ScrapeJob(topic, params, priority)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((-priority, next(self._sequence), job.id))
+        self._trim_history()
+        logger.info(f"📥 Job {job.id} queued: topic='{topic}', priority={priority}")
+        return job
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        return self.jobs.get(job_id)
+
+    def latest(self) -> Optional[ScrapeJob]:
+        """Most recently submitted job"""
+        return next(reversed(self.jobs.values()), None)
+
+    def list(self) -> List[ScrapeJob]:
+        return list(reversed(self.jobs.values()))
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def running_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status in ("starting", "running"))
+
+    def position(self, job_id: str) -> int:
+        """1-based position of a queued job, 0 if it is not waiting"""
+        job = self.jobs.get(job_id)
+        if not job or job.status != "queued":
+            return 0
+        waiting = sorted((j for j in self.jobs.values() if j.status == "queued"), key=lambda j: -j.priority)
+        for index, queued in enumerate(waiting, 1):
+            if queued.id == job_id:
+                return index
+        return 0
+
+    def stop(self, job_id: str) -> bool:
+        """Stop a job: a queued job never starts, a running one has its task cancelled"""
+        job = self.jobs.get(job_id)
+        if not job or not job.is_active:
+            return False
+        if job.stop_requested:
+            return True
+        job.stop_requested = True
+        job.stop_requested_at = time.perf_counter()
+        if job.status == "queued":
+            job.status = "stopped"
+            job.finished_at = time.time()
+            job.notify_subscribers()
+        elif job.task is not None and not job.task.done():
+            # Interrompt navigation, attentes, téléchargements et lots DB en cours
+            job.task.cancel()
+        return True
+
+    async def _worker(self, worker_id: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None or job.status != "queued":
+                    continue
+                job.status = "starting"
+                job.start_time = time.time()
+                job.profile.record("queued", job.profile.origin)
+                logger.info(f"▶️  Worker {worker_id} running job {job.id} ({job.topic})")
+                job.task = asyncio.create_task(self.runner(job), name=f"scrape-job-{job.id}")
+                await job.task
+            except asyncio.CancelledError:
+                if current_task_cancelling(fallback=job is None or not job.stop_requested):
+                    raise  # arrêt du scheduler
+                # Job annulé avant que le runner ne puisse gérer l'annulation
+                job.status = "stopped"
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {e}")
+                job.status = "error"
+                job.error = str(e)
+            finally:
+                if job is not None and job.start_time and not job.finished_at:
+                    job.finished_at = time.time()
+                    job.stats["elapsed"] = job.elapsed
+                if job is not None and job.start_time:
+                    metrics.JOBS_TOTAL.inc(status=job.status)
+                    metrics.JOB_DURATION_SECONDS.observe(job.finished_at - job.start_time)
+                if job is not None:
+                    job.profile.finish()
+                    job.task = None
+                    job.notify_subscribers()
+                    self._trim_events()
+                self._queue.task_done()
+
+    def _trim_events(self):
+        """Keep at most ``finished_events_budget`` logged events over the finished jobs, newest first"""
+        kept = 0
+        for job in reversed(self.jobs.values()):
+            if job.is_active or not job.logged_events:
+                continue
+            kept += job.logged_events
+            if kept > self.finished_events_budget:
+                job.drop_events()
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs beyond ``history_size``"""
+        excess = len(self.jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if not job.is_active][:excess]:
+            del self.jobs[job_id]
@@ -0,0 +1,482 @@
+"""
+Shared task queue for distributed topic/page crawls.
+
+A task is claimed under a lease: the worker owns it until the lease
+expires, renews it with heartbeats while it works, then completes or fails
+it. Tasks whose lease expired (crashed or partitioned worker) become
+visible again and are claimed by another node. Two backends:
+
+- ``SQLiteTaskQueue``: a local file, for tests and single-machine setups
+  (several worker processes can share it);
+- ``RedisTaskQueue``: any Redis-compatible server, for several machines.
+  Its Lua scripts build task keys from ids, so a single node (or a
+  primary with replicas) is required: Redis Cluster is not supported.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+
+TASK_STATUSES = ("pending", "leased", "done", "failed")
+
+
+@dataclass
+class LeasedTask:
+    """A task claimed by a worker until ``lease_expires``"""
+    id: str
+    payload: Dict[str, Any]
+    worker_id: str
+    attempts: int
+    lease_expires: float = 0.0
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker renews or settles a task it no longer owns"""
+
+
+class TaskQueue(ABC):
+    """Queue of tasks with leases, heartbeats and visibility timeouts."""
+
+    def __init__(self, lease_seconds: float = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, payload: Dict[str, Any], task_id: Optional[str] = None) -> str:
+        """Add a task (a task id already present is left untouched), returns its id"""
+
+    def enqueue_many(self, payloads: List[Dict[str, Any]], task_ids: Optional[List[str]] = None) -> List[str]:
+        task_ids = task_ids or [None] * len(payloads)
+        return [self.enqueue(payload, task_id) for payload, task_id in zip(payloads, task_ids)]
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[LeasedTask]:
+        """Lease the oldest visible task (expired leases are re-queued first), None if idle"""
+
+    @abstractmethod
+    def heartbeat(self, task: LeasedTask, lease_seconds: Optional[float] = None):
+        """Extend the lease of a task; raises LeaseLostError if another worker took it over"""
+
+    @abstractmethod
+    def complete(self, task: LeasedTask, result: Any = None):
+        """Mark a task done and store its result"""
+
+    @abstractmethod
+    def fail(self, task: LeasedTask, error: str, retry: bool = True):
+        """Release a task after an error: re-queued until ``max_attempts``, then failed"""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Make tasks with an expired lease visible again, returns how many"""
+
+    @abstractmethod
+    def results(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Status, result and error of the given tasks"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """Task queue in a SQLite file; claims are serialized with ``BEGIN IMMEDIATE``."""
+
+    def __init__(self, path: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_visible ON tasks(status, created_at)")
+            self._create_counts(db)
+
+    def _create_counts(self, db: sqlite3.Connection):
+        """Per-status counters kept by triggers, so stats() does not scan the task history"""
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            exists = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_counts'"
+            ).fetchone()
+            if not exists:
+                db.execute("CREATE TABLE task_counts (status TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+                # File créée avant les compteurs : initialisés une fois depuis la table
+                db.execute("INSERT INTO task_counts SELECT status, COUNT(*) FROM tasks GROUP BY status")
+            db.executemany("INSERT OR IGNORE INTO task_counts VALUES (?, 0)", [(status,) for status in TASK_STATUSES])
+            db.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_counts_insert AFTER INSERT ON tasks BEGIN
+                    UPDATE task_counts SET count = count + 1 WHERE status = NEW.status;
+                END
+            """)
+            db.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_counts_update AFTER UPDATE OF status ON tasks
+                WHEN OLD.status != NEW.status BEGIN
+                    UPDATE task_counts SET count = count - 1 WHERE status = OLD.status;
+                    UPDATE task_counts SET count = count + 1 WHERE status = NEW.status;
+                END
+            """)
+            db.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_counts_delete AFTER DELETE ON tasks BEGIN
+                    UPDATE task_counts SET count = count - 1 WHERE status = OLD.status;
+                END
+            """)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable)"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        return db
+
+    def enqueue(self, payload: Dict[str, Any], task_id: Optional[str] = None) -> str:
+        task_id = task_id or str(uuid.uuid4())
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR IGNORE INTO tasks (id, payload, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (task_id, json.dumps(payload), now, now)
+        )
+        return task_id
+
+    def enqueue_many(self, payloads: List[Dict[str, Any]], task_ids: Optional[List[str]] = None) -> List[str]:
+        now = time.time()
+        task_ids = task_ids or [str(uuid.uuid4()) for _ in payloads]
+        rows = [(task_id, json.dumps(payload), now, now) for task_id, payload in zip(task_ids, payloads)]
+        db = self._transaction()
+        try:
+            db.executemany("INSERT OR IGNORE INTO tasks (id, payload, created_at, updated_at) VALUES (?, ?, ?, ?)", rows)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return [row[0] for row in rows]
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> int:
+        cursor = db.execute(
+            """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                worker_id = NULL, lease_expires = NULL, updated_at = ?,
+                                error = 'lease expired'
+               WHERE status = 'leased' AND lease_expires < ?""",
+            (self.max_attempts, now, now)
+        )
+        return cursor.rowcount
+
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[LeasedTask]:
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+        db = self._transaction()
+        try:
+            requeued = self._requeue_expired(db, now)
+            row = db.execute(
+                "SELECT id, payload, attempts FROM tasks WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    """UPDATE tasks SET status = 'leased', worker_id = ?, lease_expires = ?,
+                                        attempts = attempts + 1, updated_at = ?
+                       WHERE id = ?""",
+                    (worker_id, expires, now, row[0])
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+        if requeued:
+            logger.warning(f"⏱️  Re-queued {requeued} task(s) with an expired lease")
+        if row is None:
+            return None
+        return LeasedTask(row[0], json.loads(row[1]), worker_id, row[2] + 1, expires)
+
+    def _settle(self, task: LeasedTask, sql: str, params: tuple):
+        cursor = self._connect().execute(
+            sql + " WHERE id = ? AND worker_id = ? AND status = 'leased'",
+            params + (task.id, task.worker_id)
+        )
+        if cursor.rowcount == 0:
+            raise LeaseLostError(f"Task {task.id} is no longer leased by {task.worker_id}")
+
+    def heartbeat(self, task: LeasedTask, lease_seconds: Optional[float] = None):
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+        self._settle(task, "UPDATE tasks SET lease_expires = ?, updated_at = ?", (expires, now))
+        task.lease_expires = expires
+
+    def complete(self, task: LeasedTask, result: Any = None):
+        self._settle(
+            task,
+            "UPDATE tasks SET status = 'done', lease_expires = NULL, result = ?, error = NULL, updated_at = ?",
+            (json.dumps(result), time.time())
+        )
+
+    def fail(self, task: LeasedTask, error: str, retry: bool = True):
+        status = "pending" if retry and task.attempts < self.max_attempts else "failed"
+        self._settle(
+            task,
+            "UPDATE tasks SET status = ?, worker_id = NULL, lease_expires = NULL, error = ?, updated_at = ?",
+            (status, error, time.time())
+        )
+
+    def requeue_expired(self) -> int:
+        db = self._transaction()
+        try:
+            count = self._requeue_expired(db, time.time())
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return count
+
+    def results(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        task_ids = list(task_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        db = self._connect()
+        for i in range(0, len(task_ids), 500):
+            chunk = task_ids[i:i + 500]
+            rows = db.execute(
+                f"SELECT id, status, result, error FROM tasks WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for task_id, status, result, error in rows:
+                found[task_id] = {
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error,
+                }
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict.fromkeys(TASK_STATUSES, 0)
+        counts.update(self._connect().execute("SELECT status, count FROM task_counts").fetchall())
+        return counts
+
+
+# Ajout atomique d'une tâche, ignoré si l'id existe déjà (KEYS: hash de la tâche, pending, compteurs ;
+# ARGV: id, payload, created_at)
+_REDIS_ENQUEUE = """
+if redis.call('HSETNX', KEYS[1], 'payload', ARGV[2]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', 'pending', 'attempts', 0, 'created_at', ARGV[3])
+redis.call('HINCRBY', KEYS[3], 'pending', 1)
+redis.call('LPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Ré-enfile les baux expirés (KEYS: pending, leases, préfixe des tâches, compteurs ;
+# ARGV[1]=now, ARGV[4]=max_attempts)
+_REDIS_REQUEUE_EXPIRED = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[1]))
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    local attempts = tonumber(redis.call('HGET', KEYS[3] .. id, 'attempts') or '0')
+    redis.call('HINCRBY', KEYS[4], 'leased', -1)
+    if attempts >= tonumber(ARGV[4]) then
+        redis.call('HSET', KEYS[3] .. id, 'status', 'failed', 'worker_id', '', 'error', 'lease expired')
+        redis.call('HINCRBY', KEYS[4], 'failed', 1)
+    else
+        redis.call('HSET', KEYS[3] .. id, 'status', 'pending', 'worker_id', '', 'error', 'lease expired')
+        redis.call('HINCRBY', KEYS[4], 'pending', 1)
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+"""
+
+# Claim atomique côté serveur : ré-enfile les baux expirés puis prend la tâche la plus ancienne
+_REDIS_CLAIM = _REDIS_REQUEUE_EXPIRED + """
+if ARGV[2] == '' then
+    return {#expired}
+end
+local id = redis.call('RPOP', KEYS[1])
+if not id then
+    return {#expired}
+end
+local attempts = redis.call('HINCRBY', KEYS[3] .. id, 'attempts', 1)
+redis.call('HSET', KEYS[3] .. id, 'status', 'leased', 'worker_id', ARGV[2])
+redis.call('HINCRBY', KEYS[4], 'pending', -1)
+redis.call('HINCRBY', KEYS[4], 'leased', 1)
+redis.call('ZADD', KEYS[2], tonumber(ARGV[1]) + tonumber(ARGV[3]), id)
+return {#expired, id, redis.call('HGET', KEYS[3] .. id, 'payload'), attempts}
+"""
+
+# Renouvellement / règlement seulement si le worker détient encore le bail
+# (KEYS: leases, préfixe des tâches, pending, compteurs)
+_REDIS_OWNED = """
+if redis.call('HGET', KEYS[2] .. ARGV[1], 'worker_id') ~= ARGV[2]
+   or redis.call('HGET', KEYS[2] .. ARGV[1], 'status') ~= 'leased' then
+    return 0
+end
+if ARGV[3] == 'heartbeat' then
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[4], ARGV[1])
+    return 1
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[2] .. ARGV[1], 'status', ARGV[3], 'worker_id', '', ARGV[5], ARGV[4])
+redis.call('HINCRBY', KEYS[4], 'leased', -1)
+redis.call('HINCRBY', KEYS[4], ARGV[3], 1)
+if ARGV[3] == 'pending' then
+    redis.call('LPUSH', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisTaskQueue(TaskQueue):
+    """Task queue on a Redis-compatible server (pending list + lease sorted set + task hashes).
+
+    Single node only: the scripts touch task hashes that are not declared
+    as keys, which Redis Cluster rejects.
+    """
+
+    def __init__(self, url: str, namespace: str = "scrape", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for a redis:// task queue: "
+                               "pip install -r requirements-redis.txt") from e
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._pending_key = f"{namespace}:pending"
+        self._leases_key = f"{namespace}:leases"
+        self._task_prefix = f"{namespace}:task:"
+        self._counts_key = f"{namespace}:counts"  # tâches par statut, tenu à jour par les scripts
+        self._enqueue_script = self._redis.register_script(_REDIS_ENQUEUE)
+        self._claim_script = self._redis.register_script(_REDIS_CLAIM)
+        self._owned_script = self._redis.register_script(_REDIS_OWNED)
+
+    def enqueue(self, payload: Dict[str, Any], task_id: Optional[str] = None) -> str:
+        task_id = task_id or str(uuid.uuid4())
+        self._enqueue_script(
+            keys=[self._task_prefix + task_id, self._pending_key, self._counts_key],
+            args=[task_id, json.dumps(payload), time.time()]
+        )
+        return task_id
+
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[LeasedTask]:
+        lease = lease_seconds or self.lease_seconds
+        now = time.time()
+        reply = self._claim_script(
+            keys=[self._pending_key, self._leases_key, self._task_prefix, self._counts_key],
+            args=[now, worker_id, lease, self.max_attempts]
+        )
+        if reply[0]:
+            logger.warning(f"⏱️  Re-queued {reply[0]} task(s) with an expired lease")
+        if len(reply) == 1:
+            return None
+        _, task_id, payload, attempts = reply
+        return LeasedTask(task_id, json.loads(payload), worker_id, int(attempts), now + lease)
+
+    def _owned(self, task: LeasedTask, action: str, value: Any = "", field_name: str = "result"):
+        ok = self._owned_script(
+            keys=[self._leases_key, self._task_prefix, self._pending_key, self._counts_key],
+            args=[task.id, task.worker_id, action, value, field_name]
+        )
+        if not ok:
+            raise LeaseLostError(f"Task {task.id} is no longer leased by {task.worker_id}")
+
+    def heartbeat(self, task: LeasedTask, lease_seconds: Optional[float] = None):
+        expires = time.time() + (lease_seconds or self.lease_seconds)
+        self._owned(task, "heartbeat", expires)
+        task.lease_expires = expires
+
+    def complete(self, task: LeasedTask, result: Any = None):
+        self._owned(task, "done", json.dumps(result), "result")
+
+    def fail(self, task: LeasedTask, error: str, retry: bool = True):
+        status = "pending" if retry and task.attempts < self.max_attempts else "failed"
+        self._owned(task, status, error, "error")
+
+    def requeue_expired(self) -> int:
+        # Un claim sans worker_id ne prend aucune tâche, il ne fait que ré-enfiler les baux expirés
+        reply = self._claim_script(
+            keys=[self._pending_key, self._leases_key, self._task_prefix, self._counts_key],
+            args=[time.time(), "", 0, self.max_attempts]
+        )
+        return int(reply[0])
+
+    def results(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        task_ids = list(task_ids)
+        pipe = self._redis.pipeline()
+        for task_id in task_ids:
+            pipe.hmget(self._task_prefix + task_id, "status", "result", "error")
+        found = {}
+        for task_id, (status, result, error) in zip(task_ids, pipe.execute()):
+            if status is not None:
+                found[task_id] = {
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error or None,
+                }
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        stored = self._redis.hgetall(self._counts_key)
+        if not stored:
+            stored = self._rebuild_counts()
+        counts = dict.fromkeys(TASK_STATUSES, 0)
+        counts.update((status, int(count)) for status, count in stored.items() if status in counts)
+        return counts
+
+    def _rebuild_counts(self) -> Dict[str, int]:
+        """Count the tasks of a queue created before the counters (one scan, then kept by the scripts)"""
+        counts = dict.fromkeys(TASK_STATUSES, 0)
+        keys = list(self._redis.scan_iter(match=f"{self._task_prefix}*", count=1000))
+        for i in range(0, len(keys), 1000):
+            pipe = self._redis.pipeline()
+            for key in keys[i:i + 1000]:
+                pipe.hget(key, "status")
+            for status in pipe.execute():
+                if status in counts:
+                    counts[status] += 1
+        # HSETNX : un compteur créé entre-temps par un script n'est pas écrasé
+        pipe = self._redis.pipeline()
+        for status, count in counts.items():
+            pipe.hsetnx(self._counts_key, status, count)
+        pipe.execute()
+        return self._redis.hgetall(self._counts_key)
+
+
+def create_task_queue(url: str, **kwargs) -> TaskQueue:
+    """Queue from a URL: ``redis://host:6379/0``, ``sqlite:///path/tasks.db`` or a plain file path"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTaskQueue(url, **kwargs)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteTaskQueue(Path(url), **kwargs)
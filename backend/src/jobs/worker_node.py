@@ -0,0 +1,225 @@
+"""
+Distributed scraper node.
+
+Claims topic/page tasks from the shared task queue, keeps their lease alive
+with heartbeats while the page is scraped, and completes them with the
+extracted quotes (optionally stored in Supabase directly). Start as many
+nodes as needed, on any machine that can reach the queue:
+
+    python -m jobs.worker_node --queue redis://queue-host:6379/0 --concurrency 2
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from core.compat import current_task_cancelling
+from core.config import settings
+from jobs.task_queue import LeasedTask, LeaseLostError, TaskQueue, create_task_queue
+
+logger = logging.getLogger(__name__)
+
+IDLE_POLL_SECONDS = 2.0
+
+
+def topic_page_tasks(topic: str, max_pages: int, max_quotes_per_page: Optional[int] = None,
+                     job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Payloads of one task per page of a topic"""
+    return [
+        {
+            "type": "topic_page",
+            "topic": topic,
+            "page": page,
+            "max_quotes": max_quotes_per_page,
+            "job_id": job_id,
+        }
+        for page in range(1, max_pages + 1)
+    ]
+
+
+def topic_task_ids(job_id: str, max_pages: int) -> List[str]:
+    """Deterministic task ids of a distributed crawl (re-queuing the same crawl is idempotent)"""
+    return [f"{job_id}:{page}" for page in range(1, max_pages + 1)]
+
+
+def enqueue_topic(queue: TaskQueue, topic: str, max_pages: int, max_quotes_per_page: Optional[int] = None,
+                  job_id: Optional[str] = None) -> List[str]:
+    """Queue every page of a topic, returns the task ids"""
+    payloads = topic_page_tasks(topic, max_pages, max_quotes_per_page, job_id)
+    task_ids = queue.enqueue_many(payloads, topic_task_ids(job_id, max_pages) if job_id else None)
+    logger.info(f"📥 Queued {len(task_ids)} page task(s) for topic '{topic}'")
+    return task_ids
+
+
+def collect_topic_results(queue: TaskQueue, task_ids: List[str]) -> Dict[str, Any]:
+    """Progress of a distributed topic crawl and the quotes of its finished pages"""
+    results = queue.results(task_ids)
+    quotes: List[Dict] = []
+    counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+    for task_id in task_ids:
+        task = results.get(task_id)
+        if task is None:
+            continue
+        counts[task["status"]] = counts.get(task["status"], 0) + 1
+        if task["status"] == "done" and task["result"]:
+            quotes.extend(task["result"].get("quotes", []))
+    return {"tasks": counts, "finished": counts["pending"] + counts["leased"] == 0, "quotes": quotes}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkerNode:
+    """Claims and runs topic/page tasks with ``concurrency`` parallel slots on one browser."""
+
+    def __init__(self, queue: TaskQueue, worker_id: Optional[str] = None, concurrency: int = 1,
+                 store: bool = False, max_tasks: Optional[int] = None):
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = max(1, concurrency)
+        self.store = store
+        self.max_tasks = max_tasks
+        self.processed = 0
+        self.failed = 0
+        self._stopping = False
+        self._storage = None
+
+    def stop(self):
+        self._stopping = True
+
+    async def run(self):
+        from scraper.brainyquote_hybrid import HybridBrainyQuoteScraper
+
+        if self.store:
+            from database.supabase_storage import SupabaseQuoteStorage
+            self._storage = SupabaseQuoteStorage()
+
+        start = time.time()
+        async with HybridBrainyQuoteScraper() as scraper:
+            logger.info(f"🛰️  Worker node {self.worker_id} ready ({self.concurrency} slot(s))")
+            await asyncio.gather(*(self._slot(scraper, i) for i in range(self.concurrency)))
+
+        elapsed = time.time() - start
+        logger.info(f"🏁 Worker node {self.worker_id}: {self.processed} task(s) done, "
+                    f"{self.failed} failed in {elapsed:.1f}s")
+
+    def _budget_left(self) -> bool:
+        return self.max_tasks is None or self.processed + self.failed < self.max_tasks
+
+    async def _slot(self, scraper, slot: int):
+        slot_id = f"{self.worker_id}/{slot}"
+        while not self._stopping and self._budget_left():
+            task = await asyncio.to_thread(self.queue.claim, slot_id)
+            if task is None:
+                if self.max_tasks is not None:
+                    return  # mode batch : plus rien à faire
+                await asyncio.sleep(IDLE_POLL_SECONDS)
+                continue
+            await self._run_task(scraper, task)
+
+    async def _run_task(self, scraper, task: LeasedTask):
+        payload = task.payload
+        logger.info(f"🎯 Task {task.id}: topic '{payload.get('topic')}' page {payload.get('page')} "
+                    f"(attempt {task.attempts})")
+
+        work = asyncio.create_task(self._execute(scraper, payload))
+        heartbeat = asyncio.create_task(self._heartbeat(task, work))
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            # Le heartbeat ne se termine de lui-même que sur un bail perdu
+            lease_lost = heartbeat.done() and not heartbeat.cancelled()
+            if current_task_cancelling(fallback=not lease_lost):
+                raise  # arrêt du nœud : le bail expirera et la tâche sera reprise
+            logger.warning(f"⚠️  Task {task.id} abandoned: lease lost")
+            self.failed += 1
+            return
+        except Exception as e:
+            logger.error(f"❌ Task {task.id} failed: {e}")
+            self.failed += 1
+            try:
+                await asyncio.to_thread(self.queue.fail, task, str(e))
+            except LeaseLostError:
+                pass
+            return
+        finally:
+            heartbeat.cancel()
+
+        try:
+            await asyncio.to_thread(self.queue.complete, task, result)
+            self.processed += 1
+        except LeaseLostError:
+            # Un autre nœud a repris la tâche : son résultat fera foi
+            logger.warning(f"⚠️  Task {task.id} finished after its lease expired, result discarded")
+            self.failed += 1
+
+    async def _heartbeat(self, task: LeasedTask, work: asyncio.Task):
+        """Renew the lease at a third of its duration; cancel the work if the lease is lost"""
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, task)
+            except LeaseLostError:
+                work.cancel()
+                return
+            except Exception as e:
+                logger.warning(f"Heartbeat of task {task.id} failed: {e}")
+
+    async def _execute(self, scraper, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if payload.get("type") != "topic_page":
+            raise ValueError(f"Unknown task type: {payload.get('type')}")
+
+        topic = payload["topic"]
+        quotes = await scraper.scrape_topic_page(topic, payload["page"], max_quotes=payload.get("max_quotes"))
+        result: Dict[str, Any] = {
+            "topic": topic,
+            "page": payload["page"],
+            "end": quotes is None,  # au-delà de la dernière page
+            "quotes": quotes.to_dicts() if quotes else [],  # résultat JSON de la tâche
+            "worker_id": self.worker_id,
+        }
+
+        if self._storage is not None and quotes:
+            stored = await self._storage.store_quotes_batch(quotes, topic=topic)
+            result["stored_quotes"] = stored.get("stored_quotes", 0)
+        return result
+
+
+async def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a distributed scraper node")
+    parser.add_argument("--queue", default=settings.TASK_QUEUE_URL or "sqlite:///tasks.db",
+                        help="redis://host:port/db or sqlite:///path (default: TASK_QUEUE_URL)")
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--concurrency", type=int, default=1, help="pages scraped in parallel on this node")
+    parser.add_argument("--lease", type=int, default=settings.TASK_LEASE_SECONDS, help="lease duration (seconds)")
+    parser.add_argument("--store", action="store_true", help="store quotes in Supabase from the node")
+    parser.add_argument("--max-tasks", type=int, default=None, help="exit after N tasks or when the queue is empty")
+    parser.add_argument("--enqueue", metavar="TOPIC", default=None, help="queue the pages of a topic and exit")
+    parser.add_argument("--pages", type=int, default=5, help="pages to queue with --enqueue")
+    args = parser.parse_args(argv)
+
+    queue = create_task_queue(args.queue, lease_seconds=args.lease)
+    if args.enqueue:
+        enqueue_topic(queue, args.enqueue, args.pages)
+        logger.info(f"📊 Queue: {queue.stats()}")
+        return
+
+    node = WorkerNode(queue, args.worker_id, args.concurrency, args.store, args.max_tasks)
+    await node.run()
+
+
+if __name__ == "__main__":
+    from core.log import setup_logging_from_settings
+
+    setup_logging_from_settings()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
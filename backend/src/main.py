@@ -7,30 +7,44 @@ import asyncio
 import json
 import time
 import os
+import uuid
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, Optional, List
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from typing import Any, AsyncIterator, Dict, Literal, Optional, List, Tuple
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from scraper.brainyquote_hybrid import HybridBrainyQuoteScraper
+from scraper.topic_cache import TopicResultCache
+from scraper.incremental import PageFingerprintStore
 from database.supabase_storage import SupabaseQuoteStorage
+from search.inverted_index import QuoteSearchIndex
+from search.similarity import QuoteVectorIndex
+from search.near_duplicates import NearDuplicateDetector
+from core.config import settings
+from core.broadcaster import WebSocketBroadcaster
+from core.records import QuoteBatch, QuoteRecord
+from core.log import setup_logging_from_settings
+from core import metrics, profiling
+from core.compat import uncancel_current_task
+from core.concurrency import concurrency_stats
+from core.rate_limit import shared_rate_limiter
+from core.retry import shared_retrier
+from jobs.scheduler import JobScheduler, QueueFullError, ScrapeJob
+from jobs.process_worker import QUOTE_EVENT_BATCH, ProcessWorkerPool, scrape_job_events
+from jobs.checkpoint import CheckpointStore, JobCheckpoint
+from jobs.task_queue import create_task_queue
+from jobs.worker_node import collect_topic_results, enqueue_topic, topic_task_ids
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: records are queued, formatted and written by a background thread
+setup_logging_from_settings(log_file=settings.LOG_FILE)
 
 logger = logging.getLogger(__name__)
 
@@ -50,159 +64,474 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global state for API
-scraping_state = {
-    "status": "idle",
-    "current_topic": "",
-    "progress": {"current": 0, "total": 0},
-    "stats": {"extracted": 0, "images": 0, "errors": 0, "elapsed": 0},
-    "start_time": None,
-}
-
-# Cooperative stop flag
-stop_requested = False
-
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"📡 WebSocket connected. Total connections: {len(self.active_connections)}")
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"📡 WebSocket disconnected. Total connections: {len(self.active_connections)}")
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        try:
-            await websocket.send_text(message)
-        except:
-            self.disconnect(websocket)
-
-    async def broadcast(self, message: str):
-        """Broadcast message to all connected clients"""
-        if not self.active_connections:
-            logger.warning(f"📡 No WebSocket connections to broadcast to")
-            return
+# WebSocket clients: per-client queues, progress coalescing, batched frames
+manager = WebSocketBroadcaster()
 
-        logger.info(f"📡 Broadcasting to {len(self.active_connections)} connections: {message[:100]}...")
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"📡 Failed to send to connection: {e}")
-                disconnected.append(connection)
+# Full-text index over every scraped quote
+search_index = QuoteSearchIndex(settings.SEARCH_INDEX_FILE)
+
+# Hashing-trick embeddings for "more quotes like this"
+vector_index = QuoteVectorIndex(settings.VECTOR_INDEX_DIR)
+
+# MinHash/LSH signatures of stored quotes, shared by every storage instance
+near_duplicates = NearDuplicateDetector()
 
-        # Remove disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+# Optional scraper worker processes (SCRAPER_WORKER_PROCESSES > 0)
+process_pool = ProcessWorkerPool(settings.SCRAPER_WORKER_PROCESSES) if settings.SCRAPER_WORKER_PROCESSES > 0 else None
+
+# Cached topic results: repeated requests skip Chromium
+topic_cache = TopicResultCache(
+    settings.TOPIC_CACHE_DIR,
+    ttl=settings.TOPIC_CACHE_TTL,
+    stale_ttl=settings.TOPIC_CACHE_STALE_TTL,
+    max_entries=settings.TOPIC_CACHE_MAX_ENTRIES
+)
+
+# Crawl checkpoints for resumable jobs
+checkpoints = CheckpointStore(settings.CHECKPOINT_DIR)
+
+# Page fingerprints of incremental re-scrapes, recorded once their quotes are stored
+page_fingerprints = PageFingerprintStore(settings.PAGE_FINGERPRINT_DIR)
+
+# Phase summaries and sampled stacks of the jobs run with profile=true
+profiles = profiling.ProfileStore(settings.PROFILE_DIR)
+
+# Shared topic/page task queue consumed by distributed worker nodes (TASK_QUEUE_URL)
+task_queue = create_task_queue(settings.TASK_QUEUE_URL, lease_seconds=settings.TASK_LEASE_SECONDS) if settings.TASK_QUEUE_URL else None
+
+# Scraping jobs: priority queue + bounded worker pool
+scheduler = JobScheduler(
+    lambda job: api_scraping_workflow(job),
+    max_workers=process_pool.num_workers if process_pool else settings.MAX_CONCURRENT_JOBS,
+    max_queued=settings.MAX_QUEUED_JOBS
+)
 
-manager = ConnectionManager()
+# Profondeurs de files, calculées au moment où /metrics est lu
+metrics.REGISTRY.gauge("scrape_jobs_queued", "Jobs waiting for a worker",
+                       collect=lambda: {(): scheduler.queued_count()})
+metrics.REGISTRY.gauge("scrape_jobs_running", "Jobs currently running",
+                       collect=lambda: {(): scheduler.running_count()})
+metrics.REGISTRY.gauge("websocket_clients", "Connected WebSocket clients",
+                       collect=lambda: {(): len(manager.channels)})
+metrics.REGISTRY.gauge("websocket_queued_messages", "Messages waiting in the WebSocket client queues",
+                       collect=lambda: {(): manager.stats()["queued"]})
+metrics.REGISTRY.gauge("adaptive_concurrency_limit", "Current AIMD concurrency limit", ["name"],
+                       collect=lambda: {(name,): stats["limit"] for name, stats in concurrency_stats().items()})
+# Compteurs de la file partagée (I/O Redis/SQLite) : lus hors de la boucle par /metrics, puis rendus
+distributed_task_counts: Dict[str, int] = {}
+if task_queue is not None:
+    metrics.REGISTRY.gauge("distributed_tasks", "Tasks of the shared topic/page queue by status", ["status"],
+                           collect=lambda: {(status,): count for status, count in distributed_task_counts.items()})
 
 # Pydantic models
 class ScrapeRequest(BaseModel):
     topic: str
     max_quotes: Optional[int] = None  # None = extraire toutes les citations
+    max_pages: int = 1  # Pages du topic parcourues (les citations arrivent page par page)
     include_images: bool = True
     store_in_database: bool = True
+    use_cache: bool = True  # Résultat en cache accepté pour ce topic
+    incremental: Optional[Literal["stop", "skip"]] = None  # Re-scrape : s'arrêter aux pages connues / sauter les inchangées
+    profile: bool = False  # Échantillonner les piles pendant le job (/api/jobs/{id}/profile?format=folded)
+    priority: int = 0  # Plus grand = exécuté en premier
+
+class DistributedScrapeRequest(BaseModel):
+    topic: str
+    max_pages: int = 5
+    max_quotes_per_page: Optional[int] = None
 
 class ScrapeResponse(BaseModel):
     success: bool
     message: str
     data: Optional[Dict] = None
 
+# Index warm-load running in the background: /health answers before the files are read
+index_warmup: Optional[asyncio.Task] = None
+
+async def warm_load_indexes():
+    await asyncio.to_thread(search_index.load)
+    await asyncio.to_thread(vector_index.load)
+
+async def indexes_ready():
+    """Wait for the warm-load of the search and similarity indexes (immediate once done)"""
+    if index_warmup is not None and not index_warmup.done():
+        await asyncio.shield(index_warmup)
+
+@app.on_event("startup")
+async def load_search_index():
+    """Start warm-loading the quote search and similarity indexes from disk"""
+    global index_warmup
+    index_warmup = asyncio.create_task(warm_load_indexes())
+
+@app.on_event("startup")
+async def start_scheduler():
+    """Start the scraping job workers (and the scraper processes in worker mode)"""
+    if process_pool is not None:
+        process_pool.start()
+    await scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    """Stop running jobs and the workers"""
+    await scheduler.shutdown()
+    if process_pool is not None:
+        await asyncio.to_thread(process_pool.shutdown)
+
 # FastAPI Routes
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
-@app.get("/api/scrape/status")
-async def get_scraping_status():
-    """Get current scraping status"""
-    elapsed = 0
-    if scraping_state["start_time"]:
-        elapsed = int(time.time() - scraping_state["start_time"])
-
+def job_status_payload(job: Optional[ScrapeJob]) -> Dict:
+    """Status of a job in the legacy /api/scrape/status shape"""
+    if job is None:
+        return {
+            "job_id": None,
+            "status": "idle",
+            "current_topic": "",
+            "progress": {"current": 0, "total": 0},
+            "stats": {"extracted": 0, "images": 0, "errors": 0, "elapsed": 0},
+            "elapsed": 0
+        }
     return {
-        "status": scraping_state["status"],
-        "current_topic": scraping_state["current_topic"],
-        "progress": scraping_state["progress"],
-        "stats": scraping_state["stats"],
-        "elapsed": elapsed
+        "job_id": job.id,
+        "status": job.status,
+        "current_topic": job.topic,
+        "progress": job.progress,
+        "stats": job.stats,
+        "elapsed": job.elapsed
     }
 
-@app.post("/api/scrape/start", response_model=ScrapeResponse)
-async def start_scraping(request: ScrapeRequest, background_tasks: BackgroundTasks):
-    """Start scraping quotes"""
-
-    if scraping_state["status"] in ["starting", "running"]:
-        raise HTTPException(status_code=400, detail="Scraping already in progress")
+@app.get("/api/scrape/status")
+async def get_scraping_status():
+    """Get status of the most recent scraping job"""
+    status = job_status_payload(scheduler.latest())
+    status["queued_jobs"] = scheduler.queued_count()
+    status["running_jobs"] = scheduler.running_count()
+    return status
 
+@app.post("/api/scrape/start", response_model=ScrapeResponse)
+async def start_scraping(request: ScrapeRequest):
+    """Queue a scraping job"""
     try:
-        # Initialize scraping state
-        scraping_state.update({
-            "status": "starting",
-            "current_topic": request.topic,
-            "progress": {"current": 0, "total": request.max_quotes or 0},
-            "stats": {"extracted": 0, "images": 0, "errors": 0, "elapsed": 0},
-            "start_time": time.time()
-        })
-
-        # Start background task using existing workflow
-        background_tasks.add_task(
-            api_scraping_workflow,
+        job = scheduler.submit(
             request.topic,
-            request.max_quotes,
-            request.include_images,
-            request.store_in_database
-        )
-
-        return ScrapeResponse(
-            success=True,
-            message=f"Scraping started for topic: {request.topic}",
-            data={"topic": request.topic, "max_quotes": request.max_quotes}
+            {
+                "max_quotes": request.max_quotes,
+                "max_pages": request.max_pages,
+                "include_images": request.include_images,
+                "store_in_database": request.store_in_database,
+                "use_cache": request.use_cache,
+                "incremental": request.incremental,
+                "profile": request.profile
+            },
+            priority=request.priority
         )
-
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting scraping: {e}")
-        scraping_state["status"] = "error"
         raise HTTPException(status_code=500, detail=str(e))
 
+    return ScrapeResponse(
+        success=True,
+        message=f"Scraping queued for topic: {request.topic}",
+        data={
+            "job_id": job.id,
+            "topic": request.topic,
+            "max_quotes": request.max_quotes,
+            "status": job.status,
+            "position": scheduler.position(job.id)
+        }
+    )
+
 @app.post("/api/scrape/stop", response_model=ScrapeResponse)
-async def stop_scraping():
-    """Stop current scraping"""
+async def stop_scraping(job_id: Optional[str] = None):
+    """Stop one job, or every queued and running job when no job_id is given"""
+    if job_id:
+        if not scheduler.stop(job_id):
+            raise HTTPException(status_code=400, detail="Job is not queued or running")
+        stopped = [job_id]
+    else:
+        stopped = [job.id for job in scheduler.list() if scheduler.stop(job.id)]
+        if not stopped:
+            raise HTTPException(status_code=400, detail="No scraping in progress")
+
+    return ScrapeResponse(
+        success=True,
+        message="Scraping stopped successfully",
+        data={"job_ids": stopped}
+    )
+
+@app.get("/api/jobs")
+async def list_jobs():
+    """List known jobs, most recent first"""
+    return {"jobs": [job.to_dict() for job in scheduler.list()]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of one job"""
+    job = scheduler.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {**job.to_dict(), "position": scheduler.position(job_id)}
+
+@app.get("/api/jobs/{job_id}/profile")
+async def get_job_profile(job_id: str, format: str = Query("json", pattern="^(json|folded)$")):
+    """Phase timeline of a job; format=folded returns the stacks sampled during a job run with profile=true"""
+    if format == "folded":
+        folded = await asyncio.to_thread(profiles.load_folded, job_id)
+        if folded is None:
+            raise HTTPException(status_code=404, detail="No sampled profile for this job (start it with profile=true)")
+        return Response(folded, media_type="text/plain; charset=utf-8")
+
+    job = scheduler.get(job_id)
+    if job is not None:
+        return {"job_id": job.id, "topic": job.topic, "status": job.status, **job.profile.summary()}
+    # Job sorti de l'historique : le résumé d'un job profilé reste sur disque
+    saved = await asyncio.to_thread(profiles.load, job_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return saved
+
+@app.post("/api/jobs/{job_id}/resume", response_model=ScrapeResponse)
+async def resume_job(job_id: str, priority: Optional[int] = None):
+    """Queue a new job continuing a stopped, failed or interrupted crawl from its checkpoint"""
+    job = scheduler.get(job_id)
+    if job and job.is_active:
+        raise HTTPException(status_code=400, detail="Job is still queued or running")
+    checkpoint = await asyncio.to_thread(checkpoints.load, job_id)
+    if checkpoint is None or not checkpoint.resumable:
+        raise HTTPException(status_code=404, detail="No resumable checkpoint for this job")
+
+    params = {**checkpoint.params, "resume_from": job_id}
+    try:
+        resumed = scheduler.submit(checkpoint.topic, params,
+                                   priority=priority if priority is not None else (job.priority if job else 0))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return ScrapeResponse(
+        success=True,
+        message=f"Resuming '{checkpoint.topic}' from page {checkpoint.next_page}",
+        data={
+            "job_id": resumed.id,
+            "resumed_from": job_id,
+            "start_page": checkpoint.next_page,
+            "extracted": checkpoint.extracted,
+            "pending": len(checkpoint.pending),
+        }
+    )
+
+@app.get("/api/cache/stats")
+async def topic_cache_stats():
+    """Hits, misses, coalesced requests and background refreshes of the topic cache"""
+    return topic_cache.stats()
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format"""
+    if task_queue is not None:
+        try:
+            distributed_task_counts.update(await asyncio.to_thread(task_queue.stats))
+        except Exception as e:
+            logger.warning(f"⚠️  Could not read the task queue counters: {e}")
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/reliability/stats")
+async def reliability_stats():
+    """Retries, open circuit breakers, per-host rate limiting and adaptive concurrency of this process"""
+    return {
+        "retries": shared_retrier().stats(),
+        "rate_limits": shared_rate_limiter().stats(),
+        "concurrency": concurrency_stats()
+    }
+
+@app.get("/api/checkpoints")
+async def list_checkpoints():
+    """Crawls that can be resumed"""
+    return {"checkpoints": [
+        {
+            "job_id": cp.job_id,
+            "topic": cp.topic,
+            "status": cp.status,
+            "last_page": cp.last_page,
+            "extracted": cp.extracted,
+            "pending": len(cp.pending),
+            "updated_at": datetime.fromtimestamp(cp.updated_at).isoformat(),
+        }
+        for cp in await asyncio.to_thread(checkpoints.list) if cp.resumable
+    ]}
+
+# Keep-alive des flux inactifs (les proxys coupent les connexions muettes)
+STREAM_KEEPALIVE_SECONDS = 15
+
+def format_stream_event(fmt: str, event_id: Optional[int], kind: str, data: Dict) -> str:
+    """One event in SSE or NDJSON framing"""
+    if fmt == "ndjson":
+        return json.dumps({"id": event_id, "event": kind, "data": data}) + "\n"
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+async def job_event_stream(job: ScrapeJob, fmt: str, last_id: int) -> AsyncIterator[str]:
+    """Logged events of a job after ``last_id``, then live ones until the job finishes"""
+    if fmt == "sse":
+        yield "retry: 3000\n\n"
+    status = None
+    while True:
+        if job.status != status:
+            status = job.status
+            yield format_stream_event(fmt, None, "status", {"status": status, "stats": job.stats})
+
+        events = job.events_after(last_id)
+        if events:
+            # Un seul chunk par réveil, quel que soit le nombre d'événements
+            yield "".join(format_stream_event(fmt, event_id, kind, data) for event_id, kind, data in events)
+            last_id = events[-1][0]
+            continue
+
+        if not job.is_active:
+            yield format_stream_event(fmt, None, "end", {"status": job.status, "stats": job.stats, "error": job.error})
+            return
 
-    if scraping_state["status"] not in ["starting", "running"]:
-        raise HTTPException(status_code=400, detail="No scraping in progress")
-    global stop_requested
-    stop_requested = True
-    scraping_state["status"] = "stopped"
+        if not await job.wait_for_events(last_id, STREAM_KEEPALIVE_SECONDS):
+            yield ": keepalive\n\n" if fmt == "sse" else "\n"
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_job(
+    job_id: str,
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Stream the quotes of a job as Server-Sent Events or NDJSON while they are extracted"""
+    job = scheduler.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    last_id = last_event_id
+    if last_id is None and last_event_id_header:
+        try:
+            last_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        job_event_stream(job, format, last_id or 0),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
+@app.post("/api/jobs/{job_id}/stop", response_model=ScrapeResponse)
+async def stop_job(job_id: str):
+    """Stop one job"""
+    if not scheduler.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not scheduler.stop(job_id):
+        raise HTTPException(status_code=400, detail="Job is not queued or running")
+    return ScrapeResponse(success=True, message="Job stopped", data={"job_ids": [job_id]})
+
+def require_task_queue():
+    if task_queue is None:
+        raise HTTPException(status_code=503, detail="Distributed mode is disabled (TASK_QUEUE_URL is not set)")
+    return task_queue
+
+@app.post("/api/distributed/crawls", response_model=ScrapeResponse)
+async def start_distributed_crawl(request: DistributedScrapeRequest):
+    """Split a topic into page tasks for the worker nodes"""
+    queue = require_task_queue()
+    if request.max_pages < 1:
+        raise HTTPException(status_code=400, detail="max_pages must be at least 1")
+    # Id sans le topic (qui peut contenir "/" ou "?") : toujours utilisable dans l'URL de suivi
+    crawl_id = f"{uuid.uuid4().hex}:{request.max_pages}"
+    await asyncio.to_thread(enqueue_topic, queue, request.topic, request.max_pages,
+                            request.max_quotes_per_page, crawl_id)
     return ScrapeResponse(
         success=True,
-        message="Scraping stopped successfully"
+        message=f"Queued {request.max_pages} page task(s) for '{request.topic}'",
+        data={"crawl_id": crawl_id}
     )
 
+@app.get("/api/distributed/crawls/{crawl_id}")
+async def get_distributed_crawl(crawl_id: str, include_quotes: bool = False):
+    """Progress of a distributed crawl (the page count is encoded in the crawl id)"""
+    queue = require_task_queue()
+    try:
+        max_pages = int(crawl_id.rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        raise HTTPException(status_code=404, detail="Crawl not found")
+    report = await asyncio.to_thread(collect_topic_results, queue, topic_task_ids(crawl_id, max_pages))
+    if not any(report["tasks"].values()):
+        raise HTTPException(status_code=404, detail="Crawl not found")
+    quotes = report.pop("quotes")
+    report["quotes_count"] = len(quotes)
+    if include_quotes:
+        report["quotes"] = quotes
+    return {"crawl_id": crawl_id, **report}
+
+@app.get("/api/distributed/stats")
+async def distributed_stats():
+    """Tasks per status in the shared queue"""
+    queue = require_task_queue()
+    return await asyncio.to_thread(queue.stats)
+
+@app.get("/api/quotes/search")
+async def search_quotes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text search (text + author) over scraped quotes, ranked with BM25"""
+    await indexes_ready()
+    start = time.perf_counter()
+    total, results = search_index.search(q, limit=limit, offset=offset)
+    return {
+        "query": q,
+        "total": total,
+        "results": results,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+@app.get("/api/quotes/{quote_id}/similar")
+async def similar_quotes(quote_id: str, limit: int = Query(10, ge=1, le=100)):
+    """Quotes most similar to an indexed quote (cosine similarity of hashed embeddings)"""
+    await indexes_ready()
+    if quote_id not in vector_index:
+        raise HTTPException(status_code=404, detail="Quote not found in similarity index")
+
+    start = time.perf_counter()
+    # Produit matrice-vecteur sur toute la matrice : hors de la boucle d'événements
+    neighbours = await asyncio.to_thread(vector_index.similar, quote_id, limit)
+    results = []
+    for fingerprint, similarity in neighbours:
+        quote = search_index.get(fingerprint) or {"id": fingerprint}
+        quote["similarity"] = similarity
+        results.append(quote)
+
+    return {
+        "quote": search_index.get(quote_id),
+        "results": results,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
 @app.websocket("/ws/scraping")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time scraping updates"""
     await manager.connect(websocket)
     try:
         # Send initial status
+        latest = job_status_payload(scheduler.latest())
         initial_status = {
             "type": "status",
-            "status": scraping_state["status"],
-            "progress": scraping_state["progress"],
-            "stats": scraping_state["stats"],
-            "elapsed": int(time.time() - scraping_state["start_time"]) if scraping_state["start_time"] else 0
+            "job_id": latest["job_id"],
+            "status": latest["status"],
+            "progress": latest["progress"],
+            "stats": latest["stats"],
+            "elapsed": latest["elapsed"]
         }
-        await manager.send_personal_message(json.dumps(initial_status), websocket)
+        manager.send_personal_message(json.dumps(initial_status), websocket)
 
         # Keep connection alive
         while True:
@@ -211,7 +540,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 data = await websocket.receive_text()
                 # Echo back or handle specific commands
                 if data == "ping":
-                    await manager.send_personal_message("pong", websocket)
+                    manager.send_personal_message("pong", websocket)
             except WebSocketDisconnect:
                 break
 
@@ -227,28 +556,157 @@ async def broadcast_update(update_type: str, data: Dict):
         "timestamp": datetime.now().isoformat(),
         **data
     }
-    await manager.broadcast(json.dumps(message))
+    manager.publish(message)
+
+async def scrape_events(job: ScrapeJob, params: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Events of a scrape, from a scraper worker process or from a scraper opened here"""
+    def should_stop():
+        return job.stop_requested
+
+    if process_pool is not None:
+        async for event in process_pool.run_job(job.id, job.topic, params, should_stop):
+            yield event
+        return
+
+    async with HybridBrainyQuoteScraper(stop_check_callback=should_stop) as scraper:
+        async for event in scrape_job_events(scraper, job.topic, params):
+            yield event
+
+def collect_final_quote(final: Dict[str, QuoteRecord], kind: str, payload: Any):
+    """Keep the latest version of each quote (with its image once downloaded)"""
+    if kind == "quotes":
+        batch = payload
+    elif kind == "images":
+        batch = payload["quotes"]
+    else:
+        return
+    for quote in batch:
+        final[quote.fingerprint] = quote
+
+async def scrape_topic_quotes(topic: str, params: Dict[str, Any]) -> QuoteBatch:
+    """Full scrape outside of any job (background refresh of the topic cache)"""
+    final: Dict[str, QuoteRecord] = {}
+    async for kind, payload in scrape_events(ScrapeJob(topic, params), params):
+        collect_final_quote(final, kind, payload)
+    return QuoteBatch(final.values())
+
+async def cached_events(quotes: QuoteBatch, include_images: bool) -> AsyncIterator[Tuple[str, Any]]:
+    """Replay a cached result as scrape events (the records are shared with the cache, not copied)"""
+    for i in range(0, len(quotes), QUOTE_EVENT_BATCH):
+        yield "quotes", quotes[i:i + QUOTE_EVENT_BATCH]
+    if include_images and quotes:
+        yield "images_started", None
+        yield "images", {"quotes": quotes, "downloaded": quotes.images_downloaded()}
+
+async def job_events(job: ScrapeJob, params: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Events of a job: from the topic cache when possible, else from a scrape that fills it"""
+    use_cache = (params.get("use_cache", True) and not params.get("incremental")
+                 and params.get("start_page", 1) == 1 and not params.get("resume_quotes"))
+    if not use_cache:
+        async for event in scrape_events(job, params):
+            yield event
+        return
 
-async def api_scraping_workflow(topic: str, max_quotes: Optional[int], include_images: bool, store_in_database: bool):
+    include_images = params.get("include_images", True)
+    cache_params = {key: params.get(key) for key in ("max_pages", "max_quotes", "include_images")}
+    key = topic_cache.key(job.topic, **cache_params)
+    with profiling.span("cache_lookup"):
+        cached, status = await topic_cache.lookup(key, lambda: scrape_topic_quotes(job.topic, cache_params))
+    job.stats["cache"] = status
+    if cached is not None:
+        logger.info(f"⚡ Topic '{job.topic}' served from cache ({status}, {len(cached)} quotes)")
+        async for event in cached_events(cached, include_images):
+            yield event
+        return
+
+    # Ce job est le seul scrape pour cette clé : les requêtes identiques attendent son résultat
+    final: Dict[str, QuoteRecord] = {}
+    try:
+        async for kind, payload in scrape_events(job, params):
+            collect_final_quote(final, kind, payload)
+            yield kind, payload
+    except BaseException as e:
+        topic_cache.finish_flight(key, error=e if isinstance(e, Exception) else None)
+        raise
+    topic_cache.finish_flight(key, None if job.stop_requested else QuoteBatch(final.values()))
+
+async def publish_quotes(job: ScrapeJob, batch: List[QuoteRecord], broadcast_job_update):
+    """Record a batch of extracted quotes: job progress, indexes and WebSocket events"""
+    first = job.stats["extracted"]
+    extracted = first + len(batch)
+    job.stats["extracted"] = extracted
+    job.progress["current"] = extracted
+
+    # Index new quotes for search and similarity
+    await indexes_ready()
+    search_index.add_quotes(batch, topic=job.topic)
+    vector_index.add_quotes(batch)
+
+    # Broadcast each quote as it's extracted (the broadcaster groups them into frames)
+    total = job.params.get("max_quotes") or extracted
+    for i, quote in enumerate(batch, first):
+        if job.stop_requested:
+            logger.info("⛔ Stop requested - aborting quote broadcast loop")
+            break
+
+        quote_payload = {
+            "id": quote.index,
+            "text": quote.text,
+            "author": quote.author,
+            "topic": job.topic,
+            "link": quote.link,
+            "image_url": quote.image_url
+        }
+        job.record_event("quote", quote_payload)
+        await broadcast_job_update("quote_extracted", {
+            "quote": quote_payload,
+            "progress": {"current": i + 1, "total": total}
+        })
+
+    # One progress update per batch, coalesced per client anyway
+    await broadcast_job_update("progress", {
+        "message": f"{extracted} citations extraites",
+        "current": extracted,
+        "total": total
+    })
+
+# Délai max pour stocker les résultats partiels d'un job annulé
+STOP_FLUSH_TIMEOUT = 10
+
+async def api_scraping_workflow(job: ScrapeJob):
     """
-    API version of the scraping workflow with WebSocket updates
-    
-    Args:
-        topic: Le sujet des citations
+    API version of the scraping workflow with WebSocket updates, run by a scheduler worker
+
+    Job params:
         max_quotes: Nombre max de citations (None = toutes)
+        max_pages: Nombre de pages du topic
         include_images: Télécharger les images
         store_in_database: Stocker dans Supabase
+        resume_from: Job dont le checkpoint est repris
     """
+    topic = job.topic
+    max_quotes = job.params.get("max_quotes")
+    store_in_database = job.params.get("store_in_database", True)
+    checkpoint = JobCheckpoint(job.id, topic, job.params)
+
+    async def broadcast_job_update(update_type: str, data: Dict):
+        await broadcast_update(update_type, {"job_id": job.id, "topic": topic, **data})
+
+    # Phases du job (spans du scraper et du stockage), piles échantillonnées si profile=true
+    profiling.activate(job.profile)
+    sampler = None
+    if job.params.get("profile"):
+        sampler = profiling.StackSampler(interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000).start()
+
     try:
-        global stop_requested
-        stop_requested = False
-        scraping_state["status"] = "running"
-        
+        job.status = "running"
+        job.notify_subscribers()
+
         mode_msg = "TOUTES les citations" if max_quotes is None else f"{max_quotes} citations max"
         logger.info(f"🚀 API: Starting scraping workflow for topic: {topic} ({mode_msg})")
 
         # Broadcast start
-        await broadcast_update("status", {
+        await broadcast_job_update("status", {
             "status": "running",
             "message": f"Démarrage du scraping pour '{topic}' ({mode_msg})"
         })
@@ -259,126 +717,240 @@ async def api_scraping_workflow(topic: str, max_quotes: Optional[int], include_i
             # Check if environment variables are set
             if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_SERVICE_KEY") or not os.getenv("SUPABASE_ANON_KEY"):
                 logger.warning("Supabase credentials not found. Using local storage only.")
-                await broadcast_update("error", {
+                await broadcast_job_update("error", {
                     "message": "Clés Supabase manquantes - stockage local uniquement"
                 })
                 store_in_database = False
             else:
-                storage = SupabaseQuoteStorage()
-
-        # Use context manager for scraper with stop check callback
-        def should_stop():
-            return stop_requested
-        
-        async with HybridBrainyQuoteScraper(stop_check_callback=should_stop) as scraper:
-            # Phase 1: Scrape quotes
-            await broadcast_update("progress", {
-                "message": f"Phase 1: Extraction des citations...{' (toutes)' if max_quotes is None else ''}",
-                "current": 0,
-                "total": max_quotes or 0
-            })
+                storage = SupabaseQuoteStorage(near_duplicates=near_duplicates)
 
-            quotes = await scraper.scrape_topic(topic, max_quotes=max_quotes)
-
-            logger.info(f"✅ Scraped {len(quotes)} quotes successfully")
-            scraping_state["stats"]["extracted"] = len(quotes)
-            scraping_state["progress"]["current"] = len(quotes)
-            scraping_state["progress"]["total"] = max_quotes or len(quotes)  # Si None, utiliser le nombre extrait
-
-            # Broadcast each quote as it's extracted
-            for i, quote in enumerate(quotes):
-                if stop_requested:
-                    logger.info("⛔ Stop requested - aborting quote broadcast loop")
-                    break
-                    
-                await broadcast_update("quote_extracted", {
-                    "quote": {
-                        "id": quote.get('index', i),
-                        "text": quote.get('text'),
-                        "author": quote.get('author'),
-                        "topic": topic,
-                        "link": quote.get('link', ''),
-                        "image_url": quote.get('image_url', '')
-                    },
-                    "progress": {"current": i + 1, "total": len(quotes)}
-                })
-
-                # Update progress in real-time
-                await broadcast_update("progress", {
-                    "message": f"Citation {i + 1}/{len(quotes)} extraite",
-                    "current": i + 1,
-                    "total": len(quotes)
-                })
+        # Phase 1: Scrape quotes (in this process, or in a scraper worker process)
+        await broadcast_job_update("progress", {
+            "message": f"Phase 1: Extraction des citations...{' (toutes)' if max_quotes is None else ''}",
+            "current": 0,
+            "total": max_quotes or 0
+        })
 
-            # Phase 2: Download images
-            if include_images and not stop_requested:
-                await broadcast_update("progress", {
-                    "message": "Phase 2: Téléchargement des images...",
-                    "current": len(quotes),
+        # Each page is stored as soon as it is final (after its images when they are downloaded)
+        include_images = job.params.get("include_images", True)
+        storage_totals = {"stored_quotes": 0, "merged_duplicates": 0}
+        storage_started = False
+        persisted = set()  # empreintes des citations écrites en base par ce job (mode incrémental)
+        pending: Dict[str, QuoteRecord] = {}  # citations publiées mais pas encore stockées, par empreinte
+
+        # Reprise : pages déjà faites, citations vues et travail en attente viennent du checkpoint
+        resume_from = job.params.get("resume_from")
+        if resume_from:
+            previous = await asyncio.to_thread(checkpoints.load, resume_from)
+            if previous is None:
+                raise RuntimeError(f"No checkpoint found for job {resume_from}")
+            checkpoint.last_page = previous.last_page
+            checkpoint.extracted = previous.extracted
+            checkpoint.fingerprints = previous.fingerprints
+            checkpoint.resumed_from = resume_from
+            pending.update((quote.fingerprint, quote) for quote in QuoteBatch.of(previous.pending))
+            job.stats["extracted"] = job.progress["current"] = previous.extracted
+            logger.info(f"♻️  Resuming job {resume_from} from page {checkpoint.next_page} "
+                        f"({previous.extracted} quotes, {len(pending)} pending)")
+        seen = set(checkpoint.fingerprints)
+
+        async def save_checkpoint(status: str = "running"):
+            checkpoint.status = status
+            checkpoint.extracted = job.stats["extracted"]
+            checkpoint.fingerprints = list(seen)
+            checkpoint.pending = [quote.to_dict() for quote in pending.values()]
+            with profiling.span("checkpoint", checkpoint.last_page or None):
+                await asyncio.to_thread(checkpoints.save, checkpoint)
+
+        if resume_from:
+            await save_checkpoint()
+            await asyncio.to_thread(checkpoints.delete, resume_from)
+
+        async def store_batch(batch: List[QuoteRecord]):
+            nonlocal storage, storage_started
+            if not (store_in_database and storage) or not batch:
+                return
+            if not storage_started:
+                storage_started = True
+                await broadcast_job_update("progress", {
+                    "message": "Phase 3: Stockage en base de données...",
+                    "current": job.stats["extracted"],
                     "total": max_quotes
                 })
-
-                image_results = await scraper.download_images(quotes)
-                successful_downloads = len([r for r in image_results if r.get("success")])
-                scraping_state["stats"]["images"] = successful_downloads
-
-                await broadcast_update("image_downloaded", {
-                    "message": f"{successful_downloads}/{len(quotes)} images téléchargées"
+            try:
+                results = await storage.store_quotes_batch(batch, topic=topic)
+                storage_totals["stored_quotes"] += results["stored_quotes"]
+                storage_totals["merged_duplicates"] += results["merged_duplicates"]
+                persisted.update(results["persisted_fingerprints"])
+            except Exception as e:
+                logger.error(f"Error storing in database: {e}")
+                job.stats["errors"] += 1
+                storage = None  # ne pas réessayer pour chaque page
+                await broadcast_job_update("error", {
+                    "message": f"Erreur stockage DB: {str(e)}"
                 })
 
-            # Phase 3: Store in database
-            if store_in_database and storage and not stop_requested:
-                await broadcast_update("progress", {
-                    "message": "Phase 3: Stockage en base de données...",
-                    "current": len(quotes),
-                    "total": max_quotes
-                })
+        async def store_pending(batch: List[QuoteRecord]):
+            """Store the quotes of a batch that are still pending, then checkpoint"""
+            ready = [quote for quote in batch if quote.fingerprint in pending]
+            await store_batch(ready)
+            for quote in ready:
+                pending.pop(quote.fingerprint, None)
+            await save_checkpoint()
+
+        run_params = {
+            **job.params,
+            "start_page": checkpoint.next_page,
+            "extracted_before": checkpoint.extracted,
+            "resume_quotes": QuoteBatch(pending.values()) if include_images else QuoteBatch(),
+        }
+        if pending and not include_images:
+            await store_pending(list(pending.values()))
 
-                try:
-                    stored_quotes = await storage.store_quotes_batch(quotes)
-                    logger.info(f"Stored {len(stored_quotes)} quotes in database")
+        try:
+            async for kind, payload in job_events(job, run_params):
+                if kind == "quotes":
+                    new_quotes = []
+                    for quote in payload:
+                        if quote.fingerprint not in seen:
+                            seen.add(quote.fingerprint)
+                            pending[quote.fingerprint] = quote
+                            new_quotes.append(quote)
+                    with profiling.span("publish", checkpoint.last_page + 1):
+                        await publish_quotes(job, new_quotes, broadcast_job_update)
+                    if not include_images:
+                        await store_pending(new_quotes)
+
+                elif kind == "page_done":
+                    checkpoint.last_page = payload
+                    await save_checkpoint()
+
+                elif kind == "profile":
+                    job.profile.merge(payload, source="worker")
+
+                elif kind == "incremental":
+                    job.stats["incremental"] = payload
+                    await broadcast_job_update("progress", {
+                        "message": f"Mode incrémental : {payload['pages_skipped']} page(s) ignorée(s), "
+                                   f"{payload['pages_not_fetched']} non téléchargée(s), "
+                                   f"~{payload['estimated_seconds_saved']}s économisées",
+                        "current": job.stats["extracted"],
+                        "total": max_quotes or job.stats["extracted"]
+                    })
 
-                    await broadcast_update("database_stored", {
-                        "message": f"{len(stored_quotes)} citations stockées en base"
+                elif kind == "page_fingerprints":
+                    # Seules les pages dont les citations sont en base deviennent "connues"
+                    committed = await asyncio.to_thread(page_fingerprints.commit, topic, payload, persisted)
+                    logger.info(f"🧾 {committed}/{len(payload['pages'])} page fingerprint(s) of '{topic}' recorded")
+
+                elif kind == "images_started":
+                    # Phase 2: Download images (page by page, while the next page is scraped)
+                    await broadcast_job_update("progress", {
+                        "message": "Phase 2: Téléchargement des images...",
+                        "current": job.stats["extracted"],
+                        "total": max_quotes
                     })
 
-                except Exception as e:
-                    logger.error(f"Error storing in database: {e}")
-                    scraping_state["stats"]["errors"] += 1
-                    await broadcast_update("error", {
-                        "message": f"Erreur stockage DB: {str(e)}"
+                elif kind == "images":
+                    job.stats["images"] += payload["downloaded"]
+                    await broadcast_job_update("image_downloaded", {
+                        "message": f"{job.stats['images']}/{job.stats['extracted']} images téléchargées"
                     })
+                    await store_pending(payload["quotes"])
+
+        except asyncio.CancelledError:
+            if not job.stop_requested:
+                raise
+            # Arrêt demandé : la tâche a été annulée en plein I/O, on garde ce qui a été extrait
+            uncancel_current_task()
+            job.stats["stop_latency_ms"] = job.stop_latency_ms()
+            logger.info(f"⛔ Job {job.id} interrupted {job.stats['stop_latency_ms']} ms after the stop request")
+            if pending:
+                try:
+                    await asyncio.wait_for(store_pending(list(pending.values())), STOP_FLUSH_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️  Partial results of job {job.id} not stored within {STOP_FLUSH_TIMEOUT}s")
+
+        extracted = job.stats["extracted"]
+        logger.info(f"✅ Scraped {extracted} quotes successfully")
+        job.progress["total"] = max_quotes or extracted  # Si None, utiliser le nombre extrait
+
+        # Persist the search and similarity indexes updated by publish_quotes
+        if extracted:
+            with profiling.span("index_save"):
+                await asyncio.to_thread(search_index.save)
+                await asyncio.to_thread(vector_index.flush)
+
+        if storage_started:
+            logger.info(f"Stored {storage_totals['stored_quotes']} quotes in database "
+                        f"({storage_totals['merged_duplicates']} near-duplicates merged)")
+            await broadcast_job_update("database_stored", {
+                "message": f"{storage_totals['stored_quotes']} citations stockées en base, "
+                           f"{storage_totals['merged_duplicates']} doublons fusionnés"
+            })
 
-            # Final state
-            scraping_state["stats"]["elapsed"] = int(time.time() - scraping_state["start_time"])
-            
-            if stop_requested:
-                scraping_state["status"] = "stopped"
-                await broadcast_update("stopped", {
-                    "message": "Scraping arrêté par l'utilisateur",
-                    "stats": scraping_state["stats"],
-                    "status": "stopped"
-                })
-                logger.info(f"⛔ Scraping stopped by user. Stats: {scraping_state['stats']}")
-            else:
-                scraping_state["status"] = "completed"
-                await broadcast_update("completed", {
-                    "message": "Scraping terminé avec succès!",
-                    "stats": scraping_state["stats"],
-                    "progress": {"current": scraping_state["progress"]["current"], "total": len(quotes)}
-                })
-                logger.info(f"✅ Scraping completed successfully. Stats: {scraping_state['stats']}")
+        # Final state
+        job.stats["elapsed"] = job.elapsed
+
+        if job.stop_requested:
+            job.status = "stopped"
+            await save_checkpoint("stopped")
+            await broadcast_job_update("stopped", {
+                "message": "Scraping arrêté par l'utilisateur",
+                "stop_latency_ms": job.stats.get("stop_latency_ms"),
+                "stats": job.stats,
+                "status": "stopped"
+            })
+            logger.info(f"⛔ Scraping stopped by user. Stats: {job.stats}")
+        else:
+            job.status = "completed"
+            await asyncio.to_thread(checkpoints.delete, job.id)
+            await broadcast_job_update("completed", {
+                "message": "Scraping terminé avec succès!",
+                "stats": job.stats,
+                "progress": {"current": job.progress["current"], "total": extracted}
+            })
+            logger.info(f"✅ Scraping completed successfully. Stats: {job.stats}")
 
     except Exception as e:
         logger.error(f"API scraping workflow error: {e}")
-        scraping_state["status"] = "error"
-        scraping_state["stats"]["errors"] += 1
+        job.status = "error"
+        job.error = str(e)
+        job.stats["errors"] += 1
+
+        # Le checkpoint reste sur disque pour une reprise (/api/jobs/{id}/resume)
+        if checkpoint.updated_at:
+            checkpoint.status = "error"
+            await asyncio.to_thread(checkpoints.save, checkpoint)
 
-        await broadcast_update("error", {
+        await broadcast_job_update("error", {
             "message": f"Erreur: {str(e)}",
             "status": "error"
         })
 
+    finally:
+        if sampler is not None:
+            await save_job_profile(job, sampler)
+
+async def save_job_profile(job: ScrapeJob, sampler: profiling.StackSampler):
+    """Stop the sampler of a profiled job and store its stacks next to the phase summary"""
+    for stack, count in sampler.stop().items():
+        job.profile.stacks[f"api;{stack}"] += count
+    job.profile.finish()
+    job.profile.sampling = {
+        "folded_url": f"/api/jobs/{job.id}/profile?format=folded",
+        "samples": sum(job.profile.stacks.values()),
+        "interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+        "sampled_seconds": round(sampler.duration, 3),
+        "top": profiling.top_frames(job.profile.stacks),
+    }
+    summary = {"job_id": job.id, "topic": job.topic, "status": job.status, **job.profile.summary()}
+    try:
+        await asyncio.to_thread(profiles.save, job.id, summary, dict(job.profile.stacks))
+        logger.info(f"🔬 Profile of job {job.id} saved ({job.profile.sampling['samples']} samples)")
+    except Exception as e:
+        logger.error(f"Could not save the profile of job {job.id}: {e}")
+
 async def test_supabase_connection():
     """Test Supabase connection and setup."""
     logger.info("🔗 Testing Supabase connection...")
@@ -431,6 +1003,7 @@ async def scrape_and_store_quotes():
 
     async with HybridBrainyQuoteScraper() as scraper:
         results = await scraper.scrape_quotes(test_urls)
+        await scraper.download_images(results)
 
     scrape_time = time.time() - start_time
 
@@ -488,7 +1061,7 @@ async def scrape_and_store_quotes():
 
         backup_data = {
             "workflow_results": storage_results,
-            "scraped_quotes": results,
+            "scraped_quotes": results.to_dicts(),
             "stats": stats,
             "timestamp": timestamp
         }
@@ -537,9 +1110,9 @@ async def quick_scrape_test():
 
         if result:
             logger.info(f"✅ Quick test successful:")
-            logger.info(f"   Author: {result.get('author', 'N/A')}")
-            logger.info(f"   Quote: {result.get('text', 'N/A')[:100]}...")
-            logger.info(f"   Image: {'✅' if result.get('image_data') else '❌'}")
+            logger.info(f"   Author: {result.author}")
+            logger.info(f"   Quote: {result.text[:100]}...")
+            logger.info(f"   Image: {'✅' if result.image else '❌'}")
         else:
             logger.error("❌ Quick test failed")
 
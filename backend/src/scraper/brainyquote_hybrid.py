@@ -1,13 +1,22 @@
 # src/scraper/brainyquote_hybrid.py
-from playwright.async_api import async_playwright, Browser, Page
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, AsyncIterator, List, Dict, Optional, Tuple
 import asyncio
 import logging
 import re
-import httpx
+import time
 import hashlib
 from pathlib import Path
 from core.config import settings
+from core.authors import AuthorDirectory, author_name_from_slug, author_slug_from_link
+from core.rate_limit import host_of, shared_rate_limiter
+from core.retry import PermanentError, ThrottledError, is_transient, shared_retrier
+from core.concurrency import Lease, shared_limit
+from core import metrics, profiling
+from core.records import QuoteBatch, QuoteImage, QuoteRecord
+
+if TYPE_CHECKING:
+    # Playwright et httpx sont importés à l'ouverture du navigateur / au premier téléchargement
+    from playwright.async_api import Browser, BrowserContext, Page
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +26,22 @@ class HybridBrainyQuoteScraper:
     avec l'extraction améliorée de texte et images
     """
     def __init__(self, stop_check_callback=None):
-        self.browser: Optional[Browser] = None
-        self.base_url = "https://www.brainyquote.com"
-        self.image_cache_dir = Path("cached_images")
-        self.image_cache_dir.mkdir(exist_ok=True)
+        self.browser: Optional["Browser"] = None
+        self.base_url = settings.BRAINYQUOTE_BASE_URL
+        self.image_cache_dir = Path("cached_images")  # créé au premier téléchargement
         self.stop_check_callback = stop_check_callback  # Callback to check if scraping should stop
+        self.authors = AuthorDirectory()  # Variantes de noms -> slug auteur
+        self.rate_limiter = shared_rate_limiter()  # Limite par hôte commune à tous les jobs
+        self.retrier = shared_retrier()  # Backoff et circuit breakers par opération et hôte
+        # Pages et images en parallèle, nombre ajusté (AIMD) selon la latence et les erreurs du site
+        self.page_concurrency = shared_limit("pages", initial=1, max_limit=settings.MAX_CONCURRENT_PAGES,
+                                             is_failure=is_transient)
+        self.image_concurrency = shared_limit("images", initial=2, max_limit=settings.MAX_CONCURRENT_IMAGES,
+                                              is_failure=is_transient)
 
     async def __aenter__(self):
+        from playwright.async_api import async_playwright
+
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(
             headless=settings.PLAYWRIGHT_HEADLESS,
@@ -65,24 +83,16 @@ class HybridBrainyQuoteScraper:
             await self.browser.close()
         await self.playwright.stop()
 
-    async def scrape_topic(self, topic: str, max_pages: int = 1, max_quotes: Optional[int] = None) -> List[Dict]:
-        """
-        Scrape quotes for a specific topic with enhanced extraction
-        
-        Args:
-            topic: Le sujet des citations (ex: "success", "love", etc.)
-            max_pages: Nombre de pages à scraper (default=1)
-            max_quotes: Nombre maximum de citations à extraire (None = toutes)
-        
-        Returns:
-            Liste de citations extraites
-        """
-        quotes = []
+    def _topic_url(self, topic: str, page_num: int) -> str:
+        """URL d'une page de topic (pagination _2, _3, ...)"""
+        if page_num == 1:
+            return f"{self.base_url}/topics/{topic}-quotes"
+        return f"{self.base_url}/topics/{topic}-quotes_{page_num}"
 
+    async def _new_page(self) -> Tuple["BrowserContext", "Page"]:
+        """Nouveau contexte navigateur configuré anti-détection et sa page"""
         if not self.browser:
             raise RuntimeError("Browser not initialized. Use async context manager.")
-        
-        logger.info(f"🎯 Scraping topic '{topic}' - max_pages={max_pages}, max_quotes={max_quotes or 'ALL'}")
 
         # Configuration optimisée pour être totalement indétectable
         context = await self.browser.new_context(
@@ -213,130 +223,232 @@ class HybridBrainyQuoteScraper:
             };
         """)
 
+        return context, page
+
+    async def _scrape_page(self, page: "Page", topic: str, page_num: int, max_quotes: Optional[int] = None,
+                           lease: Optional[Lease] = None) -> Optional[QuoteBatch]:
+        """
+        Charge et extrait une page de topic
+
+        Returns:
+            Citations de la page, None si la page ne contient pas de citations (fin de pagination)
+        """
+        topic_url = self._topic_url(topic, page_num)
+        logger.info("📍 URL: %s", topic_url)
+
+        # Navigation au rythme autorisé pour l'hôte (REQUEST_DELAY, ralenti par les 429),
+        # retentée avec backoff tant que le circuit de l'hôte est fermé
+        async def navigate():
+            with profiling.span("rate_limit_wait", page_num):
+                await self.rate_limiter.acquire(topic_url)
+            start = time.perf_counter()
+            try:
+                response = await page.goto(topic_url, wait_until='networkidle', timeout=60000)
+            finally:
+                profiling.record("navigation", start, page_num)  # tentatives échouées comprises
+            if response is not None and await self.rate_limiter.observe(
+                    topic_url, response.status, response.headers.get("retry-after")):
+                self.page_concurrency.record_failure("throttled")
+                raise ThrottledError(f"Rate limited by website (HTTP {response.status})")
+            latency = time.perf_counter() - start
+            metrics.PAGE_NAVIGATION_SECONDS.observe(latency)
+            if lease is not None:
+                lease.latency = latency  # latence du site, hors attente du rate limiter
+
+        await self.retrier.call("navigation", navigate, key=host_of(topic_url))
+
+        # Vérifier les blocages
+        selectors_start = time.perf_counter()
+        page_content = await page.content()
+        if "403" in page_content or "forbidden" in page_content.lower() or "blocked" in page_content.lower():
+            self.page_concurrency.record_failure("blocked")
+            raise PermanentError("Access blocked by website protection")
+
+        # Trouver les sélecteurs (comme l'original)
+        selectors_to_try = ['.bqQt', '.grid-item', '.clearfix', '[class*="quote"]']
+        quotes_selector = None
+
+        for selector in selectors_to_try:
+            try:
+                logger.info("🔍 Trying selector: %s", selector)
+                await page.wait_for_selector(selector, timeout=10000)
+                elements = await page.query_selector_all(selector)
+                logger.info("📊 Found %d elements with selector '%s'", len(elements), selector)
+                if len(elements) > 3:
+                    quotes_selector = selector
+                    break
+            except Exception as e:
+                logger.warning("Selector '%s' failed: %s", selector, e)
+                continue
+
+        profiling.record("selector_wait", selectors_start, page_num)
+
+        if not quotes_selector:
+            await page.screenshot(path=f"debug_hybrid_failed_page{page_num}.png")
+            logger.warning(f"No quotes found on page {page_num} - may have reached end of pagination")
+            metrics.PAGES_TOTAL.inc(outcome="empty")
+            return None
+
+        logger.info("✅ Using selector: %s", quotes_selector)
+
+        # Extraction améliorée avec limite dynamique
+        with metrics.PAGE_EXTRACTION_SECONDS.time(), profiling.span("extraction", page_num):
+            quotes = await self._extract_quotes_enhanced(page, quotes_selector, max_quotes=max_quotes)
+        metrics.QUOTES_PER_PAGE.observe(len(quotes))
+        metrics.PAGES_TOTAL.inc(outcome="ok")
+        return quotes
+
+    async def scrape_topic_page(self, topic: str, page_num: int, max_quotes: Optional[int] = None) -> Optional[QuoteBatch]:
+        """
+        Scrape une seule page d'un topic dans son propre contexte (tâches distribuées)
+
+        Returns:
+            Citations de la page, None si la page est au-delà de la pagination
+        """
+        slot_start = time.perf_counter()
+        async with self.page_concurrency.slot() as lease:
+            profiling.record("page_slot_wait", slot_start, page_num)
+            with profiling.span("context_setup", page_num):
+                context, page = await self._new_page()
+            try:
+                return await self._scrape_page(page, topic, page_num, max_quotes=max_quotes, lease=lease)
+            except Exception:
+                metrics.PAGES_TOTAL.inc(outcome="error")
+                try:
+                    await page.screenshot(path=f"debug_hybrid_error_{topic}_page{page_num}.png")
+                except Exception:
+                    pass
+                raise
+            finally:
+                await context.close()
+
+    async def scrape_topic_stream(self, topic: str, max_pages: int = 1, max_quotes: Optional[int] = None,
+                                  start_page: int = 1) -> AsyncIterator[QuoteBatch]:
+        """
+        Scrape a topic page by page, yielding each page's quotes as soon as they are extracted
+
+        Args:
+            topic: Le sujet des citations (ex: "success", "love", etc.)
+            max_pages: Dernière page à scraper (default=1)
+            max_quotes: Nombre maximum de citations à extraire (None = toutes)
+            start_page: Première page (reprise d'un crawl depuis un checkpoint)
+
+        Yields:
+            Citations d'une page
+        """
+        if not self.browser:
+            raise RuntimeError("Browser not initialized. Use async context manager.")
+
+        logger.info(f"🎯 Scraping topic '{topic}' - max_pages={max_pages}, max_quotes={max_quotes or 'ALL'}")
+
+        # Les pages suivantes sont chargées en avance (chacune dans son contexte) dans la limite
+        # adaptative de concurrence, puis rendues dans l'ordre
+        in_flight: Dict[int, asyncio.Task] = {}
+        next_page = start_page
+        page_num = start_page - 1
+        total = 0
+
         try:
             # Boucle de pagination pour extraire de plusieurs pages
-            for page_num in range(1, max_pages + 1):
+            while page_num < max_pages:
                 # Vérifier si on doit arrêter (limite atteinte ou stop demandé)
-                if max_quotes and len(quotes) >= max_quotes:
+                if max_quotes and total >= max_quotes:
                     logger.info(f"✅ Reached max_quotes limit ({max_quotes}), stopping pagination")
                     break
-                    
+
                 if self.stop_check_callback and self.stop_check_callback():
-                    logger.info(f"⛔ Stop requested, stopping pagination at page {page_num}")
+                    logger.info(f"⛔ Stop requested, stopping pagination at page {page_num + 1}")
                     break
-                
-                # Construire l'URL avec pagination
-                if page_num == 1:
-                    topic_url = f"{self.base_url}/topics/{topic}-quotes"
-                else:
-                    topic_url = f"{self.base_url}/topics/{topic}-quotes_{page_num}"
-                
-                logger.info(f"🎯 Scraping page {page_num}/{max_pages} for topic: {topic}")
-                logger.info(f"📍 URL: {topic_url}")
-
-                # Navigation simple (comme l'original)
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        await page.goto(topic_url, wait_until='networkidle', timeout=60000)
-                        break
-                    except Exception as e:
-                        logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                        if attempt == max_retries - 1:
-                            raise
-                        await asyncio.sleep(5)
-
-                # Pause standard
-                await asyncio.sleep(5)
-
-                # Vérifier les blocages
-                page_content = await page.content()
-                if "403" in page_content or "forbidden" in page_content.lower() or "blocked" in page_content.lower():
-                    raise Exception("Access blocked by website protection")
-
-                # Trouver les sélecteurs (comme l'original)
-                selectors_to_try = ['.bqQt', '.grid-item', '.clearfix', '[class*="quote"]']
-                quotes_selector = None
-
-                for selector in selectors_to_try:
-                    try:
-                        logger.info(f"🔍 Trying selector: {selector}")
-                        await page.wait_for_selector(selector, timeout=10000)
-                        elements = await page.query_selector_all(selector)
-                        logger.info(f"📊 Found {len(elements)} elements with selector '{selector}'")
-                        if len(elements) > 3:
-                            quotes_selector = selector
-                            break
-                    except Exception as e:
-                        logger.warning(f"Selector '{selector}' failed: {str(e)}")
-                        continue
-
-                if not quotes_selector:
-                    await page.screenshot(path=f"debug_hybrid_failed_page{page_num}.png")
-                    logger.warning(f"No quotes found on page {page_num} - may have reached end of pagination")
-                    break  # Arrêter la pagination si pas de contenu
-
-                logger.info(f"✅ Using selector: {quotes_selector}")
 
-                # Calculer combien de citations on peut encore extraire
+                # Calculer combien de citations on peut encore extraire (et donc combien de pages anticiper)
                 remaining_quotes = None
+                last_needed = max_pages
                 if max_quotes:
-                    remaining_quotes = max_quotes - len(quotes)
-                    if remaining_quotes <= 0:
-                        break
-
-                # Extraction améliorée avec limite dynamique
-                page_quotes = await self._extract_quotes_enhanced(
-                    page, 
-                    quotes_selector, 
-                    max_quotes=remaining_quotes
-                )
-                quotes.extend(page_quotes)
-                logger.info(f"📊 Page {page_num}: Found {len(page_quotes)} quotes (Total: {len(quotes)})")
-                
+                    remaining_quotes = max_quotes - total
+                    last_needed = min(max_pages, page_num + (remaining_quotes + 9) // 10)
+
+                while next_page <= last_needed and (next_page == page_num + 1 or len(in_flight) < self.page_concurrency.current):
+                    in_flight[next_page] = asyncio.create_task(
+                        self.scrape_topic_page(topic, next_page, max_quotes=remaining_quotes)
+                    )
+                    next_page += 1
+
+                page_num += 1
+                logger.info("🎯 Scraping page %d/%d for topic: %s (%d page(s) in flight)",
+                            page_num, max_pages, topic, len(in_flight))
+
+                page_quotes = await in_flight.pop(page_num)
+                if page_quotes is None:
+                    break  # Arrêter la pagination si pas de contenu
+
+                full_page = len(page_quotes) >= 10
+                if remaining_quotes is not None:
+                    page_quotes = page_quotes[:remaining_quotes]
+                total += len(page_quotes)
+                logger.info("📊 Page %d: Found %d quotes (Total: %d)", page_num, len(page_quotes), total)
+                if page_quotes:
+                    yield page_quotes
+
                 # Si on a moins de 10 citations sur cette page, probablement la dernière
-                if len(page_quotes) < 10:
-                    logger.info(f"📄 Page {page_num} has < 10 quotes, likely last page")
+                if not full_page:
+                    logger.info("📄 Page %d has < 10 quotes, likely last page", page_num)
                     break
 
         except Exception as e:
             logger.error(f"❌ Error scraping topic {topic}: {str(e)}")
-            await page.screenshot(path=f"debug_hybrid_error_{topic}.png")
             raise
         finally:
-            await context.close()
+            # Pages anticipées devenues inutiles (fin de pagination, limite, stop ou erreur)
+            for task in in_flight.values():
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+        logger.info(f"🏁 Hybrid scraping completed. Total quotes: {total} from {page_num} page(s)")
 
-        logger.info(f"🏁 Hybrid scraping completed. Total quotes: {len(quotes)} from {page_num} page(s)")
+    async def scrape_topic(self, topic: str, max_pages: int = 1, max_quotes: Optional[int] = None) -> QuoteBatch:
+        """
+        Scrape quotes for a specific topic with enhanced extraction
+        
+        Args:
+            topic: Le sujet des citations (ex: "success", "love", etc.)
+            max_pages: Nombre de pages à scraper (default=1)
+            max_quotes: Nombre maximum de citations à extraire (None = toutes)
+        
+        Returns:
+            Liste de citations extraites
+        """
+        quotes = QuoteBatch()
+        async for page_quotes in self.scrape_topic_stream(topic, max_pages=max_pages, max_quotes=max_quotes):
+            quotes.extend(page_quotes)
         return quotes
 
-    async def download_images(self, quotes: List[Dict]) -> List[Dict]:
-        """Télécharge les images pour chaque citation et retourne la liste des résultats."""
-        results: List[Dict] = []
-        for quote in quotes:
-            image_url = quote.get("image_url")
-            identifier = f"{quote.get('author', 'unknown')}_{quote.get('index', 0)}"
+    async def download_images(self, quotes: List[QuoteRecord]) -> List[Optional[QuoteImage]]:
+        """Télécharge les images des citations (quote.image) et retourne l'image de chacune (None si absente)."""
+        async def download(quote: QuoteRecord) -> Optional[QuoteImage]:
+            identifier = f"{quote.author or 'unknown'}_{quote.index}"
             try:
-                if image_url:
-                    res = await self._download_image_simple(image_url, identifier)
-                    if res:
-                        res["success"] = True
-                        results.append(res)
-                    else:
-                        results.append({"success": False, "url": image_url})
-                else:
-                    results.append({"success": False, "url": None})
+                if quote.image_url:
+                    image = await self._download_image_simple(quote.image_url, identifier)
+                    if image:
+                        quote.image = image  # utilisée par le stockage pour l'upload
+                    return image
+                return None
             except Exception as e:
-                logger.error(f"Error downloading image for {identifier}: {e}")
-                results.append({"success": False, "url": image_url})
-        return results
+                logger.error("Error downloading image for %s: %s", identifier, e)
+                return None
 
-    async def _extract_quotes_enhanced(self, page: Page, quotes_selector: str = '.bqQt', max_quotes: Optional[int] = None) -> List[Dict]:
+        # Téléchargements en parallèle, bornés par la limite adaptative des images
+        return list(await asyncio.gather(*(download(quote) for quote in quotes)))
+
+    async def _extract_quotes_enhanced(self, page: "Page", quotes_selector: str = '.bqQt', max_quotes: Optional[int] = None) -> QuoteBatch:
         """Extraction améliorée mais basée sur le code qui fonctionne"""
-        quotes = []
+        quotes = QuoteBatch()
         quote_elements = await page.query_selector_all(quotes_selector)
         skipped_count = 0
 
-        logger.info(f"🔄 Processing {len(quote_elements)} quote elements with enhanced extraction (max: {max_quotes or 'unlimited'})")
+        logger.info("🔄 Processing %d quote elements with enhanced extraction (max: %s)",
+                    len(quote_elements), max_quotes or 'unlimited')
 
         for idx, quote_element in enumerate(quote_elements):
             # Vérifier si l'arrêt est demandé
@@ -354,7 +466,6 @@ class HybridBrainyQuoteScraper:
                 author_name = "Unknown"
                 quote_link = ""
                 image_url = ""
-                image_data = None
 
                 # Étape 1: Chercher les liens de citations (comme l'original)
                 link_elem = await quote_element.query_selector('a[title="view quote"]')
@@ -402,7 +513,7 @@ class HybridBrainyQuoteScraper:
                             title_attr = await text_elem.get_attribute('title')
                             if title_attr and len(title_attr.strip()) > 10:
                                 quote_text = title_attr.strip()
-                                logger.debug(f"Found text in title attribute: {quote_text[:50]}...")
+                                logger.debug("Found text in title attribute: %.50s...", quote_text)
                                 break
                             
                             # Sinon le inner text
@@ -414,7 +525,7 @@ class HybridBrainyQuoteScraper:
                                     quote_text = clean_lines[0]
                                     if len(clean_lines) > 1 and author_name == "Unknown":
                                         author_name = clean_lines[1]
-                                    logger.debug(f"Found text in {text_selector}: {quote_text[:50]}...")
+                                    logger.debug("Found text in %s: %.50s...", text_selector, quote_text)
                                     break
                 
                 # Étape 2b: Extraction auteur depuis d'autres sélecteurs si toujours Unknown
@@ -432,44 +543,31 @@ class HybridBrainyQuoteScraper:
                             author_text = await author_elem.inner_text()
                             if author_text and len(author_text.strip()) > 0:
                                 author_name = author_text.strip()
-                                logger.debug(f"Found author in {author_selector}: {author_name}")
+                                logger.debug("Found author in %s: %s", author_selector, author_name)
                                 break
 
-                # Étape 3: Extraction de l'auteur depuis l'URL (comme l'original)
-                if author_name == "Unknown" and quote_link and "/quotes/" in quote_link:
-                    match = re.search(r'/quotes/([^_/]+)', quote_link)
-                    if match:
-                        author_name = match.group(1).replace('_', ' ').replace('-', ' ').title()
+                # Étape 3: Extraction de l'auteur depuis l'URL (/quotes/<slug>_<id>)
+                if author_name == "Unknown" and quote_link:
+                    link_slug = author_slug_from_link(quote_link)
+                    if link_slug:
+                        author_name = author_name_from_slug(link_slug)
 
-                # Étape 4: Nettoyage (amélioré)
+                # Étape 4: Nettoyage (amélioré) et clé auteur normalisée
                 quote_text = self._clean_quote_text(quote_text)
                 author_name = self._clean_author_name(author_name)
+                author_slug = self.authors.resolve(author_name, quote_link)
 
-                # Étape 5: Téléchargement d'image (nouveau)
-                if image_url and self._is_valid_quote_data(quote_text, author_name):
-                    try:
-                        image_data = await self._download_image_simple(image_url, f"{author_name}_{idx}")
-                    except Exception as e:
-                        logger.debug(f"Could not download image: {str(e)}")
-
-                # Validation et ajout
+                # Validation et ajout (l'image est téléchargée ensuite par download_images)
                 if self._is_valid_quote_data(quote_text, author_name):
-                    quote_data = {
-                        "text": quote_text,
-                        "author": author_name,
-                        "link": quote_link,
-                        "image_url": image_url,
-                        "image_data": image_data,
-                        "index": idx
-                    }
-                    quotes.append(quote_data)
-                    logger.debug(f"✅ Quote {idx + 1}: {quote_text[:50]}...")
+                    quotes.append(QuoteRecord(quote_text, author_name, author_slug, quote_link, image_url, idx))
+                    logger.debug("✅ Quote %d: %.50s...", idx + 1, quote_text)
                 else:
                     skipped_count += 1
-                    logger.debug(f"❌ Skipped invalid quote {idx + 1} (text={len(quote_text) if quote_text else 0} chars, author='{author_name}')")
+                    logger.debug("❌ Skipped invalid quote %d (text=%d chars, author='%s')",
+                                 idx + 1, len(quote_text) if quote_text else 0, author_name)
 
             except Exception as e:
-                logger.warning(f"⚠️  Error extracting quote {idx + 1}: {str(e)}")
+                logger.warning("⚠️  Error extracting quote %d: %s", idx + 1, e)
                 skipped_count += 1
                 continue
 
@@ -529,38 +627,50 @@ class HybridBrainyQuoteScraper:
         # Les citations sans auteur sont quand même valables
         return True
 
-    async def _download_image_simple(self, image_url: str, identifier: str) -> Optional[Dict]:
+    async def _download_image_simple(self, image_url: str, identifier: str) -> Optional[QuoteImage]:
         """Téléchargement simple d'image"""
+        import httpx
+
         try:
             safe_identifier = re.sub(r'[^\w\-_]', '_', identifier)
             url_hash = hashlib.md5(image_url.encode()).hexdigest()[:8]
             filename = f"quote_{safe_identifier}_{url_hash}.jpg"
 
             async with httpx.AsyncClient() as client:
-                response = await client.get(image_url, timeout=30)
-                response.raise_for_status()
+                async with self.image_concurrency.slot() as lease:
+                    async def fetch():
+                        await self.rate_limiter.acquire(image_url)
+                        start = time.perf_counter()
+                        response = await client.get(image_url, timeout=30)
+                        if await self.rate_limiter.observe(image_url, response.status_code,
+                                                           response.headers.get("retry-after")):
+                            self.image_concurrency.record_failure("throttled")
+                        response.raise_for_status()
+                        lease.latency = time.perf_counter() - start
+                        metrics.IMAGE_DOWNLOAD_SECONDS.observe(lease.latency)
+                        return response
+
+                    response = await self.retrier.call("image_get", fetch, key=host_of(image_url))
 
                 image_content = response.content
                 content_type = response.headers.get('content-type', 'image/jpeg')
+                metrics.IMAGE_DOWNLOAD_BYTES.observe(len(image_content))
+                metrics.IMAGE_DOWNLOADS_TOTAL.inc(outcome="ok")
 
                 # Sauvegarder localement
                 local_path = self.image_cache_dir / filename
+                self.image_cache_dir.mkdir(exist_ok=True)
                 with open(local_path, 'wb') as f:
                     f.write(image_content)
 
-                return {
-                    'filename': filename,
-                    'local_path': str(local_path),
-                    'content_type': content_type,
-                    'size': len(image_content),
-                    'original_url': image_url
-                }
+                return QuoteImage(filename, str(local_path), content_type, len(image_content))
 
         except Exception as e:
-            logger.error(f"Failed to download image {image_url}: {str(e)}")
+            logger.error("Failed to download image %s: %s", image_url, e)
+            metrics.IMAGE_DOWNLOADS_TOTAL.inc(outcome="error")
             return None
 
-    async def test_scraping(self, topic: str = "motivational", max_quotes: int = 5) -> List[Dict]:
+    async def test_scraping(self, topic: str = "motivational", max_quotes: int = 5) -> QuoteBatch:
         """Test method for quick verification"""
         async with self as scraper:
             quotes = await scraper.scrape_topic(topic, max_pages=1, max_quotes=max_quotes)
@@ -574,7 +684,7 @@ class HybridBrainyQuoteScraper:
         if hasattr(self, 'playwright') and self.playwright:
             await self.playwright.stop()
 
-    async def scrape_quotes(self, topic: str, max_quotes: int = 10) -> List[Dict]:
+    async def scrape_quotes(self, topic: str, max_quotes: int = 10) -> QuoteBatch:
         """
         Scraper les citations pour un topic donné avec une limite.
         
@@ -583,7 +693,7 @@ class HybridBrainyQuoteScraper:
             max_quotes: Nombre maximum de citations à extraire
             
         Returns:
-            Liste de dictionnaires contenant les citations
+            Citations extraites (QuoteRecord)
         """
         logger.info(f"🎯 Starting scrape_quotes for topic='{topic}', max_quotes={max_quotes}")
         
@@ -596,9 +706,11 @@ class HybridBrainyQuoteScraper:
             logger.error(f"❌ Failed to scrape topic {topic}: {e}")
             raise
 
-    async def scrape_single_quote(self, url: str) -> Optional[Dict]:
+    async def scrape_single_quote(self, url: str) -> Optional[QuoteRecord]:
         """Scraper une seule quote (méthode de compatibilité)"""
         # Extraire le topic de l'URL ou utiliser un topic par défaut
         topic = "motivational"
         quotes = await self.scrape_topic(topic, max_quotes=1)
+        if quotes:
+            await self.download_images(quotes)
         return quotes[0] if quotes else None
@@ -0,0 +1,183 @@
+"""
+Incremental re-scrapes.
+
+New quotes appear at the front of a topic, so a daily refresh does not
+need to walk every page again. Each page's quote set is fingerprinted and
+kept per topic on disk once its quotes are stored; on the next run a page
+whose quotes are all known ends the pagination ("stop" mode), or a page
+whose fingerprint did not change is skipped downstream (no images, no
+storage; "skip" mode).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from core.records import QuoteRecord
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_MODES = ("stop", "skip")
+
+# Verdicts d'une page
+PAGE_NEW = "new"
+PAGE_CHANGED = "changed"
+PAGE_UNCHANGED = "unchanged"
+PAGE_KNOWN = "known"
+
+
+def page_fingerprint(quote_fingerprints: List[str]) -> str:
+    """Order-independent fingerprint of a page's quote set"""
+    return hashlib.sha1("\n".join(sorted(quote_fingerprints)).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class TopicHistory:
+    """What the previous runs saw for one topic"""
+    pages: Dict[str, Dict] = field(default_factory=dict)  # n° de page -> {"fingerprint", "quotes"}
+    avg_page_seconds: float = 0.0
+    avg_images_seconds: float = 0.0
+    updated_at: float = 0.0
+
+    def known_quotes(self) -> Set[str]:
+        return {fp for page in self.pages.values() for fp in page["quotes"]}
+
+
+class PageFingerprintStore:
+    """One JSON file per topic with the fingerprints of its pages."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, topic: str) -> Path:
+        return self.directory / f"{re.sub(r'[^a-z0-9_-]+', '_', topic.lower())}.json"
+
+    def load(self, topic: str) -> TopicHistory:
+        path = self._path(topic)
+        if not path.exists():
+            return TopicHistory()
+        try:
+            return TopicHistory(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable page fingerprints {path}: {e}")
+            return TopicHistory()
+
+    def commit(self, topic: str, observed: Dict[str, Any], persisted: Set[str]) -> int:
+        """Record the pages of a run whose quotes are all in the database, returns their count
+
+        ``observed`` is ``IncrementalTracker.observed_pages()``; pages that were
+        already known or unchanged were stored by an earlier run.
+        """
+        history = self.load(topic)
+        committed = 0
+        for page_num, page in observed["pages"].items():
+            if page["verdict"] in (PAGE_KNOWN, PAGE_UNCHANGED) or all(fp in persisted for fp in page["quotes"]):
+                history.pages[page_num] = {"fingerprint": page["fingerprint"], "quotes": page["quotes"]}
+                committed += 1
+        history.avg_page_seconds = observed["avg_page_seconds"]
+        history.avg_images_seconds = observed["avg_images_seconds"]
+        self.save(topic, history)
+        return committed
+
+    def save(self, topic: str, history: TopicHistory):
+        history.updated_at = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(topic)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(asdict(history)), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+class IncrementalTracker:
+    """Classifies the pages of one run against the topic history and accounts the savings."""
+
+    def __init__(self, history: TopicHistory, mode: str, max_pages: int):
+        if mode not in INCREMENTAL_MODES:
+            raise ValueError(f"Unknown incremental mode: {mode}")
+        self.history = history
+        self.mode = mode
+        self.max_pages = max_pages
+        self._known = history.known_quotes()
+        self.pages_scraped = 0
+        self.pages_skipped = 0
+        self.stopped_at: Optional[int] = None
+        self._observed: Dict[str, Dict] = {}  # pages de ce run, enregistrées une fois stockées
+        self._page_seconds: List[float] = []
+        self._images_seconds: List[float] = []
+
+    def observe(self, page_num: int, quotes: List[QuoteRecord], seconds: float) -> str:
+        """Verdict of a freshly extracted page against the stored history"""
+        self.pages_scraped += 1
+        self._page_seconds.append(seconds)
+        fingerprints = [quote.fingerprint for quote in quotes]
+        fingerprint = page_fingerprint(fingerprints)
+        previous = self.history.pages.get(str(page_num))
+
+        if fingerprints and all(fp in self._known for fp in fingerprints):
+            verdict = PAGE_KNOWN
+        elif previous is None:
+            verdict = PAGE_NEW
+        elif previous["fingerprint"] == fingerprint:
+            verdict = PAGE_UNCHANGED
+        else:
+            verdict = PAGE_CHANGED
+
+        if verdict == PAGE_KNOWN and self.mode == "stop":
+            self.stopped_at = page_num
+        elif verdict in (PAGE_KNOWN, PAGE_UNCHANGED):
+            self.pages_skipped += 1
+        self._observed[str(page_num)] = {"fingerprint": fingerprint, "quotes": fingerprints, "verdict": verdict}
+        return verdict
+
+    def should_stop(self, verdict: str) -> bool:
+        return verdict == PAGE_KNOWN and self.mode == "stop"
+
+    def should_skip(self, verdict: str) -> bool:
+        return verdict in (PAGE_KNOWN, PAGE_UNCHANGED)
+
+    def record_images(self, seconds: float):
+        self._images_seconds.append(seconds)
+
+    def finish(self) -> Dict:
+        """Update the averages of the history and return the run report"""
+        page_seconds = _average(self._page_seconds, self.history.avg_page_seconds)
+        images_seconds = _average(self._images_seconds, self.history.avg_images_seconds)
+        self.history.avg_page_seconds = page_seconds
+        self.history.avg_images_seconds = images_seconds
+
+        # Pages connues de l'historique qui n'ont pas été re-téléchargées
+        not_fetched = 0
+        if self.stopped_at is not None:
+            known_pages = max((int(n) for n in self.history.pages), default=self.stopped_at)
+            not_fetched = max(0, min(self.max_pages, known_pages) - self.stopped_at)
+
+        saved = not_fetched * (page_seconds + images_seconds) + self.pages_skipped * images_seconds
+        return {
+            "mode": self.mode,
+            "pages_scraped": self.pages_scraped,
+            "pages_skipped": self.pages_skipped,
+            "pages_not_fetched": not_fetched,
+            "stopped_at_page": self.stopped_at,
+            "estimated_seconds_saved": round(saved, 1),
+        }
+
+    def observed_pages(self) -> Dict[str, Any]:
+        """Pages seen by this run and the updated averages, for ``PageFingerprintStore.commit``"""
+        return {
+            "pages": self._observed,
+            "avg_page_seconds": self.history.avg_page_seconds,
+            "avg_images_seconds": self.history.avg_images_seconds,
+        }
+
+
+def _average(samples: List[float], previous: float) -> float:
+    if not samples:
+        return previous
+    current = sum(samples) / len(samples)
+    return current if not previous else round(0.5 * previous + 0.5 * current, 3)
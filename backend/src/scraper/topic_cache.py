@@ -0,0 +1,225 @@
+"""
+Cache of topic scrape results.
+
+Popular topics are requested over and over; a cached result answers
+without starting Chromium. Entries are keyed by topic and scrape options
+and live in two tiers: an in-memory LRU and one JSON file per key on disk
+(survives restarts). A fresh entry is served as is; a stale one is served
+immediately while a single background scrape refreshes it
+(stale-while-revalidate); concurrent misses for the same key share one
+scrape (single flight).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.records import QuoteBatch
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[QuoteBatch]]
+
+
+class CacheEntry:
+    __slots__ = ("quotes", "created_at")
+
+    def __init__(self, quotes: QuoteBatch, created_at: float):
+        self.quotes = quotes
+        self.created_at = created_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class TopicResultCache:
+    """Two-tier (memory LRU + disk) cache with TTL, stale-while-revalidate and single flight."""
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = 6 * 3600, stale_ttl: float = 24 * 3600,
+                 max_entries: int = 64):
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "disk_hits": 0}
+
+    @staticmethod
+    def key(topic: str, **options: Any) -> str:
+        """Stable key of a topic and its scrape options"""
+        raw = json.dumps({"topic": topic.strip().lower(), **options}, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    # --- Tiers ---
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry from memory, else from disk (promoted to memory); None if absent or expired"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.directory is not None:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self.counters["disk_hits"] += 1
+                self._remember(key, entry)
+
+        if entry is not None and entry.age >= self.ttl + self.stale_ttl:
+            self.invalidate(key)
+            return None
+        return entry
+
+    def put(self, key: str, quotes: QuoteBatch):
+        entry = CacheEntry(QuoteBatch.of(quotes), time.time())
+        self._remember(key, entry)
+        if self.directory is not None:
+            self._write_disk(key, entry)
+
+    def invalidate(self, key: str):
+        self._memory.pop(key, None)
+        if self.directory is not None:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age < self.ttl
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return CacheEntry(QuoteBatch.of(data["quotes"]), data["created_at"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: CacheEntry):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(
+                json.dumps({"created_at": entry.created_at, "quotes": entry.quotes.to_dicts()}, ensure_ascii=False,
+                           default=str),
+                encoding="utf-8"
+            )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write cache entry {key}: {e}")
+
+    # --- Single flight ---
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        """Future of the scrape currently filling ``key``, if any"""
+        return self._flights.get(key)
+
+    def start_flight(self, key: str) -> asyncio.Future:
+        """Register the caller as the one scrape filling ``key``"""
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        return future
+
+    def finish_flight(self, key: str, quotes: Optional[QuoteBatch] = None, error: Optional[BaseException] = None):
+        """Store the result (if any) and release the waiters"""
+        future = self._flights.pop(key, None)
+        if quotes is not None and error is None:
+            self.put(key, quotes)
+        if future is None or future.done():
+            return
+        if error is not None or quotes is None:
+            future.set_exception(error or RuntimeError("Scrape did not complete"))
+            future.exception()  # évite "exception was never retrieved" sans attente
+        else:
+            future.set_result(quotes)
+
+    def refresh_in_background(self, key: str, fetch: Fetch):
+        """Stale-while-revalidate: refresh ``key`` once, whatever the number of stale readers"""
+        if key in self._refreshes or key in self._flights:
+            return
+        self.counters["refreshes"] += 1
+
+        async def refresh():
+            self.start_flight(key)
+            try:
+                quotes = await fetch()
+                self.finish_flight(key, quotes)
+                logger.info(f"♻️  Topic cache entry {key} refreshed ({len(quotes)} quotes)")
+            except Exception as e:
+                logger.warning(f"⚠️  Background refresh of cache entry {key} failed: {e}")
+                self.finish_flight(key, error=e)
+            finally:
+                self._refreshes.pop(key, None)
+
+        self._refreshes[key] = asyncio.create_task(refresh(), name=f"cache-refresh-{key}")
+
+    # --- Lecture complète ---
+
+    async def lookup(self, key: str, fetch: Fetch) -> Tuple[Optional[QuoteBatch], str]:
+        """
+        Cached quotes for ``key`` and how they were obtained: "hit", "stale" (refresh
+        started), "coalesced" (waited for an identical scrape); (None, "miss") when the
+        caller has to scrape, after ``start_flight`` was registered for it
+        """
+        entry = self.get(key)
+        if entry is not None:
+            if self.is_fresh(entry):
+                self.counters["hits"] += 1
+                return entry.quotes, "hit"
+            self.counters["stale_hits"] += 1
+            self.refresh_in_background(key, fetch)
+            return entry.quotes, "stale"
+
+        future = self.inflight(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            try:
+                return await asyncio.shield(future), "coalesced"
+            except Exception:
+                pass  # le scrape partagé a échoué : on scrape soi-même
+
+        self.counters["misses"] += 1
+        self.start_flight(key)
+        return None, "miss"
+
+    async def get_or_fetch(self, key: str, fetch: Fetch) -> Tuple[QuoteBatch, str]:
+        """Cached quotes, or the result of ``fetch`` (stored for the next callers)"""
+        quotes, status = await self.lookup(key, fetch)
+        if quotes is not None:
+            return quotes, status
+        try:
+            quotes = await fetch()
+        except BaseException as e:
+            self.finish_flight(key, error=e if isinstance(e, Exception) else None)
+            raise
+        self.finish_flight(key, quotes)
+        return quotes, status
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "inflight": len(self._flights),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+        }
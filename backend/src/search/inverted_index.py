@@ -0,0 +1,279 @@
+"""
+In-memory inverted index over scraped quotes with BM25 ranking.
+
+Postings are kept in compact ``array`` buffers so they can be scored with
+NumPy without copies. On disk the index is a pickled snapshot plus an
+append-only log of the quotes indexed since; the log is folded into a new
+snapshot once it outgrows it. Both are warm-loaded at startup.
+"""
+
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.records import QuoteRecord
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for if in into is it its of on or so such that the
+their then there these they this to was will with i you he she we me my your our
+""".split())
+
+# Le journal est réécrit dans un nouveau snapshot quand il dépasse cette part du snapshot
+COMPACT_RATIO = 0.5
+
+# (fingerprint, text, author, link, image_url, topic)
+IndexedQuote = Tuple[str, str, str, str, str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class QuoteSearchIndex:
+    """Full-text index (text + author) with incremental inserts and BM25 scoring."""
+
+    def __init__(self, index_path: Optional[Path] = None, k1: float = 1.2, b: float = 0.75):
+        self.index_path = Path(index_path) if index_path else None
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # jobs finishing together may save concurrently
+        self._reset()
+
+    def _reset(self):
+        self._docs: List[IndexedQuote] = []
+        self._by_fingerprint: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_len = array("H")
+        self._total_len = 0
+        self._saved_docs = 0     # documents already on disk (snapshot + journal)
+        self._snapshot_docs = 0  # documents in the snapshot file
+        self._compact_next = False  # journal à réécrire (fin tronquée)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._by_fingerprint
+
+    @property
+    def log_path(self) -> Optional[Path]:
+        return self.index_path.with_suffix(self.index_path.suffix + ".log") if self.index_path else None
+
+    def add_quote(self, quote: QuoteRecord, topic: str = "") -> Optional[str]:
+        """Index one quote, returns its fingerprint (None if it was already indexed)"""
+        return self._add(quote.fingerprint, quote.text, quote.author, quote.link, quote.image_url, topic)
+
+    def _add(self, fingerprint: str, text: str, author: str, link: str, image_url: str,
+             topic: str) -> Optional[str]:
+        if not text or fingerprint in self._by_fingerprint:
+            return None
+
+        tokens = tokenize(text) + tokenize(author)
+        term_freqs: Dict[str, int] = {}
+        for token in tokens:
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+
+        with self._lock:
+            doc_id = len(self._docs)
+            self._docs.append((
+                fingerprint,
+                text,
+                author,
+                link,
+                image_url,
+                topic,
+            ))
+            self._by_fingerprint[fingerprint] = doc_id
+            self._doc_len.append(min(len(tokens), 0xFFFF))
+            self._total_len += len(tokens)
+            for term, tf in term_freqs.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("I"), array("H"))
+                postings[0].append(doc_id)
+                postings[1].append(min(tf, 0xFFFF))
+
+        return fingerprint
+
+    def add_quotes(self, quotes: Iterable[QuoteRecord], topic: str = "") -> int:
+        """Index a batch of quotes, returns the number of new documents"""
+        return sum(1 for quote in quotes if self.add_quote(quote, topic) is not None)
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """Indexed quote by fingerprint"""
+        doc_id = self._by_fingerprint.get(fingerprint)
+        return self._as_dict(doc_id) if doc_id is not None else None
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict]]:
+        """BM25 search, returns (number of matching documents, ranked page of results)"""
+        terms = set(tokenize(query))
+        n_docs = len(self._docs)
+        if not terms or not n_docs:
+            return 0, []
+
+        avg_len = self._total_len / n_docs
+        doc_len = np.frombuffer(self._doc_len, dtype=np.uint16)[:n_docs]
+        scores = np.zeros(n_docs, dtype=np.float32)
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            ids = np.frombuffer(postings[0], dtype=np.uint32)
+            tfs = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+            df = len(ids)
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_len[ids] / avg_len)
+            scores[ids] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+        matches = np.flatnonzero(scores)
+        total = len(matches)
+        wanted = min(offset + limit, total)
+        if wanted <= 0:
+            return total, []
+
+        if wanted < total:
+            top = matches[np.argpartition(-scores[matches], wanted - 1)[:wanted]]
+        else:
+            top = matches
+        top = top[np.argsort(-scores[top], kind="stable")][offset:wanted]
+
+        results = []
+        for doc_id in top.tolist():
+            result = self._as_dict(doc_id)
+            result["score"] = round(float(scores[doc_id]), 4)
+            results.append(result)
+        return total, results
+
+    def _as_dict(self, doc_id: int) -> Dict:
+        fingerprint, text, author, link, image_url, topic = self._docs[doc_id]
+        return {
+            "id": fingerprint,
+            "text": text,
+            "author": author,
+            "link": link,
+            "image_url": image_url,
+            "topic": topic,
+        }
+
+    def save(self) -> bool:
+        """Persist the quotes indexed since the last save
+
+        Only the new documents are appended to the journal; the snapshot is
+        rewritten when the journal reaches ``COMPACT_RATIO`` of it. Only the
+        lists are snapshotted under the lock; the append-only postings are
+        cut and pickled outside of it, so indexing on the event loop is
+        never blocked by a save.
+        """
+        if not self.index_path:
+            return False
+
+        start = time.perf_counter()
+        with self._save_lock:
+            with self._lock:
+                n_docs = len(self._docs)
+                if n_docs == self._saved_docs:
+                    return True
+                compact = (self._compact_next
+                           or n_docs - self._snapshot_docs > COMPACT_RATIO * max(self._snapshot_docs, 1))
+                docs = self._docs[0 if compact else self._saved_docs:n_docs]
+                if compact:
+                    doc_len = self._doc_len[:n_docs]
+                    total_len = self._total_len
+                    postings = list(self._postings.items())
+
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            if compact:
+                # Les buffers ne font que grandir : les listes sont coupées à n_docs hors du verrou
+                payload = pickle.dumps({
+                    "version": INDEX_FORMAT_VERSION,
+                    "docs": docs,
+                    "postings": {term: (ids[:cut], tfs[:cut])
+                                 for term, (ids, tfs) in postings
+                                 for cut in (bisect_left(ids, n_docs),)},
+                    "doc_len": doc_len,
+                    "total_len": total_len,
+                }, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.index_path)
+                # Le snapshot contient tout : le journal repart de zéro
+                self.log_path.unlink(missing_ok=True)
+                self._snapshot_docs = n_docs
+                self._compact_next = False
+            else:
+                with open(self.log_path, "ab") as f:
+                    f.write(pickle.dumps(docs, protocol=pickle.HIGHEST_PROTOCOL))
+            self._saved_docs = n_docs
+
+        logger.info(f"💾 Search index saved: {n_docs} quotes ({'snapshot' if compact else f'+{len(docs)} in journal'}) "
+                    f"in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def load(self) -> bool:
+        """Warm-load the index from the snapshot and the journal, if they exist"""
+        if not self.index_path or not (self.index_path.exists() or self.log_path.exists()):
+            return False
+
+        start = time.perf_counter()
+        data = None
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "rb") as f:
+                    data = pickle.load(f)
+                if data.get("version") != INDEX_FORMAT_VERSION:
+                    logger.warning(f"⚠️  Ignoring search index with unknown format: {self.index_path}")
+                    return False
+            except Exception as e:
+                logger.error(f"❌ Could not load search index {self.index_path}: {e}")
+                return False
+
+        if data:
+            with self._lock:
+                self._docs = data["docs"]
+                self._postings = data["postings"]
+                self._doc_len = data["doc_len"]
+                self._total_len = data["total_len"]
+                self._by_fingerprint = {doc[0]: doc_id for doc_id, doc in enumerate(self._docs)}
+                self._snapshot_docs = len(self._docs)
+
+        replayed, truncated = 0, False
+        if self.log_path.exists():
+            with open(self.log_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                while f.tell() < size:
+                    try:
+                        delta = pickle.load(f)
+                    except Exception as e:
+                        # Dernier enregistrement tronqué (arrêt pendant l'écriture) : ignoré
+                        logger.warning(f"⚠️  Search index journal truncated after {replayed} quotes: {e}")
+                        truncated = True
+                        break
+                    replayed += sum(1 for doc in delta if self._add(*doc) is not None)
+        self._saved_docs = len(self._docs)
+        if truncated:
+            # On n'ajoute rien derrière un enregistrement tronqué : le prochain save écrit un snapshot complet
+            self._saved_docs = 0
+            self._compact_next = True
+
+        logger.info(f"🔎 Search index loaded: {len(self._docs)} quotes ({replayed} from journal) "
+                    f"in {time.perf_counter() - start:.2f}s")
+        return True
@@ -0,0 +1,159 @@
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+The same quote is published under several topics, sometimes with small
+punctuation or quoting differences. Each quote gets a MinHash signature
+over character shingles; LSH buckets only compare a quote with the few
+candidates sharing a band, so ingest stays O(1) per quote instead of a
+pairwise O(n²) scan.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import zlib
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from core.fingerprint import normalize_quote_text
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """Hashed character shingles of the text without punctuation"""
+    text = _WHITESPACE_RE.sub(" ", _PUNCTUATION_RE.sub("", normalize_quote_text(text))).strip()
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class NearDuplicateDetector:
+    """Groups near-identical quotes under a canonical key."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self.topics: Dict[Hashable, Set[str]] = {}
+
+        # Compteurs pour le débit
+        self.processed = 0
+        self.duplicates = 0
+        self.elapsed = 0.0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def empty_copy(self) -> "NearDuplicateDetector":
+        """Empty detector with the same hash functions, to be filled off the event loop and merged"""
+        copy = NearDuplicateDetector(self.num_perm, self.bands, self.threshold)
+        copy._a, copy._b = self._a, self._b
+        return copy
+
+    def merge(self, other: "NearDuplicateDetector"):
+        """Register the canonical quotes of an ``empty_copy`` (O(1) when this detector is empty)"""
+        if not self._signatures:
+            self._buckets, self._signatures, self.topics = other._buckets, other._signatures, other.topics
+            return
+        for key, signature in other._signatures.items():
+            if key not in self._signatures:
+                self.insert(key, signature)
+                self.topics[key] = set(other.topics[key])
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values)"""
+        hashed = shingles(text) % _MERSENNE_PRIME
+        values = (self._a * hashed[np.newaxis, :] + self._b) % _MERSENNE_PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> Optional[Hashable]:
+        """Canonical key most similar to the signature, if above the threshold"""
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+
+        best_key, best_score = None, self.threshold
+        for candidate in candidates:
+            score = float(np.mean(self._signatures[candidate] == signature))
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def insert(self, key: Hashable, signature: np.ndarray, topic: Optional[str] = None):
+        """Register a canonical quote"""
+        self._signatures[key] = signature
+        self.topics[key] = {topic} if topic else set()
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, []).append(key)
+
+    def check(self, text: str, topic: Optional[str] = None) -> Tuple[Optional[Hashable], np.ndarray]:
+        """Look a quote up without registering it; a duplicate's topic is merged into its canonical"""
+        start = time.perf_counter()
+        signature = self.signature(text)
+        canonical = self.query(signature)
+        if canonical is not None:
+            self.duplicates += 1
+            if topic:
+                self.topics[canonical].add(topic)
+        self.processed += 1
+        self.elapsed += time.perf_counter() - start
+        return canonical, signature
+
+    def add(self, key: Hashable, text: str, topic: Optional[str] = None) -> Optional[Hashable]:
+        """Register a quote; returns the canonical key it duplicates, else None"""
+        canonical, signature = self.check(text, topic)
+        if canonical is None:
+            self.insert(key, signature, topic)
+        return canonical
+
+    def throughput(self) -> Dict[str, float]:
+        """Counters and quotes/s since creation"""
+        return {
+            "processed": self.processed,
+            "duplicates": self.duplicates,
+            "canonical": len(self._signatures),
+            "seconds": round(self.elapsed, 3),
+            "quotes_per_second": round(self.processed / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+
+
+async def run_batch(apply: bool = False):
+    """Batch job: group near-duplicates over the whole quotes table"""
+    from database.supabase_storage import SupabaseQuoteStorage
+
+    storage = SupabaseQuoteStorage()
+    report = await storage.deduplicate_table(apply=apply)
+    logger.info(f"📊 Near-duplicate report: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Detect near-duplicate quotes across topics")
+    parser.add_argument("--apply", action="store_true", help="merge topics into canonical rows and delete duplicates")
+    args = parser.parse_args()
+    asyncio.run(run_batch(apply=args.apply))
@@ -0,0 +1,207 @@
+"""
+Offline "more quotes like this" index.
+
+Quotes are embedded with the hashing trick (word unigrams + bigrams, signed
+buckets, sublinear tf, L2 norm) into a contiguous float32 matrix kept in a
+memory-mapped file, so cosine similarity is a single matrix-vector product.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.records import QuoteRecord
+from search.inverted_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 128 dims keep a 1M-quote matrix at 512 MB and a query at ~50 ms on one core
+DEFAULT_DIMENSIONS = 128
+INITIAL_CAPACITY = 1024
+
+
+def _bucket(feature: str, dimensions: int) -> Tuple[int, float]:
+    """Stable bucket and sign of a feature (Python's hash() is salted per process)"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dimensions, (1.0 if h & 0x80000000 else -1.0)
+
+
+def embed_text(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> np.ndarray:
+    """Hashing-trick vector of a quote text, L2-normalized (zero vector if no tokens)"""
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    counts: Dict[str, int] = {}
+    for feature in features:
+        counts[feature] = counts.get(feature, 0) + 1
+    for feature, count in counts.items():
+        bucket, sign = _bucket(feature, dimensions)
+        vector[bucket] += sign * (1.0 + np.log(count))
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class QuoteVectorIndex:
+    """Matrix of quote embeddings (memory-mapped) with batched cosine top-k queries."""
+
+    def __init__(self, directory: Optional[Path] = None, dimensions: int = DEFAULT_DIMENSIONS):
+        self.directory = Path(directory) if directory else None
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._flushed_ids = 0
+        self._matrix = np.zeros((INITIAL_CAPACITY, dimensions), dtype=np.float32)
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.directory / "vectors.ids"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        # -1 : ligne réservée par add_quotes mais pas encore écrite
+        return self._row_by_id.get(fingerprint, -1) >= 0
+
+    def _grow(self, needed: int):
+        """Double the capacity of the matrix (and of its backing file)"""
+        capacity = max(len(self._matrix), 1)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == len(self._matrix):
+            return
+
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+            with open(self._matrix_path, "r+b") as f:
+                f.truncate(capacity * self.dimensions * 4)
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+",
+                                     shape=(capacity, self.dimensions))
+        else:
+            matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+            matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+            self._matrix = matrix
+
+    def add_quotes(self, quotes: Iterable[QuoteRecord]) -> int:
+        """Embed and append new quotes, returns the number of rows added"""
+        new_rows = []
+        for quote in quotes:
+            text = quote.text
+            fingerprint = quote.fingerprint
+            if text and fingerprint not in self._row_by_id:
+                self._row_by_id[fingerprint] = -1  # réservé, dédoublonne le lot
+                new_rows.append((fingerprint, embed_text(text, self.dimensions)))
+
+        if not new_rows:
+            return 0
+
+        with self._lock:
+            start = len(self._ids)
+            self._grow(start + len(new_rows))
+            for offset, (fingerprint, vector) in enumerate(new_rows):
+                self._matrix[start + offset] = vector
+                self._row_by_id[fingerprint] = start + offset
+                self._ids.append(fingerprint)
+        return len(new_rows)
+
+    def similar(self, fingerprint: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k most similar quotes to an indexed quote (the quote itself excluded)"""
+        return self.similar_batch([fingerprint], k)[0]
+
+    def similar_batch(self, fingerprints: List[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Top-k neighbours for several indexed quotes with one matrix product"""
+        n = len(self._ids)
+        rows = [self._row_by_id.get(fp, -1) for fp in fingerprints]
+        # Lignes écrites après la lecture de n (add_quotes concurrent) : traitées comme inconnues
+        rows = [row if row < n else -1 for row in rows]
+        known = [row for row in rows if row >= 0]
+        if not n or not known:
+            return [[] for _ in fingerprints]
+
+        matrix = self._matrix[:n]
+        scores = matrix @ matrix[known].T  # (n, q)
+
+        results, column = [], 0
+        for row in rows:
+            if row < 0:
+                results.append([])
+                continue
+            col = scores[:, column]
+            col[row] = -np.inf
+            column += 1
+
+            top_k = min(k, n - 1)
+            if top_k <= 0:
+                results.append([])
+                continue
+            top = np.argpartition(-col, top_k - 1)[:top_k]
+            top = top[np.argsort(-col[top])]
+            results.append([(self._ids[i], round(float(col[i]), 4)) for i in top.tolist()])
+        return results
+
+    def query_text(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k quotes most similar to an arbitrary text"""
+        n = len(self._ids)
+        if not n:
+            return []
+        col = self._matrix[:n] @ embed_text(text, self.dimensions)
+        top_k = min(k, n)
+        top = np.argpartition(-col, top_k - 1)[:top_k]
+        top = top[np.argsort(-col[top])]
+        return [(self._ids[i], round(float(col[i]), 4)) for i in top.tolist()]
+
+    def flush(self) -> bool:
+        """Persist new rows: the matrix goes to a memory-mapped file, ids are appended"""
+        if not self.directory:
+            return False
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not isinstance(self._matrix, np.memmap):
+                capacity = len(self._matrix)
+                memmap = np.memmap(self._matrix_path, dtype=np.float32, mode="w+",
+                                   shape=(capacity, self.dimensions))
+                memmap[:len(self._ids)] = self._matrix[:len(self._ids)]
+                self._matrix = memmap
+            self._matrix.flush()
+
+            new_ids = self._ids[self._flushed_ids:]
+            if new_ids:
+                with open(self._ids_path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{fp}\n" for fp in new_ids))
+                self._flushed_ids = len(self._ids)
+        return True
+
+    def load(self) -> bool:
+        """Map the persisted matrix back into memory (pages are loaded lazily by the OS)"""
+        if not self.directory or not self._ids_path.exists() or not self._matrix_path.exists():
+            return False
+
+        start = time.perf_counter()
+        ids = self._ids_path.read_text(encoding="utf-8").split()
+        capacity = self._matrix_path.stat().st_size // (self.dimensions * 4)
+        if capacity < len(ids):
+            logger.error(f"❌ Vector index is truncated ({capacity} rows for {len(ids)} ids), ignoring it")
+            return False
+
+        with self._lock:
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+",
+                                     shape=(capacity, self.dimensions))
+            self._ids = ids
+            self._row_by_id = {fp: row for row, fp in enumerate(ids)}
+            self._flushed_ids = len(ids)
+
+        logger.info(f"🧭 Vector index loaded: {len(ids)} quotes in {time.perf_counter() - start:.2f}s")
+        return True
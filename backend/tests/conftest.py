@@ -0,0 +1,13 @@
+"""
+Unit tests of the pure modules (no browser, no Supabase project).
+
+Modules are imported from backend/src like the API does
+(``from core.config import settings``).
+"""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BACKEND_DIR / "src"
+
+sys.path.insert(0, str(SRC_DIR))
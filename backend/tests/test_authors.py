@@ -0,0 +1,67 @@
+import asyncio
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+from core.authors import AuthorDirectory, author_slug, author_slug_from_link
+from core.records import QuoteRecord
+
+
+def test_author_slug_folds_accents_and_punctuation():
+    assert author_slug("Charles R. Swindoll") == "charles_r_swindoll"
+    assert author_slug("Antoine de Saint-Exupéry") == "antoine_de_saint_exupery"
+    assert author_slug("") == "unknown"
+
+
+@pytest.mark.parametrize("link, slug", [
+    ("/quotes/charles_r_swindoll_121806", "charles_r_swindoll"),
+    ("https://www.brainyquote.com/quotes/john_xxiii_100543?src=t_love", "john_xxiii"),
+    ("/quotes/sam_levenson_100238/", "sam_levenson"),
+    ("/authors/sam_levenson", None),
+    ("/topics/love-quotes/quotes/x_1/extra", None),
+])
+def test_author_slug_from_link(link, slug):
+    assert author_slug_from_link(link) == slug
+
+
+def test_resolve_links_name_variants_to_the_link_slug():
+    authors = AuthorDirectory()
+    assert authors.resolve("Charles R. Swindoll", "/quotes/charles_r_swindoll_121806") == "charles_r_swindoll"
+    # Variante sans lien : rattachée au slug déjà vu
+    assert authors.resolve("Charles R Swindoll") == "charles_r_swindoll"
+    assert authors.name("charles_r_swindoll") == "Charles R. Swindoll"
+
+
+def test_lookup_does_not_register_the_name():
+    authors = AuthorDirectory()
+    assert authors.lookup("Someone Searched") == "someone_searched"
+    assert len(authors) == 0
+
+
+def test_remember_keeps_the_first_scraped_name():
+    authors = AuthorDirectory()
+    authors.remember("john_xxiii", "John XXIII")
+    authors.remember("john_xxiii", "John Xxiii")
+    assert authors.name("john_xxiii") == "John XXIII"
+    assert authors.lookup("John XXIII") == "john_xxiii"
+
+
+def test_upsert_authors_stores_the_scraped_name():
+    pytest.importorskip("supabase")
+    sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+    from standins import SupabaseStandIn
+    from database.supabase_storage import SupabaseQuoteStorage
+
+    quotes = [
+        QuoteRecord("Life is 10% what happens to you.", "Charles R. Swindoll", "charles_r_swindoll",
+                    "/quotes/charles_r_swindoll_121806"),
+        QuoteRecord("Peace.", "John XXIII", "john_xxiii", "/quotes/john_xxiii_100543"),
+    ]
+    with SupabaseStandIn() as standin:
+        storage = SupabaseQuoteStorage(standin.url, "test-key")
+        assert asyncio.run(storage.upsert_authors(quotes)) == 2
+        names = {row["slug"]: row["name"] for row in standin.tables["authors"]}
+        assert storage.authors.author_id("john_xxiii") is not None
+
+    assert names == {"charles_r_swindoll": "Charles R. Swindoll", "john_xxiii": "John XXIII"}
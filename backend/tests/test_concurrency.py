@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from core import concurrency
+from core.concurrency import AdaptiveLimit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_additive_increase_after_a_window_of_successes():
+    limit = AdaptiveLimit("pages", initial=2, max_limit=4)
+    for _ in range(2):
+        limit.record_success(0.1)
+    assert limit.current == 3
+    for _ in range(3):
+        limit.record_success(0.1)
+    assert limit.current == 4
+    for _ in range(10):
+        limit.record_success(0.1)
+    assert limit.current == 4
+
+
+def test_multiplicative_decrease_once_per_cooldown(clock):
+    limit = AdaptiveLimit("pages", initial=8, max_limit=8)
+    limit.record_failure("throttled")
+    limit.record_failure("throttled")
+    assert limit.current == 4
+    clock[0] += 1
+    limit.record_failure("blocked")
+    assert limit.current == 2
+    assert [change["reason"] for change in limit.changes] == ["throttled", "blocked"]
+
+
+def test_decrease_never_goes_below_min_limit(clock):
+    limit = AdaptiveLimit("pages", initial=2, min_limit=2, max_limit=8)
+    limit.record_failure("error")
+    assert limit.current == 2
+
+
+def test_rising_latency_decreases_the_limit(clock):
+    limit = AdaptiveLimit("images", initial=4, max_limit=4, latency_tolerance=2.0)
+    limit.record_success(0.1)
+    limit.record_success(1.0)
+    assert limit.current == 2
+    assert limit.changes[-1]["reason"] == "latency"
+
+
+def test_slot_admits_at_most_limit_units_of_work():
+    limit = AdaptiveLimit("pages", initial=2, max_limit=2)
+    peak = []
+
+    async def work():
+        async with limit.slot():
+            peak.append(limit.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+    assert limit.in_flight == 0
+
+
+def test_failures_inside_a_slot_decrease_the_limit():
+    limit = AdaptiveLimit("pages", initial=4, max_limit=4, is_failure=lambda e: isinstance(e, ConnectionError))
+
+    async def run():
+        with pytest.raises(ValueError):
+            async with limit.slot():
+                raise ValueError("parse error")
+        assert limit.current == 4
+        with pytest.raises(ConnectionError):
+            async with limit.slot():
+                raise ConnectionError("reset")
+
+    asyncio.run(run())
+    assert limit.current == 2
@@ -0,0 +1,35 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from conftest import SRC_DIR
+
+
+def test_env_file_is_loaded_before_settings_are_read(tmp_path):
+    # core/config.py copié à côté d'un .env : load_dotenv remonte depuis le module
+    shutil.copytree(SRC_DIR / "core", tmp_path / "core", ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / ".env").write_text("REQUEST_DELAY=50\nMAX_CONCURRENT_JOBS=7\nTASK_QUEUE_URL=sqlite:///t.db\n")
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("REQUEST_DELAY", "MAX_CONCURRENT_JOBS", "TASK_QUEUE_URL")}
+
+    output = subprocess.run(
+        [sys.executable, "-c",
+         "from core.config import settings; "
+         "print(settings.REQUEST_DELAY, settings.MAX_CONCURRENT_JOBS, settings.TASK_QUEUE_URL)"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert output == ["0.05", "7", "sqlite:///t.db"]
+
+
+def test_environment_wins_over_env_file(tmp_path):
+    shutil.copytree(SRC_DIR / "core", tmp_path / "core", ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / ".env").write_text("MAX_CONCURRENT_JOBS=7\n")
+
+    output = subprocess.run(
+        [sys.executable, "-c", "from core.config import settings; print(settings.MAX_CONCURRENT_JOBS)"],
+        cwd=tmp_path, env={**os.environ, "MAX_CONCURRENT_JOBS": "3"}, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    assert output == "3"
@@ -0,0 +1,96 @@
+import pytest
+
+from core.records import QuoteRecord
+from scraper.incremental import (PAGE_CHANGED, PAGE_KNOWN, PAGE_NEW, PAGE_UNCHANGED, IncrementalTracker,
+                                 PageFingerprintStore, page_fingerprint)
+
+
+def _page(*texts):
+    return [QuoteRecord(text, "Someone") for text in texts]
+
+
+PAGE_1 = _page("one", "two")
+PAGE_2 = _page("three", "four")
+
+
+def _history(store, topic="love"):
+    """Historique d'un premier run dont toutes les citations ont été stockées"""
+    tracker = IncrementalTracker(store.load(topic), "stop", max_pages=10)
+    tracker.observe(1, PAGE_1, 1.0)
+    tracker.observe(2, PAGE_2, 1.0)
+    tracker.finish()
+    persisted = {quote.fingerprint for quote in PAGE_1 + PAGE_2}
+    assert store.commit(topic, tracker.observed_pages(), persisted) == 2
+    return store.load(topic)
+
+
+def test_page_fingerprint_ignores_quote_order():
+    assert page_fingerprint(["a", "b"]) == page_fingerprint(["b", "a"])
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        IncrementalTracker(PageFingerprintStore(tmp_path).load("love"), "resume", max_pages=1)
+
+
+def test_first_run_pages_are_new(tmp_path):
+    tracker = IncrementalTracker(PageFingerprintStore(tmp_path).load("love"), "stop", max_pages=10)
+    assert tracker.observe(1, PAGE_1, 1.0) == PAGE_NEW
+    assert not tracker.should_stop(PAGE_NEW)
+
+
+def test_stop_mode_ends_at_the_first_known_page(tmp_path):
+    history = _history(PageFingerprintStore(tmp_path))
+    tracker = IncrementalTracker(history, "stop", max_pages=10)
+    fresh = _page("brand new", "one")
+    assert tracker.observe(1, fresh, 1.0) == PAGE_CHANGED
+    verdict = tracker.observe(2, _page("two", "three"), 1.0)
+    assert verdict == PAGE_KNOWN and tracker.should_stop(verdict)
+    report = tracker.finish()
+    assert report["stopped_at_page"] == 2
+    assert report["pages_scraped"] == 2
+
+
+def test_skip_mode_skips_unchanged_pages(tmp_path):
+    history = _history(PageFingerprintStore(tmp_path))
+    tracker = IncrementalTracker(history, "skip", max_pages=10)
+    verdict = tracker.observe(1, PAGE_1, 1.0)
+    assert verdict == PAGE_KNOWN
+    assert tracker.should_skip(verdict) and not tracker.should_stop(verdict)
+    # Même ensemble de citations connues ou non : une page identique est "unchanged"
+    tracker._known.clear()
+    assert tracker.observe(2, PAGE_2, 1.0) == PAGE_UNCHANGED
+    assert tracker.finish()["pages_skipped"] == 2
+
+
+def test_only_stored_pages_are_committed(tmp_path):
+    store = PageFingerprintStore(tmp_path)
+    tracker = IncrementalTracker(store.load("love"), "stop", max_pages=10)
+    tracker.observe(1, PAGE_1, 1.0)
+    tracker.observe(2, PAGE_2, 1.0)
+    tracker.finish()
+    # Page 2 n'a pas été stockée (erreur de base) : le prochain run doit la reprendre
+    persisted = {quote.fingerprint for quote in PAGE_1}
+    assert store.commit("love", tracker.observed_pages(), persisted) == 1
+
+    history = store.load("love")
+    assert list(history.pages) == ["1"]
+    assert IncrementalTracker(history, "stop", max_pages=10).observe(2, PAGE_2, 1.0) == PAGE_NEW
+
+
+def test_a_run_without_storage_records_nothing(tmp_path):
+    store = PageFingerprintStore(tmp_path)
+    tracker = IncrementalTracker(store.load("love"), "stop", max_pages=10)
+    tracker.observe(1, PAGE_1, 2.0)
+    tracker.finish()
+    assert store.commit("love", tracker.observed_pages(), set()) == 0
+    history = store.load("love")
+    assert history.pages == {}
+    assert history.avg_page_seconds == 2.0
+
+
+def test_unreadable_history_starts_over(tmp_path):
+    store = PageFingerprintStore(tmp_path)
+    store._path("love").parent.mkdir(parents=True, exist_ok=True)
+    store._path("love").write_text("{not json")
+    assert store.load("love").pages == {}
@@ -0,0 +1,106 @@
+import pytest
+
+from core.records import QuoteRecord
+from search import inverted_index
+from search.inverted_index import QuoteSearchIndex, tokenize
+
+QUOTES = [
+    QuoteRecord("Love is composed of a single soul inhabiting two bodies.", "Aristotle"),
+    QuoteRecord("Where there is love there is life.", "Mahatma Gandhi"),
+    QuoteRecord("The best way to predict the future is to invent it.", "Alan Kay"),
+    QuoteRecord("Life is really simple, but we insist on making it complicated.", "Confucius"),
+]
+
+
+def _texts(results):
+    return [result["text"] for result in results]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Best way, to predict THE future!") == ["best", "way", "predict", "future"]
+
+
+def test_bm25_ranks_matching_quotes():
+    index = QuoteSearchIndex()
+    assert index.add_quotes(QUOTES, topic="mixed") == 4
+    total, results = index.search("love life")
+    assert total == 3
+    # Les deux termes de la requête : en tête
+    assert results[0]["text"] == QUOTES[1].text
+    assert {result["topic"] for result in results} == {"mixed"}
+
+
+def test_author_is_searchable_and_pages_do_not_overlap():
+    index = QuoteSearchIndex()
+    index.add_quotes(QUOTES)
+    assert _texts(index.search("gandhi")[1]) == [QUOTES[1].text]
+    first, second = index.search("life love", limit=2)[1], index.search("life love", limit=2, offset=2)[1]
+    assert len(first) == 2 and len(second) == 1
+    assert not set(_texts(first)) & set(_texts(second))
+
+
+def test_duplicates_are_indexed_once():
+    index = QuoteSearchIndex()
+    assert index.add_quote(QUOTES[0]) == QUOTES[0].fingerprint
+    assert index.add_quote(QuoteRecord(QUOTES[0].text, QUOTES[0].author)) is None
+    assert len(index) == 1 and QUOTES[0].fingerprint in index
+
+
+def test_saves_append_to_the_journal_until_compaction(tmp_path):
+    path = tmp_path / "quotes.idx"
+    index = QuoteSearchIndex(path)
+    index.add_quotes(QUOTES[:2])
+    index.save()  # premier save : snapshot
+    assert path.exists() and not index.log_path.exists()
+
+    index.add_quote(QUOTES[2])
+    index.save()  # 1 nouveau document pour un snapshot de 2 (COMPACT_RATIO = 0.5) : journal
+    assert index.log_path.exists()
+    snapshot_size = path.stat().st_size
+
+    reloaded = QuoteSearchIndex(path)
+    assert reloaded.load()
+    assert len(reloaded) == 3
+    assert _texts(reloaded.search("predict future")[1]) == [QUOTES[2].text]
+
+    index.add_quote(QUOTES[3])
+    index.save()  # 2 documents de plus que le snapshot : compaction
+    assert not index.log_path.exists()
+    assert path.stat().st_size > snapshot_size
+
+    reloaded = QuoteSearchIndex(path)
+    reloaded.load()
+    assert len(reloaded) == 4
+    assert reloaded.search("love life")[0] == 3
+
+
+def test_truncated_journal_tail_is_ignored_and_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(inverted_index, "COMPACT_RATIO", 10.0)
+    path = tmp_path / "quotes.idx"
+    index = QuoteSearchIndex(path)
+    index.add_quote(QUOTES[0])
+    index.save()
+    for quote in QUOTES[1:3]:
+        index.add_quote(quote)
+        index.save()
+    # Arrêt pendant l'écriture du dernier enregistrement
+    data = index.log_path.read_bytes()
+    index.log_path.write_bytes(data[:-5])
+
+    reloaded = QuoteSearchIndex(path)
+    assert reloaded.load()
+    assert len(reloaded) == 2
+    reloaded.add_quote(QUOTES[3])
+    reloaded.save()
+    assert not reloaded.log_path.exists()
+
+    again = QuoteSearchIndex(path)
+    again.load()
+    assert len(again) == 3
+
+
+@pytest.mark.parametrize("query", ["", "the and of"])
+def test_queries_without_terms_match_nothing(query):
+    index = QuoteSearchIndex()
+    index.add_quotes(QUOTES)
+    assert index.search(query) == (0, [])
@@ -0,0 +1,51 @@
+from core.metrics import MetricsRegistry
+
+
+def _lines(registry):
+    return [line for line in registry.render().splitlines() if not line.startswith("#")]
+
+
+def test_counter_rendering_with_escaped_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs by status", ["status"])
+    counter.inc(status="completed")
+    counter.inc(2, status='say "hi"\n')
+    text = registry.render()
+    assert "# HELP jobs_total Jobs by status\n# TYPE jobs_total counter\n" in text
+    assert _lines(registry) == ['jobs_total{status="completed"} 1', 'jobs_total{status="say \\"hi\\"\\n"} 2']
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert _lines(registry) == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_worker_snapshots_are_added_and_replaced():
+    registry = MetricsRegistry()
+    registry.counter("pages_total", "Pages", ["outcome"]).inc(outcome="ok")
+    registry.merge_remote("worker0", {"pages_total": {("ok",): 2.0, ("blocked",): 1.0}})
+    registry.merge_remote("worker0", {"pages_total": {("ok",): 5.0, ("blocked",): 1.0}})
+    assert _lines(registry) == ['pages_total{outcome="blocked"} 1', 'pages_total{outcome="ok"} 6']
+
+
+def test_gauge_collection_failure_does_not_break_rendering():
+    registry = MetricsRegistry()
+    registry.gauge("queue_depth", "Depth", collect=lambda: {(): 3})
+    registry.gauge("broken", "Broken", collect=lambda: 1 / 0)
+    assert _lines(registry) == ["queue_depth 3"]
+
+
+def test_registering_twice_returns_the_same_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("c_total", "C")
+    assert registry.counter("c_total", "C") is first
+    assert set(registry.snapshot()) == {"c_total"}
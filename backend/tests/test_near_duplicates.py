@@ -0,0 +1,53 @@
+from search.near_duplicates import NearDuplicateDetector
+
+QUOTE = "The best way to predict the future is to invent it. Keep going, whatever happens next."
+
+
+def test_punctuation_and_case_variants_are_duplicates():
+    detector = NearDuplicateDetector()
+    assert detector.add("a", QUOTE, "future") is None
+    assert detector.add("b", QUOTE.upper().replace(",", ""), "inspirational") == "a"
+    assert detector.add("c", f"“{QUOTE}”", "life") == "a"
+    assert detector.topics["a"] == {"future", "inspirational", "life"}
+    assert len(detector) == 1
+
+
+def test_different_quotes_are_kept_apart():
+    detector = NearDuplicateDetector()
+    detector.add("a", QUOTE)
+    assert detector.add("b", "Life is what happens to you while you are busy making other plans.") is None
+    assert detector.throughput()["canonical"] == 2
+
+
+def test_check_does_not_register():
+    detector = NearDuplicateDetector()
+    canonical, signature = detector.check(QUOTE)
+    assert canonical is None
+    assert len(signature) == detector.num_perm
+    assert len(detector) == 0
+
+
+def test_empty_copy_uses_the_same_hash_functions():
+    detector = NearDuplicateDetector(seed=1)
+    copy = detector.empty_copy()
+    assert (copy.signature(QUOTE) == detector.signature(QUOTE)).all()
+
+
+def test_merge_into_an_empty_detector():
+    detector = NearDuplicateDetector()
+    loaded = detector.empty_copy()
+    loaded.insert("a", loaded.signature(QUOTE), "future")
+    detector.merge(loaded)
+    assert detector.check(QUOTE.lower(), "life")[0] == "a"
+    assert detector.topics["a"] == {"future", "life"}
+
+
+def test_merge_into_a_filled_detector_keeps_existing_keys():
+    detector = NearDuplicateDetector()
+    detector.add("a", QUOTE, "future")
+    loaded = detector.empty_copy()
+    loaded.insert("a", loaded.signature(QUOTE), "other")
+    loaded.insert("b", loaded.signature("Stay hungry, stay foolish and never stop learning."), "life")
+    detector.merge(loaded)
+    assert len(detector) == 2
+    assert detector.topics == {"a": {"future"}, "b": {"life"}}
@@ -0,0 +1,97 @@
+import asyncio
+import types
+
+import pytest
+
+from core import rate_limit
+from core.rate_limit import HostRateLimiter, host_of, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge manuelle : les attentes du limiteur avancent le temps au lieu de dormir"""
+    now = [1000.0]
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(round(seconds, 6))
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(time=lambda: now[0]))
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep)
+    return types.SimpleNamespace(now=now, waits=waits)
+
+
+def _acquire(limiter, urls):
+    async def run():
+        for url in urls:
+            await limiter.acquire(url)
+
+    asyncio.run(run())
+
+
+def test_one_request_per_interval_and_host(clock):
+    limiter = HostRateLimiter(delay=1.0)
+    _acquire(limiter, ["https://a.test/1", "https://a.test/2", "https://b.test/1", "https://a.test/3"])
+    # b.test a son propre seau : pas d'attente
+    assert clock.waits == [1.0, 1.0]
+    assert limiter.stats()["a.test"] == {"requests": 3, "throttled": 0, "waited_seconds": 2.0}
+
+
+def test_burst_is_served_without_waiting(clock):
+    limiter = HostRateLimiter(delay=1.0, burst=3)
+    _acquire(limiter, ["https://a.test/"] * 4)
+    assert clock.waits == [1.0]
+
+
+def test_idle_host_does_not_bank_more_than_the_burst(clock):
+    limiter = HostRateLimiter(delay=1.0, burst=2)
+    _acquire(limiter, ["https://a.test/"])
+    clock.now[0] += 100
+    _acquire(limiter, ["https://a.test/"] * 3)
+    assert clock.waits == [1.0]
+
+
+def test_throttle_pauses_for_retry_after_then_recovers(clock):
+    limiter = HostRateLimiter(delay=1.0, max_delay=8.0)
+
+    async def run():
+        await limiter.acquire("https://a.test/")
+        assert await limiter.observe("https://a.test/", 429, "5")
+        await limiter.acquire("https://a.test/")
+        for _ in range(30):
+            assert not await limiter.observe("https://a.test/", 200)
+
+    asyncio.run(run())
+    assert clock.waits == [5.0]
+    assert limiter._states["a.test"].interval == 1.0
+    assert limiter.stats()["a.test"]["throttled"] == 1
+
+
+def test_repeated_throttles_double_the_interval_up_to_max_delay(clock):
+    limiter = HostRateLimiter(delay=1.0, max_delay=5.0)
+
+    async def run():
+        for _ in range(4):
+            await limiter.throttled("https://a.test/")
+
+    asyncio.run(run())
+    assert limiter._states["a.test"].interval == 5.0
+
+
+def test_buckets_shared_through_the_state_directory(clock, tmp_path):
+    if rate_limit.fcntl is None:
+        pytest.skip("fcntl unavailable")
+    first = HostRateLimiter(delay=1.0, state_dir=tmp_path)
+    second = HostRateLimiter(delay=1.0, state_dir=tmp_path)
+    _acquire(first, ["https://a.test/"])
+    _acquire(second, ["https://a.test/"])
+    assert clock.waits == [1.0]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    assert host_of("https://WWW.BrainyQuote.com/topics/love") == "www.brainyquote.com"
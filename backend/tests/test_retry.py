@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from core.retry import (CircuitBreaker, CircuitOpenError, PermanentError, Retrier, RetryBudget, RetryPolicy,
+                        ThrottledError, is_connect_failure, is_transient)
+
+
+def _retrier(**options) -> Retrier:
+    options = {"attempts": 3, "base_delay": 0.0, "breaker_threshold": 100, **options}
+    return Retrier({"op": RetryPolicy("op", **options)})
+
+
+class _Flaky:
+    """Échoue ``failures`` fois avec ``error`` puis réussit"""
+
+    def __init__(self, failures: int, error: Exception = ConnectionError("reset")):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_transient_failures_are_retried():
+    retrier, flaky = _retrier(), _Flaky(2)
+    assert asyncio.run(retrier.call("op", flaky)) == "ok"
+    counters = retrier.stats()["operations"]["op"]
+    assert (flaky.calls, counters["retries"], counters["successes"]) == (3, 2, 1)
+
+
+def test_attempts_are_bounded():
+    retrier, flaky = _retrier(), _Flaky(5)
+    with pytest.raises(ConnectionError):
+        asyncio.run(retrier.call("op", flaky))
+    assert flaky.calls == 3
+    assert retrier.stats()["operations"]["op"]["failures"] == 1
+
+
+def test_permanent_errors_are_not_retried():
+    retrier, flaky = _retrier(), _Flaky(1, PermanentError("404"))
+    with pytest.raises(PermanentError):
+        asyncio.run(retrier.call("op", flaky))
+    assert flaky.calls == 1
+
+
+def test_sync_operations_are_supported():
+    assert asyncio.run(_retrier().call("op", lambda: 42)) == 42
+
+
+def test_retry_budget_caps_retries():
+    retrier = _retrier(attempts=10, budget_ratio=0.0, budget_burst=2)
+    flaky = _Flaky(10)
+    with pytest.raises(ConnectionError):
+        asyncio.run(retrier.call("op", flaky))
+    # 1 appel + 2 retries du budget
+    assert flaky.calls == 3
+    assert retrier.stats()["operations"]["op"]["budget_exhausted"] == 1
+
+
+def test_budget_refills_with_calls():
+    budget = RetryBudget(ratio=0.5, burst=1)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_breaker_opens_and_fails_fast():
+    retrier = _retrier(attempts=1, breaker_threshold=2, breaker_reset=60.0)
+    flaky = _Flaky(100)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await retrier.call("op", flaky, key="a.test")
+        with pytest.raises(CircuitOpenError):
+            await retrier.call("op", flaky, key="a.test")
+        # Autre hôte : autre breaker
+        with pytest.raises(ConnectionError):
+            await retrier.call("op", flaky, key="b.test")
+
+    asyncio.run(run())
+    assert flaky.calls == 3
+    assert retrier.stats()["open_breakers"] == {"op:a.test": "open"}
+
+
+def test_half_open_breaker_allows_a_single_trial(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("core.retry.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=1, reset=10.0)
+    assert breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    # Essai en échec : rouvert pour une nouvelle période
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_cancellation_releases_a_half_open_trial():
+    # reset=0 : le breaker ouvert passe aussitôt en half-open
+    retrier = _retrier(attempts=1, breaker_threshold=1, breaker_reset=0.0)
+
+    async def hang():
+        await asyncio.sleep(30)
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await retrier.call("op", _Flaky(1))
+        task = asyncio.create_task(retrier.call("op", hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await retrier.call("op", lambda: "ok")
+
+    assert asyncio.run(run()) == "ok"
+
+
+class _HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.response = type("Response", (), {"status_code": status})()
+
+
+@pytest.mark.parametrize("error, transient", [
+    (ConnectionError(), True),
+    (asyncio.TimeoutError(), True),
+    (ThrottledError(), True),
+    (_HTTPError(503), True),
+    (_HTTPError(404), False),
+    (PermanentError(), False),
+    (ValueError(), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_only_connect_failures_retry_non_idempotent_writes():
+    assert is_connect_failure(ConnectionRefusedError())
+    assert is_connect_failure(_HTTPError(429))
+    assert not is_connect_failure(_HTTPError(500))
+    assert not is_connect_failure(TimeoutError())
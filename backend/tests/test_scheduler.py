@@ -0,0 +1,108 @@
+import asyncio
+import types
+
+import pytest
+
+import core.compat
+from jobs.scheduler import JobScheduler, QueueFullError
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+async def _slow_runner(job):
+    job.status = "running"
+    await asyncio.sleep(30)
+    job.status = "completed"
+
+
+def _stop_running_job():
+    async def scenario():
+        scheduler = JobScheduler(_slow_runner, max_workers=1)
+        await scheduler.start()
+        job = scheduler.submit("love", {})
+        await _wait_for(lambda: job.status == "running")
+        assert scheduler.stop(job.id)
+        await _wait_for(lambda: not job.is_active)
+        await scheduler.shutdown()
+        return job
+
+    return asyncio.run(scenario())
+
+
+def test_stop_cancels_a_running_job():
+    job = _stop_running_job()
+    assert job.status == "stopped"
+    assert job.finished_at is not None
+    assert job.stop_latency_ms() is not None
+
+
+def test_stop_without_task_cancelling(monkeypatch):
+    # Python 3.10 : ni Task.cancelling() ni Task.uncancel(), l'arrêt repose sur job.stop_requested
+    monkeypatch.setattr(core.compat, "asyncio", types.SimpleNamespace(current_task=lambda: object()))
+    assert _stop_running_job().status == "stopped"
+
+
+def test_queued_job_never_starts_once_stopped():
+    async def scenario():
+        scheduler = JobScheduler(_slow_runner, max_workers=1)
+        await scheduler.start()
+        first = scheduler.submit("love", {})
+        second = scheduler.submit("life", {})
+        await _wait_for(lambda: first.status == "running")
+        scheduler.stop(second.id)
+        scheduler.stop(first.id)
+        await _wait_for(lambda: not first.is_active)
+        await asyncio.sleep(0.05)
+        await scheduler.shutdown()
+        return second
+
+    second = asyncio.run(scenario())
+    assert second.status == "stopped"
+    assert second.start_time is None
+
+
+def test_priority_then_fifo_and_queue_capacity():
+    order = []
+
+    async def runner(job):
+        order.append(job.topic)
+
+    async def scenario():
+        scheduler = JobScheduler(runner, max_workers=1, max_queued=3)
+        scheduler._queue = asyncio.PriorityQueue()  # file sans workers : rien ne démarre pendant les submit
+        scheduler.submit("low", {}, priority=0)
+        scheduler.submit("high", {}, priority=5)
+        scheduler.submit("low-2", {}, priority=0)
+        with pytest.raises(QueueFullError):
+            scheduler.submit("overflow", {})
+        scheduler._workers = [asyncio.create_task(scheduler._worker(0))]
+        await _wait_for(lambda: len(order) == 3)
+        await scheduler.shutdown()
+
+    asyncio.run(scenario())
+    assert order == ["high", "low", "low-2"]
+
+
+def test_finished_jobs_share_an_event_budget():
+    async def runner(job):
+        for i in range(10):
+            job.record_event("quote", {"i": i})
+        job.status = "completed"
+
+    async def scenario():
+        scheduler = JobScheduler(runner, max_workers=1, finished_events_budget=25)
+        await scheduler.start()
+        jobs = [scheduler.submit(f"topic-{i}", {}) for i in range(4)]
+        await _wait_for(lambda: all(not job.is_active for job in jobs))
+        await scheduler.shutdown()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    # Les plus récents gardent leurs événements, les plus anciens au-delà du budget sont vidés
+    assert [job.logged_events for job in jobs] == [0, 0, 10, 10]
+    assert jobs[0].last_event_id == 10
@@ -0,0 +1,45 @@
+import numpy as np
+
+from core.records import QuoteRecord
+from search.similarity import QuoteVectorIndex, embed_text
+
+QUOTES = [
+    QuoteRecord("Where there is love there is life.", "Mahatma Gandhi"),
+    QuoteRecord("Love is life and life is love.", "Someone"),
+    QuoteRecord("The best way to predict the future is to invent it.", "Alan Kay"),
+]
+
+
+def test_embeddings_are_normalized_and_stable():
+    vector = embed_text("Where there is love there is life.")
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, embed_text("Where there is love there is life."))
+    assert not embed_text("").any()
+
+
+def test_similar_excludes_the_quote_itself():
+    index = QuoteVectorIndex()
+    assert index.add_quotes(QUOTES) == 3
+    assert index.add_quotes(QUOTES[:1]) == 0
+    neighbours = index.similar(QUOTES[0].fingerprint, k=5)
+    assert [fp for fp, _ in neighbours][0] == QUOTES[1].fingerprint
+    assert QUOTES[0].fingerprint not in [fp for fp, _ in neighbours]
+
+
+def test_reserved_rows_are_unknown():
+    index = QuoteVectorIndex()
+    index.add_quotes(QUOTES[:2])
+    # Ligne réservée par un add_quotes concurrent, pas encore écrite
+    index._row_by_id["pending"] = -1
+    assert "pending" not in index
+    assert index.similar_batch(["pending", QUOTES[0].fingerprint], k=1)[0] == []
+
+
+def test_flush_and_load(tmp_path):
+    index = QuoteVectorIndex(tmp_path)
+    index.add_quotes(QUOTES)
+    assert index.flush()
+    loaded = QuoteVectorIndex(tmp_path)
+    assert loaded.load()
+    assert len(loaded) == 3
+    assert loaded.query_text("predict the future", k=1)[0][0] == QUOTES[2].fingerprint
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+pytest.importorskip("supabase")
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+
+from standins import SupabaseStandIn  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    with SupabaseStandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def client(standin, monkeypatch):
+    # Module historique importé par "src." : ses réglages sont une instance à part
+    from src.core.config import settings
+    from src.database.supabase import SupabaseClient
+
+    monkeypatch.setattr(settings, "SUPABASE_URL", standin.url, raising=False)
+    monkeypatch.setattr(settings, "SUPABASE_KEY", "test-key", raising=False)
+    standin.tables["scraping_jobs"] = [{"id": "job-1", "topic": "love", "status": "running"}]
+    return SupabaseClient()
+
+
+def test_missing_rpc_falls_back_to_a_recount(client, standin):
+    # Le stand-in répond PGRST202 (fonction inconnue) comme PostgREST
+    assert asyncio.run(client.save_quotes("job-1", [{"text": "a"}, {"text": "b"}]))
+    job = standin.tables["scraping_jobs"][0]
+    assert (job["total_quotes"], job["processed_quotes"]) == (2, 2)
+
+
+def test_counter_failure_does_not_report_the_insert_as_failed(client, standin, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("timeout")
+
+    monkeypatch.setattr(client.client, "rpc", unreachable)
+    assert asyncio.run(client.save_quotes("job-1", [{"text": "a"}]))
+    assert len(standin.tables["quotes"]) == 1
+    # Pas de recomptage sur une erreur réseau
+    assert "total_quotes" not in standin.tables["scraping_jobs"][0]
+    assert standin.requests["GET /rest/v1/quotes"] == 0
+
+
+@pytest.mark.parametrize("status, memoized", [("running", False), ("error", True), ("completed", True)])
+def test_finished_job_summaries_are_memoized(client, standin, status, memoized):
+    standin.tables["scraping_jobs"][0].update(status=status, total_quotes=3)
+    assert asyncio.run(client.get_job_statistics("job-1"))["total_quotes"] == 3
+    asyncio.run(client.get_job_statistics("job-1"))
+    assert (standin.requests["GET /rest/v1/scraping_jobs"] == 1) is memoized
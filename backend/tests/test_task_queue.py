@@ -0,0 +1,114 @@
+import sqlite3
+import types
+
+import pytest
+
+from jobs import task_queue
+from jobs.task_queue import LeaseLostError, SQLiteTaskQueue, create_task_queue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge manuelle de la file (baux et ordre de création)"""
+    now = [1000.0]
+    monkeypatch.setattr(task_queue, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SQLiteTaskQueue(tmp_path / "tasks.db", lease_seconds=10, max_attempts=2)
+
+
+def test_enqueue_is_idempotent_per_task_id(queue):
+    queue.enqueue({"page": 1}, task_id="love:1")
+    queue.enqueue({"page": 99}, task_id="love:1")
+    task = queue.claim("w1")
+    assert task.payload == {"page": 1}
+    assert queue.claim("w2") is None
+
+
+def test_claim_oldest_first_and_complete(queue, clock):
+    queue.enqueue({"page": 1}, task_id="a")
+    clock[0] += 1
+    queue.enqueue({"page": 2}, task_id="b")
+    first = queue.claim("w1")
+    assert (first.id, first.attempts, first.lease_expires) == ("a", 1, clock[0] + 10)
+    queue.complete(first, {"quotes": 3})
+    assert queue.results(["a", "b"])["a"] == {"status": "done", "result": {"quotes": 3}, "error": None}
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue, clock):
+    queue.enqueue({"page": 1}, task_id="a")
+    lost = queue.claim("w1")
+    clock[0] += 11
+    taken = queue.claim("w2")
+    assert (taken.id, taken.worker_id, taken.attempts) == ("a", "w2", 2)
+    # Le premier worker ne peut plus ni renouveler ni régler la tâche
+    with pytest.raises(LeaseLostError):
+        queue.heartbeat(lost)
+    with pytest.raises(LeaseLostError):
+        queue.complete(lost, {})
+    queue.complete(taken, {})
+
+
+def test_heartbeat_extends_the_lease(queue, clock):
+    queue.enqueue({"page": 1}, task_id="a")
+    task = queue.claim("w1")
+    clock[0] += 8
+    queue.heartbeat(task)
+    clock[0] += 8
+    assert queue.claim("w2") is None
+    assert task.lease_expires == clock[0] + 2
+
+
+def test_expired_lease_fails_after_max_attempts(queue, clock):
+    queue.enqueue({"page": 1}, task_id="a")
+    queue.claim("w1")
+    clock[0] += 11
+    queue.claim("w2")
+    clock[0] += 11
+    assert queue.requeue_expired() == 1
+    assert queue.claim("w3") is None
+    assert queue.results(["a"])["a"]["status"] == "failed"
+    assert queue.results(["a"])["a"]["error"] == "lease expired"
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.enqueue({"page": 1}, task_id="a")
+    queue.fail(queue.claim("w1"), "timeout")
+    retried = queue.claim("w1")
+    assert retried.attempts == 2
+    queue.fail(retried, "timeout")
+    assert queue.claim("w1") is None
+    assert queue.results(["a"])["a"]["status"] == "failed"
+
+
+def test_stats_follow_every_transition(queue, clock):
+    queue.enqueue_many([{"page": i} for i in range(4)], ["a", "b", "c", "d"])
+    queue.complete(queue.claim("w"), {})
+    queue.fail(queue.claim("w"), "blocked", retry=False)
+    queue.claim("w")
+    assert queue.stats() == {"pending": 1, "leased": 1, "done": 1, "failed": 1}
+    clock[0] += 11
+    queue.requeue_expired()
+    assert queue.stats() == {"pending": 2, "leased": 0, "done": 1, "failed": 1}
+
+
+def test_counters_are_rebuilt_for_a_queue_created_before_them(tmp_path):
+    path = tmp_path / "tasks.db"
+    queue = SQLiteTaskQueue(path)
+    queue.enqueue_many([{"page": i} for i in range(3)])
+    queue.complete(queue.claim("w"), {})
+    db = sqlite3.connect(path)
+    db.executescript("DROP TRIGGER task_counts_insert; DROP TRIGGER task_counts_update; "
+                     "DROP TRIGGER task_counts_delete; DROP TABLE task_counts;")
+    db.close()
+
+    assert SQLiteTaskQueue(path).stats() == {"pending": 2, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_create_task_queue_from_url(tmp_path):
+    queue = create_task_queue(f"sqlite:///{tmp_path / 'q.db'}")
+    assert isinstance(queue, SQLiteTaskQueue)
+    assert queue.path == tmp_path / "q.db"
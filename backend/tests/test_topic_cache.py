@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from core.records import QuoteBatch, QuoteRecord
+from scraper.topic_cache import TopicResultCache
+
+QUOTES = QuoteBatch([QuoteRecord("Where there is love there is life.", "Mahatma Gandhi")])
+
+
+class _Fetch:
+    def __init__(self, result=QUOTES, delay=0.02, error=None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_key_ignores_topic_case_and_option_order():
+    assert TopicResultCache.key(" Love ", a=1, b=2) == TopicResultCache.key("love", b=2, a=1)
+    assert TopicResultCache.key("love", a=1) != TopicResultCache.key("love", a=2)
+
+
+def test_concurrent_misses_share_one_scrape():
+    cache, fetch = TopicResultCache(), _Fetch()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert fetch.calls == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+    assert all(quotes[0].text == QUOTES[0].text for quotes, _ in results)
+    assert cache.stats()["inflight"] == 0
+
+
+def test_failed_scrape_releases_the_waiters():
+    cache = TopicResultCache()
+    failing = _Fetch(error=ConnectionError("down"))
+    fallback = _Fetch(delay=0.05)
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_fetch("k", failing))
+        await asyncio.sleep(0)
+        # L'attente partagée échoue : le second appelant scrape lui-même
+        second = await cache.get_or_fetch("k", fallback)
+        with pytest.raises(ConnectionError):
+            await first
+        return second
+
+    quotes, status = asyncio.run(run())
+    assert status == "miss" and fallback.calls == 1
+    assert cache.get("k") is not None
+
+
+def test_fresh_hit_then_stale_served_while_refreshing(monkeypatch):
+    cache = TopicResultCache(ttl=10, stale_ttl=100)
+    cache.put("k", QUOTES)
+    refreshed = QuoteBatch([QuoteRecord("Life is really simple.", "Confucius")])
+    fetch = _Fetch(result=refreshed)
+
+    async def run():
+        assert (await cache.get_or_fetch("k", fetch))[1] == "hit"
+        cache._memory["k"].created_at -= 20
+        stale = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(3)))
+        await asyncio.sleep(0.1)
+        return stale
+
+    stale = asyncio.run(run())
+    assert [status for _, status in stale] == ["stale"] * 3
+    assert stale[0][0][0].text == QUOTES[0].text
+    assert fetch.calls == 1
+    assert cache.get("k").quotes[0].text == "Life is really simple."
+
+
+def test_expired_entry_is_dropped():
+    cache = TopicResultCache(ttl=10, stale_ttl=10)
+    cache.put("k", QUOTES)
+    cache._memory["k"].created_at -= 30
+    assert cache.get("k") is None
+
+
+def test_disk_tier_survives_a_restart_and_lru_is_bounded(tmp_path):
+    cache = TopicResultCache(tmp_path, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, QUOTES)
+    assert list(cache._memory) == ["b", "c"]
+
+    restarted = TopicResultCache(tmp_path)
+    assert restarted.get("a").quotes[0].fingerprint == QUOTES[0].fingerprint
+    assert restarted.stats()["disk_hits"] == 1
@@ -0,0 +1,63 @@
+import asyncio
+import types
+
+import pytest
+
+import core.compat
+from jobs.task_queue import SQLiteTaskQueue
+from jobs.worker_node import WorkerNode, collect_topic_results, enqueue_topic
+
+
+class _HangingScraper:
+    """Scraper dont la page ne se termine jamais (navigation bloquée)"""
+
+    async def scrape_topic_page(self, topic, page, max_quotes=None):
+        await asyncio.sleep(30)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    # Bail de 3 s : heartbeat toutes les secondes
+    return SQLiteTaskQueue(tmp_path / "tasks.db", lease_seconds=3)
+
+
+def _run_with_stolen_lease(queue):
+    enqueue_topic(queue, "love", 1, job_id="crawl")
+    node = WorkerNode(queue, worker_id="node-a")
+    task = queue.claim(node.worker_id)
+    # Le bail est repris par un autre nœud pendant que celui-ci travaille
+    queue._connect().execute("UPDATE tasks SET worker_id = 'node-b' WHERE id = ?", (task.id,))
+
+    async def scenario():
+        await asyncio.wait_for(node._run_task(_HangingScraper(), task), 5)
+
+    asyncio.run(scenario())
+    return node
+
+
+def test_lost_lease_abandons_the_task(queue):
+    node = _run_with_stolen_lease(queue)
+    assert (node.processed, node.failed) == (0, 1)
+
+
+def test_lost_lease_without_task_cancelling(queue, monkeypatch):
+    monkeypatch.setattr(core.compat, "asyncio", types.SimpleNamespace(current_task=lambda: object()))
+    node = _run_with_stolen_lease(queue)
+    assert (node.processed, node.failed) == (0, 1)
+
+
+def test_node_shutdown_leaves_the_lease_to_expire(queue):
+    enqueue_topic(queue, "love", 1, job_id="crawl")
+    node = WorkerNode(queue, worker_id="node-a")
+    task = queue.claim(node.worker_id)
+
+    async def scenario():
+        running = asyncio.create_task(node._run_task(_HangingScraper(), task))
+        await asyncio.sleep(0.1)
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+    asyncio.run(scenario())
+    assert node.failed == 0
+    assert collect_topic_results(queue, ["crawl:1"])["tasks"]["leased"] == 1